@@ -0,0 +1,88 @@
+"""Микро-бенчмарк: реестр команд против прежней цепочки match/case.
+
+Запуск (из корня репозитория): python -m benchmarks.bench_dispatch
+
+Сравнивается только поиск обработчика по первому слову команды,
+сами действия игрока не вызываются.
+"""
+
+import timeit
+
+from labyrinth_game.commands import lookup
+
+# Смесь команд, похожая на реальную игру; неизвестные слова проходят всю цепочку
+COMMAND_MIX = [
+    "look", "n", "south", "take torch", "use torch", "инвентарь", "идти на север",
+    "solve", "восток", "score", "help", "открыть", "запад", "xyzzy", "очки",
+]
+
+
+def legacy_dispatch(command_string):
+    """Копия цепочки match/case из прежнего process_command (без действий)."""
+    parts = command_string.strip().split()
+    cmd = parts[0].lower()
+    args = parts[1:]
+    match cmd:
+        case "look" | "осмотреться" | "осмотр":
+            return "look"
+        case "inventory" | "инвентарь" | "инв":
+            return "inventory"
+        case "go" | "идти" | "move":
+            direction = args[-1].lower()
+            direction_map = {
+                'север': 'north', 'north': 'north', 'n': 'north',
+                'юг': 'south', 'south': 'south', 's': 'south',
+                'запад': 'west', 'west': 'west', 'w': 'west',
+                'восток': 'east', 'east': 'east', 'e': 'east',
+                'вверх': 'up', 'вниз': 'down'
+            }
+            return direction_map.get(direction, direction)
+        case "take" | "взять" | "подобрать":
+            return "take"
+        case "use" | "использовать":
+            return "use"
+        case "solve" | "решить" | "загадка":
+            return "solve"
+        case "open" | "открыть":
+            return "open"
+        case "quit" | "exit" | "выход" | "выйти":
+            return "quit"
+        case "help" | "помощь" | "?":
+            return "help"
+        case "score" | "очки" | "счет":
+            return "score"
+        case "north" | "n" | "север":
+            return "north"
+        case "south" | "s" | "юг":
+            return "south"
+        case "west" | "w" | "запад":
+            return "west"
+        case "east" | "e" | "восток":
+            return "east"
+        case _:
+            return None
+
+
+def registry_dispatch(command_string):
+    parts = command_string.strip().split()
+    return lookup(parts[0])
+
+
+def run(number=20000):
+    results = {}
+    for name, dispatch in (('match/case', legacy_dispatch), ('registry', registry_dispatch)):
+        timer = timeit.Timer(lambda: [dispatch(cmd) for cmd in COMMAND_MIX])
+        best = min(timer.repeat(repeat=5, number=number))
+        results[name] = best / (number * len(COMMAND_MIX)) * 1e9
+    return results
+
+
+def main():
+    results = run()
+    for name, ns in results.items():
+        print(f"{name:>12}: {ns:8.1f} нс/команда")
+    print(f"{'ускорение':>12}: {results['match/case'] / results['registry']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Бенчмарк генератора лабиринтов: время на комнату и память при росте размера.
+
+Запуск (из корня репозитория): python -m benchmarks.bench_generator [максимальный размер]
+
+Время на комнату должно оставаться примерно постоянным (генерация линейна),
+а пик памяти — не зависеть от числа комнат (комнаты выдаются потоком).
+"""
+
+import sys
+import time
+import tracemalloc
+
+from labyrinth_game.generator import generate_rooms
+
+
+def consume(size, seed):
+    exits = 0
+    for _, room in generate_rooms(size, seed):
+        exits += len(room['exits'])
+    return exits
+
+
+def measure(size, seed=0):
+    # Время и память меряются отдельными прогонами: tracemalloc сильно замедляет код
+    start = time.perf_counter()
+    consume(size, seed)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    consume(min(size, 100_000), seed)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    size = 1_000
+    print(f"{'комнат':>10} {'всего, с':>10} {'мкс/комната':>12} {'пик памяти, КБ':>15}")
+    while size <= limit:
+        elapsed, peak = measure(size)
+        print(f"{size:>10} {elapsed:>10.2f} {elapsed / size * 1e6:>12.2f} {peak / 1024:>15.1f}")
+        size *= 10
+
+
+if __name__ == '__main__':
+    main()
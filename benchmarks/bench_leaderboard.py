@@ -0,0 +1,104 @@
+"""Нагрузочный тест таблицы рекордов: тысячи законченных игр в секунду.
+
+Запуск (из корня репозитория): python -m benchmarks.bench_leaderboard [игр] [потоков]
+
+Несколько потоков (как сессии сервера) одновременно сообщают об окончании
+игр через ScoreStore.record(). Замеряется, сколько стоит record() игровому
+циклу, за сколько фоновый писатель доводит всё до диска и сколькими
+транзакциями, а затем — время запросов таблицы рекордов и истории игрока
+(и что они идут по индексам). Скрипт завершается с кодом 1, если база
+принимает меньше TARGET игр в секунду.
+"""
+
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from labyrinth_game.leaderboard import ScoreStore
+from labyrinth_game.world import new_game_state
+
+TARGET = 5000      # игр в секунду, не меньше
+PLAYERS = 1000
+QUERIES = 1000
+
+
+def finished_games(count, offset):
+    """Итоги законченных игр с разными игроками и счётом."""
+    games = []
+    for number in range(offset, offset + count):
+        game_state = new_game_state(seed=number)
+        game_state['player'] = f"player_{number % PLAYERS}"
+        game_state['score'] = number * 7919 % 400
+        game_state['steps_taken'] = number % 97 + 5
+        game_state['solved_puzzles'] = number % 5
+        game_state['victory'] = number % 3 == 0
+        game_state['game_over'] = True
+        games.append(game_state)
+    return games
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    per_thread = total // threads
+    batches = [finished_games(per_thread, index * per_thread) for index in range(threads)]
+    total = per_thread * threads
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ScoreStore(Path(directory) / 'scores.db')
+        latencies = []
+
+        def finish(games):
+            times = []
+            for game_state in games:
+                start = time.perf_counter()
+                store.record(game_state, "Победитель лабиринта! 🏆")
+                times.append(time.perf_counter() - start)
+            latencies.extend(times)
+
+        workers = [threading.Thread(target=finish, args=(games,)) for games in batches]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        submitted = time.perf_counter() - start
+        store.flush()
+        elapsed = time.perf_counter() - start
+        rate = total / elapsed
+
+        latencies.sort()
+        print(f"{total} игр из {threads} потоков: record() {submitted / total * 1e6:.2f} мкс в среднем, "
+              f"p99 {latencies[len(latencies) * 99 // 100] * 1e6:.1f} мкс")
+        print(f"на диске через {elapsed:.2f} с: {rate:,.0f} игр/с, "
+              f"транзакций {store.transactions} (по {store.written / max(store.transactions, 1):.0f} игр)")
+
+        for name, query in (('top 10', lambda number: store.top(10)),
+                            ('history', lambda number: store.history(f"player_{number % PLAYERS}"))):
+            start = time.perf_counter()
+            for number in range(QUERIES):
+                query(number)
+            print(f"{name:<8} {(time.perf_counter() - start) / QUERIES * 1e6:8.1f} мкс/запрос")
+
+        reader = sqlite3.connect(store.path)
+        for sql in ("SELECT * FROM sessions ORDER BY score DESC, steps LIMIT 10",
+                    "SELECT * FROM sessions WHERE player = 'x' ORDER BY id DESC LIMIT 10"):
+            plan = " ".join(row[-1] for row in reader.execute("EXPLAIN QUERY PLAN " + sql))
+            print(f"  план: {plan}")
+        reader.close()
+        count = store.count()
+        store.close()
+
+    passed = count == total and store.failed == 0 and rate >= TARGET
+    if count != total:
+        print(f"FAIL: в базе {count} игр вместо {total}")
+    if rate < TARGET:
+        print(f"FAIL: {rate:,.0f} игр/с меньше {TARGET}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Бенчмарк сохранения: бинарный формат savegame против JSON.
+
+Запуск (из корня репозитория): python -m benchmarks.bench_savegame
+
+JSON-вариант сохраняет те же данные (счётчики, инвентарь по названиям,
+изменённые комнаты) обычным json.dumps/json.loads — это базовая линия.
+"""
+
+import json
+import tempfile
+import timeit
+from pathlib import Path
+
+from labyrinth_game import engine, savegame
+from labyrinth_game.inventory import Inventory
+from labyrinth_game.items import CATALOGUE, intern
+from labyrinth_game.world import World
+
+SCRIPT = [
+    "take torch", "east", "solve шаг шаг шаг", "take rusty_key", "take coin", "west",
+    "north", "solve 10", "west", "take ancient_book", "north", "take sword", "take bronze_box",
+    "use bronze_box", "south", "east",
+]
+
+
+def typical_state(extra_items=0):
+    """Состояние середины игры; extra_items — дополнительные предметы в инвентаре."""
+    state, _ = engine.new_game()
+    for command in SCRIPT:
+        state, _ = engine.step(state, command, inplace=True)
+    for index in range(extra_items):
+        state['player_inventory'].append(f"trinket_{index}")
+    return state
+
+
+def json_dumps(game_state):
+    world = game_state['world']
+    return json.dumps({
+        'current_room': game_state['current_room'],
+        'steps_taken': game_state['steps_taken'],
+        'score': game_state['score'],
+        'solved_puzzles': game_state['solved_puzzles'],
+        'game_over': game_state['game_over'],
+        'victory': game_state['victory'],
+        'player_inventory': [item.name for item in game_state['player_inventory']],
+        'rooms': {
+            key: {'items': [CATALOGUE[item_id].name for item_id in room.items],
+                  'puzzle_cleared': room.puzzle is None}
+            for key, room in world.overlay.items()
+        },
+    }, ensure_ascii=False)
+
+
+def json_loads(data):
+    raw = json.loads(data)
+    world = World()
+    for key, room_data in raw.pop('rooms').items():
+        room = world.edit_room(key)
+        room.items[:] = room.items[:0]
+        for name in room_data['items']:
+            room.items.append(intern(name))
+        if room_data['puzzle_cleared']:
+            room.puzzle = None
+    raw['player_inventory'] = Inventory(raw['player_inventory'])
+    raw['world'] = world
+    return raw
+
+
+def measure(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def run(number=2000):
+    results = {}
+    for label, extra in (('typical', 0), ('marathon', 500)):
+        state = typical_state(extra)
+        binary = savegame.dumps(state)
+        text = json_dumps(state).encode('utf-8')
+        results[label] = {
+            'binary_bytes': len(binary),
+            'json_bytes': len(text),
+            'binary_dump_us': measure(lambda: savegame.dumps(state), number),
+            'json_dump_us': measure(lambda: json_dumps(state), number),
+            'binary_load_us': measure(lambda: savegame.loads(binary), number),
+            'json_load_us': measure(lambda: json_loads(text), number),
+        }
+
+    # Постоянное сохранение на каждом ходу: журнал изменений против полного JSON
+    with tempfile.TemporaryDirectory() as tmp:
+        state, _ = engine.new_game()
+        checkpointer = savegame.Checkpointer(Path(tmp) / 'session.lbs')
+        json_path = Path(tmp) / 'session.json'
+
+        def per_turn_binary():
+            for command in SCRIPT:
+                engine.step(state, command, inplace=True)
+                checkpointer.checkpoint(state)
+
+        def per_turn_json():
+            for command in SCRIPT:
+                engine.step(state, command, inplace=True)
+                json_path.write_text(json_dumps(state), encoding='utf-8')
+
+        turns = len(SCRIPT)
+        results['per_turn'] = {
+            'binary_log_us': measure(per_turn_binary, 20) / turns,
+            'json_full_us': measure(per_turn_json, 20) / turns,
+        }
+    return results
+
+
+def main():
+    for label, values in run().items():
+        print(f"[{label}]")
+        for name, value in values.items():
+            print(f"  {name:>16}: {value:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Бенчмарк запуска: сколько стоит импорт игры в свежем процессе.
+
+Запуск (из корня репозитория): python -m benchmarks.bench_startup [бюджет, мс]
+
+Каждая сессия может запускаться отдельным процессом, поэтому время импорта
+labyrinth_game.main платится на каждую игру. Скрипт несколько раз запускает
+python -X importtime, берёт медиану суммарного времени импорта и проверяет,
+что оно укладывается в бюджет, а тяжёлые подсистемы (сервер, numpy,
+пул процессов, сохранения) при запуске не загружаются вовсе.
+
+Затем так же замеряется настоящая точка входа: main() с таблицей рекордов
+по умолчанию и сценарием из stdin — время до первой команды игрока и модули,
+загруженные к этому моменту (таблица рекордов должна открываться не раньше).
+Код выхода 1 — бюджет превышен или загружено лишнее.
+"""
+
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RUNS = 7
+BUDGET_MS = 60.0
+TARGET = 'labyrinth_game.main'
+
+# Модули, которые нужны только отдельным режимам и должны грузиться лениво
+LAZY = (
+    'argparse', 'asyncio', 'numpy', 'concurrent.futures', 'json', 'hashlib', 'typing',
+    'labyrinth_game.server', 'labyrinth_game.savegame', 'labyrinth_game.replay',
+    'labyrinth_game.simulate', 'labyrinth_game.generator', 'labyrinth_game.graph',
+    'labyrinth_game.metrics', 'labyrinth_game.worldfile', 'labyrinth_game.solver',
+    'labyrinth_game.batch', 'labyrinth_game.leaderboard', 'sqlite3',
+)
+# Точке входа argparse нужен, остальное по-прежнему лишнее
+ENTRY_LAZY = tuple(name for name in LAZY if name != 'argparse')
+ENTRY_BUDGET_MS = 80.0
+ENTRY_INPUT = "look\nquit\n"
+ENTRY_MARK = 'entry:'
+
+# Выполняется в свежем процессе: main() как у команды project, а при первой
+# команде сценария в stderr пишется время с начала импорта и список модулей
+ENTRY_SCRIPT = f"""
+import sys, time
+start = time.perf_counter()
+import labyrinth_game.main as game
+process = game.process_command
+
+def first_command(game_state, command, depth=0):
+    game.process_command = process
+    ms = (time.perf_counter() - start) * 1000
+    print({ENTRY_MARK!r} + repr((ms, sorted(sys.modules))), file=sys.stderr)
+    return process(game_state, command, depth)
+
+game.process_command = first_command
+game.main(['--batch'])
+"""
+
+
+def import_times():
+    """{модуль: (собственное время, суммарное время) в мкс} для одного запуска."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {TARGET}'],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def entry_run(directory):
+    """(мс до первой команды, загруженные к ней модули) для одного запуска main()."""
+    env = dict(os.environ, LABYRINTH_SCORES=str(Path(directory) / 'scores.db'))
+    result = subprocess.run(
+        [sys.executable, '-c', ENTRY_SCRIPT], input=ENTRY_INPUT,
+        capture_output=True, text=True, check=True, env=env,
+    )
+    line = next(line for line in result.stderr.splitlines() if line.startswith(ENTRY_MARK))
+    return ast.literal_eval(line[len(ENTRY_MARK):])
+
+
+def entry_point():
+    """Замер точки входа; True — уложились в бюджет и ничего лишнего не загрузили."""
+    with tempfile.TemporaryDirectory() as directory:
+        runs = [entry_run(directory) for _ in range(RUNS)]
+        recorded = (Path(directory) / 'scores.db').exists()
+    total = statistics.median(ms for ms, _ in runs)
+    loaded = [name for name in ENTRY_LAZY if name in runs[-1][1]]
+    print(f"main() до первой команды: медиана {total:.1f} мс (бюджет {ENTRY_BUDGET_MS:.0f} мс)")
+    if loaded:
+        print("Лишние модули до первой команды: " + ", ".join(loaded))
+    if not recorded:
+        print("Итоги игры не записаны в таблицу рекордов")
+    return total <= ENTRY_BUDGET_MS and not loaded and recorded
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+    runs = [import_times() for _ in range(RUNS)]
+    total = statistics.median(run[TARGET][1] for run in runs) / 1000
+
+    last = runs[-1]
+    own = sorted(((name, times[0]) for name, times in last.items()
+                  if name.startswith('labyrinth_game')), key=lambda item: -item[1])
+    print("Собственное время импорта модулей игры (последний запуск):")
+    for name, self_us in own:
+        print(f"  {name:<32} {self_us / 1000:6.2f} мс")
+
+    loaded = [name for name in LAZY if name in last]
+    print(f"\nИмпорт {TARGET}: медиана {total:.1f} мс (бюджет {budget:.0f} мс)")
+    if loaded:
+        print("Лишние модули при запуске: " + ", ".join(loaded))
+    entry_ok = entry_point()
+    sys.exit(0 if total <= budget and not loaded and entry_ok else 1)
+
+
+if __name__ == '__main__':
+    main()
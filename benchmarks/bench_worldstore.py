@@ -0,0 +1,99 @@
+"""Бенчмарк хранилища мира в памяти-отображённом файле: память при росте карты.
+
+Запуск (из корня репозитория): python -m benchmarks.bench_worldstore [максимальный размер]
+
+Для каждого размера лабиринт выгружается в файл мира (worldfile.compile_generated),
+после чего по нему делается случайная прогулка через move_player. Пик памяти
+Python-объектов (tracemalloc) во время прогулки не должен расти с размером
+карты: комнаты декодируются по требованию, в памяти — только LRU горячих.
+Так же замеряется поиск пути (команда path) от входа до последней комнаты:
+индекс всей карты не строится, обход ограничен world.PATH_SEARCH_LIMIT комнатами.
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from labyrinth_game.player_actions import move_player
+from labyrinth_game.renderer import NullRenderer
+from labyrinth_game.rng import mix
+from labyrinth_game.world import PathSearchLimit, get_world, new_game_state
+from labyrinth_game.worldfile import compile_generated, load_world
+
+WALK = 20_000     # шагов случайной прогулки
+JUMPS = 64        # каждые JUMPS шагов игрок переносится в случайную комнату (холодные чтения)
+
+
+def walk(template, size, steps=WALK):
+    game_state = new_game_state(template, seed=1)
+    game_state['renderer'] = NullRenderer()
+    world = get_world(game_state)
+    rooms = template.rooms
+    for step in range(steps):
+        if step % JUMPS == 0:
+            game_state['current_room'] = rooms.key(mix(7, step, 0) % size)
+        exits = list(world.room(game_state['current_room']).exits)
+        move_player(game_state, exits[mix(7, step, 1) % len(exits)])
+        game_state['renderer'].fragments.clear()
+
+
+def find_path(template, size):
+    """Время и пик памяти поиска пути от входа до последней комнаты карты."""
+    world = get_world(new_game_state(template, seed=1))
+    goal = template.rooms.key(size - 1)
+
+    def search():
+        try:
+            world.path('entrance', goal)
+        except PathSearchLimit:
+            pass   # цель дальше предела поиска — тоже ответ команды path
+
+    start = time.perf_counter()
+    search()
+    elapsed = time.perf_counter() - start
+    # Память — отдельным прогоном: под tracemalloc время не показательно
+    tracemalloc.start()
+    search()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def measure(size, directory):
+    path = Path(directory) / f'maze-{size}.lbw'
+    start = time.perf_counter()
+    compile_generated(size, 42, path)
+    compiled = time.perf_counter() - start
+
+    template = load_world(path)
+    start = time.perf_counter()
+    walk(template, size)
+    walked = time.perf_counter() - start
+
+    tracemalloc.start()
+    walk(template, size, WALK // 4)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    path_time, path_peak = find_path(template, size)
+    template.rooms.close()
+    return compiled, path.stat().st_size, walked, peak, path_time, path_peak
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{'комнат':>10} {'сборка, с':>10} {'файл, МБ':>9} {'мкс/ход':>8} {'пик памяти, КБ':>15} "
+          f"{'путь, с':>8} {'пик пути, КБ':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        size = 1_000
+        while size <= limit:
+            compiled, file_size, walked, peak, path_time, path_peak = measure(size, directory)
+            print(f"{size:>10} {compiled:>10.2f} {file_size / 2**20:>9.1f} "
+                  f"{walked / WALK * 1e6:>8.1f} {peak / 1024:>15.1f} "
+                  f"{path_time:>8.2f} {path_peak / 1024:>13.1f}")
+            size *= 10
+
+
+if __name__ == "__main__":
+    main()
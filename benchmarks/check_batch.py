@@ -0,0 +1,112 @@
+"""Сверка пакетной среды (batch.py) с обычной игрой и замер её скорости.
+
+Запуск (из корня репозитория): python -m benchmarks.check_batch [игр] [шагов]
+
+Каждая игра пакета повторяется через process_command с тем же зерном и
+равносильными командами (BatchEnv.command); после каждого шага сравниваются
+комната, шаги, счёт, решённые загадки, конец игры и победа, инвентарь (по
+порядку), предметы на полу и оставшиеся загадки всех комнат. Действия
+случайные, так что в прогоне встречаются и ловушки, и монеты, и победы.
+Скрипт завершается с кодом 1 при первом расхождении; без numpy проверка
+пропускается с кодом 0.
+"""
+
+import sys
+import time
+from collections import deque
+
+from labyrinth_game import batch, rng
+from labyrinth_game.inventory import get_inventory
+from labyrinth_game.main import process_command
+from labyrinth_game.renderer import NullRenderer
+from labyrinth_game.world import get_world, new_game_state
+
+SPEED_GAMES = 100_000
+SPEED_STEPS = 200
+
+
+def scalar_games(env):
+    states = []
+    for seed in env.seeds.tolist():
+        game_state = new_game_state(seed=seed)
+        game_state['renderer'] = NullRenderer()
+        game_state['answers'] = deque()
+        states.append(game_state)
+    return states
+
+
+def difference(env, game, game_state):
+    """Первое расхождение игры game с game_state (строка) или None."""
+    fields = (
+        ('комната', env.room_key(game), game_state['current_room']),
+        ('шаги', int(env.steps[game]), game_state.get('steps_taken', 0)),
+        ('счёт', int(env.score[game]), game_state.get('score', 0)),
+        ('загадки', int(env.solved[game]), game_state.get('solved_puzzles', 0)),
+        ('конец игры', bool(env.game_over[game]), bool(game_state.get('game_over'))),
+        ('победа', bool(env.victory[game]), bool(game_state.get('victory'))),
+        ('инвентарь', env.inventory_ids(game), get_inventory(game_state).ids().tolist()),
+    )
+    for name, got, expected in fields:
+        if got != expected:
+            return f"{name}: {got!r} вместо {expected!r}"
+    world = get_world(game_state)
+    for node, key in enumerate(env.keys):
+        room = world.room(key)
+        if env.room_ids(game, node) != list(room.items):
+            return f"предметы в {key}: {env.room_ids(game, node)} вместо {list(room.items)}"
+        if bool(env.puzzle[game, node]) != (room.puzzle is not None):
+            return f"загадка в {key}: {bool(env.puzzle[game, node])}"
+    return None
+
+
+def check(games, steps):
+    np = rng.numpy()
+    env = batch.BatchEnv(games, seeds=np.arange(games, dtype=np.uint64) * 7919 + 1)
+    states = scalar_games(env)
+    choices = np.random.default_rng(0)
+    scalar = 0.0
+    for step in range(steps):
+        actions = choices.integers(0, len(batch.ACTIONS), games)
+        commands = [env.command(game, action) for game, action in enumerate(actions.tolist())]
+        env.step(actions)
+        for game, (game_state, command) in enumerate(zip(states, commands)):
+            start = time.perf_counter()
+            process_command(game_state, command)
+            scalar += time.perf_counter() - start
+            problem = difference(env, game, game_state)
+            if problem:
+                print(f"FAIL игра {game} (зерно {int(env.seeds[game])}), шаг {step}, "
+                      f"команда {command!r}: {problem}")
+                return False
+    print(f"ok: {games} игр × {steps} шагов совпадают с process_command "
+          f"(побед {int(env.victory.sum())}, гибелей {int((env.game_over & ~env.victory).sum())})")
+    print(f"process_command: {games * steps / scalar:,.0f} шагов/с")
+    return True
+
+
+def speed():
+    np = rng.numpy()
+    env = batch.BatchEnv(SPEED_GAMES)
+    actions = np.random.default_rng(1).integers(0, len(batch.ACTIONS), (SPEED_STEPS, SPEED_GAMES))
+    start = time.perf_counter()
+    for row in actions:
+        env.step(row)
+    elapsed = time.perf_counter() - start
+    print(f"пакет: {SPEED_GAMES * SPEED_STEPS / elapsed:,.0f} шагов/с "
+          f"({SPEED_GAMES} игр × {SPEED_STEPS} шагов за {elapsed:.2f} с)")
+
+
+def main():
+    if rng.numpy() is None:
+        # numpy — необязательная зависимость (extra batch), без него среда недоступна
+        print("пропуск: нужен numpy (poetry install --extras batch)")
+        sys.exit(0)
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    passed = check(games, steps)
+    speed()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
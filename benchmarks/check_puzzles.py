@@ -0,0 +1,82 @@
+"""Проверка ответов на загадки: нормализация, числа цифрами и словами, чужие цифры.
+
+Запуск (из корня репозитория): python -m benchmarks.check_puzzles
+
+Таблица случаев сверяется с puzzles.is_correct, затем загадка зала и код
+сундука решаются через engine.step с ответами из цифр других алфавитов
+("²", "١٠"): игра должна счесть их неверными, а не упасть.
+Скрипт завершается с кодом 1 при любом расхождении.
+"""
+
+import sys
+
+from labyrinth_game import engine
+from labyrinth_game.puzzles import is_correct
+
+# (ответ загадки, ответ игрока, должен ли подойти)
+CASES = (
+    ('10', '10', True),
+    ('10', '010', True),
+    ('10', ' Десять ', True),
+    ('10', 'десяти', True),
+    ('10', 'десятью', True),
+    ('10', '11', False),
+    ('десять', '10', True),
+    ('1000', 'тысяча', True),
+    ('шаг шаг шаг', 'Шаг   шаг шаг', True),
+    ('ёлка', 'елка', True),
+    (['вода', 'water'], 'WATER', True),
+    (['вода', 'water'], 'огонь', False),
+    (5, 'пять', True),
+    ('10', '١٠', False),
+    ('10', '¹⁰', False),
+    ('2', '²', False),
+    ('²', '²', True),
+    ('٣', '٣', True),
+)
+
+# (название, комната, команда, ответы на вопросы команды); в комнату
+# сокровищ игрок ставится сразу — без ключа, чтобы сундук спросил код
+SCENARIOS = (
+    ("загадка зала", 'hall', 'solve ²', ()),
+    ("загадка зала, ответ вопросом", 'hall', 'solve', ('١٠',)),
+    ("код сундука", 'treasure_room', 'solve', ('да', '¹⁰')),
+)
+
+
+def main():
+    passed = True
+    for answer, reply, expected in CASES:
+        try:
+            got = is_correct(answer, reply)
+        except ValueError as error:
+            got = f"ValueError: {error}"
+        if got is not expected:
+            passed = False
+            print(f"FAIL ответ {answer!r}, ввод {reply!r}: {got} вместо {expected}")
+    print(f"{'ok' if passed else 'FAIL'}: {len(CASES)} случаев is_correct")
+
+    for name, room, command, answers in SCENARIOS:
+        state, _ = engine.new_game(seed=1)
+        state['current_room'] = room
+        try:
+            state, events = engine.step(state, command, answers=answers)
+        except ValueError as error:
+            passed = False
+            print(f"FAIL {name}: {command!r} {answers!r} -> ValueError: {error}")
+            continue
+        kinds = {event.kind for event in events}
+        if state.get('victory') or kinds & {'puzzle_solved', 'chest_opened'}:
+            passed = False
+            print(f"FAIL {name}: чужие цифры засчитаны как верный ответ")
+        elif not kinds & {'puzzle_failed', 'chest_failed'}:
+            passed = False
+            print(f"FAIL {name}: ответ не проверялся ({', '.join(sorted(kinds))})")
+        else:
+            print(f"ok: {name}")
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
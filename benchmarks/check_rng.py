@@ -0,0 +1,120 @@
+"""Проверка качества счётного генератора rng и скорости пакетного режима.
+
+Запуск (из корня репозитория): python -m benchmarks.check_rng [число бросков]
+
+Критерий хи-квадрат проверяет равномерность бросков для разных модулей,
+назначений и зёрен, а также независимость соседних шагов, соседних зёрен
+и разных назначений (пары бросков должны равномерно заполнять таблицу).
+Для сравнения те же проверки проходит прежняя формула sin(seed * 12.9898).
+Скрипт завершается с кодом 1, если генератор rng не прошёл хотя бы одну.
+"""
+
+import math
+import sys
+import time
+
+from labyrinth_game import rng
+
+# Порог значимости 0.001 (z-квантиль нормального распределения)
+Z_CRITICAL = 3.09
+
+
+def legacy_pseudo_random(seed, modulo):
+    """Прежняя utils.pseudo_random — только для сравнения."""
+    x = math.sin(seed * 12.9898) * 43758.5453
+    return int((x - math.floor(x)) * modulo)
+
+
+def chi_square_critical(df):
+    """Критическое значение хи-квадрат (приближение Уилсона–Хилферти)."""
+    k = 2 / (9 * df)
+    return df * (1 - k + Z_CRITICAL * math.sqrt(k)) ** 3
+
+
+def chi_square(counts):
+    expected = sum(counts) / len(counts)
+    return sum((count - expected) ** 2 for count in counts) / expected
+
+
+def uniform(values, modulo):
+    counts = [0] * modulo
+    for value in values:
+        counts[value] += 1
+    return chi_square(counts), modulo - 1
+
+
+def pairs(first, second, modulo):
+    counts = [0] * (modulo * modulo)
+    for a, b in zip(first, second):
+        counts[a * modulo + b] += 1
+    return chi_square(counts), modulo * modulo - 1
+
+
+def checks(draw, n):
+    """draw(seed, step, purpose, modulo) -> int; возвращает [(название, хи2, df)]."""
+    results = []
+    for modulo in (2, 3, 10, 97):
+        values = [draw(12345, step, rng.EVENT_CHANCE, modulo) for step in range(n)]
+        results.append((f"равномерность, модуль {modulo}", *uniform(values, modulo)))
+    # Большие номера шагов: здесь у sin() кончается точность
+    values = [draw(12345, 10**9 + step * 7919, rng.EVENT_CHANCE, 10) for step in range(n)]
+    results.append(("равномерность, шаги > 10^9", *uniform(values, 10)))
+
+    steps = [draw(1, step, rng.EVENT_CHANCE, 10) for step in range(n + 1)]
+    results.append(("соседние шаги", *pairs(steps, steps[1:], 10)))
+    seeds = [[draw(seed, step, rng.EVENT_CHANCE, 10) for step in range(n)] for seed in (1, 2)]
+    results.append(("соседние зёрна, один шаг", *pairs(*seeds, 10)))
+    purposes = [[draw(1, step, purpose, 10) for step in range(n)]
+                for purpose in (rng.EVENT_CHANCE, rng.EVENT_KIND)]
+    results.append(("разные назначения, один шаг", *pairs(*purposes, 10)))
+    # Вторая ловушка на том же шаге (rng.next_draw) не должна повторять первую
+    draws = [[draw(1, step + (index << rng.DRAW_SHIFT), rng.TRAP_ITEM, 10) for step in range(n)]
+             for index in (0, 1)]
+    results.append(("повторный бросок на шаге", *pairs(*draws, 10)))
+    return results
+
+
+def report(title, results):
+    print(title)
+    passed = True
+    for name, statistic, df in results:
+        ok = statistic <= chi_square_critical(df)
+        passed &= ok
+        print(f"  {'ok ' if ok else 'FAIL'} {name:<32} хи2 = {statistic:12.1f}  (df = {df})")
+    return passed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    passed = report("rng.roll", checks(rng.roll, n))
+    # Прежняя формула зависела только от шага: зерно и назначение ей не передать
+    report("прежняя pseudo_random (для сравнения)",
+           checks(lambda seed, step, purpose, modulo: legacy_pseudo_random(step, modulo), n))
+
+    seed = rng.new_seed()
+    start = time.perf_counter()
+    for step in range(n):
+        legacy_pseudo_random(step, 10)
+    legacy = (time.perf_counter() - start) / n
+    start = time.perf_counter()
+    for step in range(n):
+        rng.roll(seed, step, rng.EVENT_CHANCE, 10)
+    single = (time.perf_counter() - start) / n
+    rng.numpy()  # импорт numpy не должен попасть в замер
+    start = time.perf_counter()
+    batch = rng.rolls(1, range(n), rng.EVENT_CHANCE, 10)
+    batched = (time.perf_counter() - start) / n
+    mode = "numpy" if rng.numpy() is not None else "без numpy"
+    print(f"\nroll: {single * 1e9:.0f} нс/бросок, rolls ({mode}): {batched * 1e9:.0f} нс/бросок, "
+          f"прежняя pseudo_random: {legacy * 1e9:.0f} нс/бросок")
+    if [int(value) for value in batch] != [rng.roll(1, step, rng.EVENT_CHANCE, 10)
+                                            for step in range(n)]:
+        print("FAIL: rolls() не совпадает с roll()")
+        passed = False
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""Проверка сетевого режима: GameServer с несколькими клиентами на asyncio.
+
+Запуск (из корня репозитория): python -m benchmarks.check_server
+
+Сервер поднимается в этом же процессе на свободном TCP-порту (и на
+Unix-сокете, где он есть), клиенты подключаются одновременно и проверяют:
+загадку с вопросом и ответом следующей строкой, слишком длинную строку,
+закрытие сессии по бездействию и противодавление — клиент, который шлёт
+команды и не читает ответы, не раздувает буфер записи сервера.
+Скрипт завершается с кодом 1 при любом расхождении.
+"""
+
+import asyncio
+import socket
+import sys
+import tempfile
+from pathlib import Path
+
+from labyrinth_game.server import MAX_LINE, PROMPT, WRITE_BUFFER_HIGH, GameServer
+
+CLIENTS = 8          # одновременных игроков в сценарии с загадкой
+FLOOD = 2000         # команд help (~2.7 КБ ответа), которые шлёт нечитающий клиент
+IDLE_TIMEOUT = 0.5   # бездействие в сценарии закрытия сессии, с
+TIMEOUT = 10.0       # сколько клиент ждёт ответа, с
+
+
+class _TrackedServer(GameServer):
+    """GameServer, который запоминает writer'ы соединений и считает отправленные ответы."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writers = []
+        self.sent = 0   # отправленных ответов
+
+    async def handle(self, reader, writer):
+        self.writers.append(writer)
+        await super().handle(reader, writer)
+
+    async def _send(self, writer, texts, prompt=True):
+        self.sent += 1
+        return await super()._send(writer, texts, prompt)
+
+
+async def _start(server, address):
+    """Запускает server; address 'tcp' — свободный порт на 127.0.0.1."""
+    if address == 'tcp':
+        listener = await server.start('127.0.0.1:0')
+        port = listener.sockets[0].getsockname()[1]
+
+        async def connect(small_window=False):
+            sock = socket.socket()
+            if small_window:
+                # Маленькое окно приёма, иначе ответы осядут в буферах ядра
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            sock.setblocking(False)
+            await asyncio.get_running_loop().sock_connect(sock, ('127.0.0.1', port))
+            return await asyncio.open_connection(sock=sock)
+        return listener, connect
+    listener = await server.start(address)
+    return listener, lambda small_window=False: asyncio.open_unix_connection(address[5:])
+
+
+async def _reply(reader):
+    """Текст до очередного приглашения (или до конца соединения)."""
+    try:
+        data = await asyncio.wait_for(reader.readuntil(PROMPT.encode()), TIMEOUT)
+    except asyncio.IncompleteReadError as error:
+        data = error.partial
+    return data.decode('utf-8')
+
+
+async def _command(reader, writer, line):
+    writer.write(line.encode('utf-8') + b'\n')
+    await writer.drain()
+    return await _reply(reader)
+
+
+async def puzzle_client(connect):
+    """Загадка зала: solve без ответа задаёт вопрос, ответ приходит следующей строкой."""
+    reader, writer = await connect()
+    try:
+        await _reply(reader)
+        await _command(reader, writer, 'north')
+        question = await _command(reader, writer, 'solve')
+        answer = await _command(reader, writer, '10')
+        again = await _command(reader, writer, 'solve')
+        final = await _command(reader, writer, 'quit')
+    finally:
+        writer.close()
+    errors = []
+    if 'ЗАГАДКА' not in question or 'Ваш ответ' not in question:
+        errors.append(f"нет вопроса загадки: {question!r}")
+    if 'Верно' not in answer or 'ЗАГАДКА' in answer:
+        errors.append(f"ответ не засчитан или вопрос показан дважды: {answer!r}")
+    if 'ЗАГАДКА' in again:
+        errors.append("решённая загадка задана снова")
+    if final.endswith(PROMPT):
+        errors.append("после quit сервер ждёт ещё команду")
+    return errors
+
+
+async def long_line_client(connect):
+    """Строка длиннее MAX_LINE отклоняется, а сессия продолжается."""
+    reader, writer = await connect()
+    try:
+        await _reply(reader)
+        rejected = await _command(reader, writer, 'x' * (4 * MAX_LINE))
+        after = await _command(reader, writer, 'look')
+    finally:
+        writer.close()
+    errors = []
+    if 'Слишком длинная' not in rejected:
+        errors.append(f"длинная строка не отклонена: {rejected!r}")
+    if 'ENTRANCE' not in after or 'Неизвестная команда' in after:
+        errors.append(f"после длинной строки сессия сломана: {after!r}")
+    return errors
+
+
+async def idle_client(connect, server):
+    """Молчащий клиент получает прощание и закрытие, сессия удаляется."""
+    reader, writer = await connect()
+    try:
+        await _reply(reader)
+        rest = await asyncio.wait_for(reader.read(), TIMEOUT)
+    finally:
+        writer.close()
+    await asyncio.sleep(0.05)
+    errors = []
+    if 'бездействия' not in rest.decode('utf-8'):
+        errors.append(f"нет сообщения о бездействии: {rest!r}")
+    if server.sessions:
+        errors.append(f"сессии не удалены: {sorted(server.sessions)}")
+    return errors
+
+
+async def flood_client(connect, server):
+    """Клиент шлёт FLOOD команд, не читая ответов: сервер ждёт его, а не копит ответы."""
+    reader, writer = await connect(small_window=True)
+    writer.write(b'help\n' * FLOOD + b'quit\n')
+    await writer.drain()
+    await asyncio.sleep(0.5)
+    stalled_at = server.sent
+    buffered = server.writers[-1].transport.get_write_buffer_size()
+
+    try:
+        rest = await asyncio.wait_for(reader.read(), TIMEOUT)
+    finally:
+        writer.close()
+    errors = []
+    # Ответ на одну команду может лечь в буфер сверх порога целиком
+    if buffered > WRITE_BUFFER_HIGH + 4 * MAX_LINE:
+        errors.append(f"буфер записи сервера вырос до {buffered} байт")
+    if stalled_at >= FLOOD:
+        errors.append("сервер обработал все команды, хотя клиент не читал ответы")
+    if 'Спасибо за игру' not in rest.decode('utf-8', errors='replace'):
+        errors.append("после чтения ответов не дошёл итог игры")
+    return errors, stalled_at
+
+
+async def run(address):
+    errors = {}
+    server = _TrackedServer(idle_timeout=TIMEOUT)
+    listener, connect = await _start(server, address)
+    async with listener:
+        results = await asyncio.gather(
+            *(puzzle_client(connect) for _ in range(CLIENTS)),
+            long_line_client(connect))
+        errors["загадка, вопрос и ответ"] = [e for r in results[:CLIENTS] for e in r]
+        errors["слишком длинная строка"] = results[CLIENTS]
+        server.sent = 0
+        flood_errors, stalled_at = await flood_client(connect, server)
+        errors[f"противодавление (до чтения {stalled_at} ответов из {FLOOD})"] = flood_errors
+
+    idle_server = GameServer(idle_timeout=IDLE_TIMEOUT)
+    listener, connect = await _start(idle_server, address)
+    async with listener:
+        errors["закрытие по бездействию"] = await idle_client(connect, idle_server)
+    return errors
+
+
+def main():
+    addresses = ['tcp']
+    tmp = None
+    if hasattr(socket, 'AF_UNIX'):
+        tmp = tempfile.TemporaryDirectory()
+        addresses.append(f"unix:{Path(tmp.name) / 'labyrinth.sock'}")
+
+    passed = True
+    for address in addresses:
+        label = 'tcp' if address == 'tcp' else 'unix'
+        for name, errors in asyncio.run(run(address)).items():
+            print(f"{'FAIL' if errors else 'ok'}: {label}, {name}")
+            for error in errors:
+                print(f"    {error}")
+            passed = passed and not errors
+    if tmp is not None:
+        tmp.cleanup()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Сверка решателя с настоящей игрой: маршруты решателя проходятся через process_command.
+
+Запуск (из корня репозитория): python -m benchmarks.check_solver [число карт]
+
+Для стандартной карты, маленькой карты с односторонним переходом и
+нескольких сгенерированных лабиринтов кратчайший маршрут и маршрут на
+наибольший счёт выполняются командами игрока. Где наибольший счёт найден
+точным перебором, он сверяется и с жадной оценкой: она не может быть лучше. Игра
+должна закончиться победой с тем же счётом и числом шагов, что обещал
+решатель. Случайная ловушка может отнять ключ, поэтому прогоны, где она
+сработала, повторяются с другим зерном сессии.
+Скрипт завершается с кодом 1 при любом расхождении.
+"""
+
+import sys
+from collections import deque
+
+from labyrinth_game.generator import GeneratedRooms
+from labyrinth_game.main import process_command
+from labyrinth_game.solver import Solver
+from labyrinth_game.world import Template, new_game_state
+
+SEEDS = range(50)   # зёрна сессии, перебираемые до прогона без ловушек
+
+# Карта с односторонним переходом: ближайшая загадка (side) уводит к сундуку
+# без возврата, так что жадный обход теряет дальнюю загадку (far)
+ONE_WAY = {
+    'entrance': {'description': "Развилка.", 'exits': {'north': 'side', 'west': 'corridor'},
+                 'items': ['rusty_key']},
+    'side': {'description': "Дверь за спиной захлопнулась.", 'exits': {'north': 'treasure_room'},
+             'items': [], 'puzzle': {'question': "Два плюс три?", 'answer': '5', 'points': 5}},
+    'corridor': {'description': "Коридор.", 'exits': {'west': 'far', 'east': 'entrance'}, 'items': []},
+    'far': {'description': "Тупик.", 'exits': {'east': 'corridor'}, 'items': [],
+            'puzzle': {'question': "Десять плюс десять?", 'answer': '20', 'points': 20}},
+    'treasure_room': {'description': "Сокровищница.", 'exits': {'south': 'side'},
+                      'items': ['treasure_chest'],
+                      'puzzle': {'question': "Код?", 'answer': '7', 'points': 25}},
+}
+
+
+def play(template, route):
+    """(победа, счёт, шаги) прохождения маршрута или None, если мешали ловушки."""
+    for seed in SEEDS:
+        game_state = new_game_state(template, seed=seed)
+        events = game_state['events'] = []
+        game_state['answers'] = deque()
+        for command in route.commands:
+            process_command(game_state, command)
+        if not any(event.kind == 'trap' for event in events):
+            return game_state['victory'], game_state['score'], game_state['steps_taken']
+    return None
+
+
+def check(name, template):
+    solver = Solver(template)
+    failures = 0
+    for label, route in (('кратчайший', solver.min_steps()), ('наибольший счёт', solver.max_score_route())):
+        result = play(template, route)
+        expected = (True, route.score, route.steps)
+        if result is None:
+            status = "пропущен: во всех прогонах срабатывала ловушка"
+        elif result == expected:
+            status = "ок"
+        else:
+            status = f"РАСХОЖДЕНИЕ (игра: победа, счёт, шаги = {result})"
+            failures += 1
+        print(f"{name:<24} {label:<16} шагов {route.steps:>6}, очков {route.score:>7}: {status}")
+    richest = solver.max_score_route()
+    if richest.exact:
+        # Точный перебор не может проиграть жадной эвристике
+        greedy = solver.greedy_score_route()
+        if (greedy.score, -greedy.steps) > (richest.score, -richest.steps):
+            failures += 1
+            print(f"{name:<24} ОШИБКА: жадный маршрут лучше точного ({greedy.score} очков, "
+                  f"{greedy.steps} шагов)")
+        else:
+            print(f"{name:<24} {'жадная оценка':<16} шагов {greedy.steps:>6}, очков {greedy.score:>7}")
+    return failures
+
+
+def main():
+    maps = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    failures = check('стандартная карта', None)
+    failures += check('односторонняя карта', Template(ONE_WAY))
+    for seed in range(maps):
+        size = 50 * (seed + 1) ** 2
+        failures += check(f'лабиринт {size}/{seed}', Template(GeneratedRooms(size, seed)))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
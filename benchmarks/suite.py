@@ -0,0 +1,295 @@
+"""Набор бенчмарков горячих путей игры с сохранением результатов и сравнением с базой.
+
+Запуск (из корня репозитория):
+
+    make bench                 # прогон и сравнение с benchmarks/baseline.json
+    make bench-baseline        # сохранить текущие результаты как базу
+    python -m benchmarks.suite --filter move --threshold 5
+
+Каждый замер — лучшее из нескольких повторов timeit, в микросекундах на
+вызов. Вывод игры уходит в NullRenderer, ответы берутся из очереди
+game_state['answers'], а stdin и stdout на время прогона подменены, так что
+терминал не участвует в замерах. Если замер медленнее базы больше чем на
+threshold процентов, процесс завершается с кодом 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import timeit
+from collections import deque
+from pathlib import Path
+
+from labyrinth_game import puzzles
+from labyrinth_game.constants import ROOMS, TRIGGERS
+from labyrinth_game.inventory import get_inventory
+from labyrinth_game.items import find_id
+from labyrinth_game.main import process_command
+from labyrinth_game.player_actions import _room_texts, describe_current_room, move_player, take_item, use_item
+from labyrinth_game.renderer import NullRenderer
+from labyrinth_game.rng import EVENT_CHANCE, roll, session_roll
+from labyrinth_game.utils import solve_puzzle
+from labyrinth_game.world import Template, World, get_world, new_game_state
+
+REPEAT = 5
+DEFAULT_THRESHOLD = 10.0   # допустимое замедление, %
+BIG_INVENTORY = 1000
+MANY_TRIGGERS = 10000
+
+# Смесь команд, похожая на реальную игру (без перемещений, чтобы состояние не менялось)
+COMMAND_MIX = ["look", "инвентарь", "score", "очки", "help", "xyzzy", "", "осмотреться"]
+
+# Полное прохождение до победы: (команда, ответы на вопросы)
+PLAYTHROUGH = [
+    ("take torch", ()), ("east", ()), ("take rusty_key", ()), ("take coin", ()),
+    ("solve шаг шаг шаг", ()), ("west", ()), ("north", ()), ("solve 10", ()), ("west", ()),
+    ("take ancient_book", ()), ("north", ()), ("take sword", ()), ("take bronze_box", ()),
+    ("use bronze_box", ()), ("south", ()), ("east", ()), ("north", ()), ("open", ("да", "10")),
+]
+
+# Ответы игроков на загадку "10": верные, неверные и в разных написаниях
+REPLIES = ["10", "десять", "Десяти", "010", "  десятью ", "9", "одиннадцать", "не знаю"]
+
+# Имя замера -> (функция подготовки, число вызовов в повторе)
+CASES = {}
+
+
+def case(name, number):
+    """Регистрирует подготовку замера: она возвращает функцию без аргументов."""
+    def decorator(setup):
+        CASES[name] = (setup, number)
+        return setup
+    return decorator
+
+
+def quiet_state(room='entrance', seed=0):
+    """Сессия без терминала: вывод в NullRenderer, ответы из пустой очереди."""
+    game_state = new_game_state(seed=seed)
+    game_state['renderer'] = NullRenderer()
+    game_state['answers'] = deque()
+    game_state['current_room'] = room
+    return game_state
+
+
+@case('dispatch', 2000)
+def bench_dispatch():
+    game_state = quiet_state()
+
+    def run():
+        for command in COMMAND_MIX:
+            process_command(game_state, command)
+    return run
+
+
+@case('move_treasure_key', 5000)
+def bench_move():
+    # Переход в treasure_room проверяет ключ по инвентарю; туда и обратно
+    game_state = quiet_state('hall')
+    get_inventory(game_state).append('rusty_key')
+
+    def run():
+        move_player(game_state, 'north')
+        move_player(game_state, 'south')
+    return run
+
+
+@case('take_use_big_inventory', 5000)
+def bench_take_use():
+    game_state = quiet_state()
+    inventory = get_inventory(game_state)
+    for index in range(BIG_INVENTORY):
+        inventory.append(f"trinket_{index}")
+    world = get_world(game_state)
+    torch = find_id('torch')
+
+    def run():
+        take_item(game_state, 'torch')
+        use_item(game_state, 'torch')
+        inventory.take('torch')
+        world.edit_room('entrance').items.append(torch)
+    return run
+
+
+@case('move_many_triggers', 5000)
+def bench_many_triggers():
+    # Тысячи правил на карте: при входе проверяются только правила этой комнаты
+    rules = [*TRIGGERS, *({'on': 'enter', 'room': f'room_{index}', 'effects': [{'say': "..."}]}
+                          for index in range(MANY_TRIGGERS))]
+    game_state = quiet_state('hall')
+    game_state['world'] = World(Template(ROOMS, rules))
+    get_inventory(game_state).append('rusty_key')
+
+    def run():
+        move_player(game_state, 'north')
+        move_player(game_state, 'south')
+    return run
+
+
+@case('describe_room', 20000)
+def bench_describe():
+    game_state = quiet_state('library')
+
+    def run():
+        describe_current_room(game_state)
+    return run
+
+
+@case('describe_room_cold', 5000)
+def bench_describe_cold():
+    game_state = quiet_state('library')
+
+    def run():
+        _room_texts.clear()
+        describe_current_room(game_state)
+    return run
+
+
+@case('solve_puzzle_wrong', 5000)
+def bench_solve():
+    game_state = quiet_state('hall')
+
+    def run():
+        solve_puzzle(game_state, 'не знаю')
+    return run
+
+
+@case('answer_matching', 5000)
+def bench_answers():
+    def run():
+        for reply in REPLIES:
+            puzzles.is_correct('10', reply)
+    return run
+
+
+@case('rng_roll', 50000)
+def bench_roll():
+    # Замена прежнего pseudo_random: бросок по (зерну, шагу, назначению)
+    def run():
+        roll(42, 7, EVENT_CHANCE, 10)
+    return run
+
+
+@case('rng_session_roll', 50000)
+def bench_session_roll():
+    game_state = quiet_state()
+
+    def run():
+        session_roll(game_state, EVENT_CHANCE, 10)
+    return run
+
+
+@case('playthrough', 200)
+def bench_playthrough():
+    def run():
+        game_state = quiet_state(seed=1)
+        answers = game_state['answers']
+        for command, asked in PLAYTHROUGH:
+            answers.extend(asked)
+            process_command(game_state, command)
+        if not game_state['victory']:
+            raise RuntimeError("сценарий прохождения больше не приводит к победе")
+    return run
+
+
+def measure(setup, number, repeat=REPEAT):
+    """Лучшее и медианное время одного вызова, мкс."""
+    run = setup()
+    run()  # прогрев: ленивые таблицы, кэши описаний
+    times = sorted(timeit.repeat(run, number=number, repeat=repeat))
+    return {'us': times[0] / number * 1e6, 'median_us': times[len(times) // 2] / number * 1e6,
+            'number': number}
+
+
+def run_suite(names=None, scale=1.0):
+    """Прогоняет замеры (все или перечисленные) и возвращает словарь результатов."""
+    results = {}
+    # Игра не должна ни печатать, ни ждать клавиатуры посреди замера
+    with contextlib.redirect_stdout(io.StringIO()), _stdin(io.StringIO()):
+        for name, (setup, number) in CASES.items():
+            if names is None or name in names:
+                results[name] = measure(setup, max(1, int(number * scale)))
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+@contextlib.contextmanager
+def _stdin(stream):
+    saved, sys.stdin = sys.stdin, stream
+    try:
+        yield
+    finally:
+        sys.stdin = saved
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """[(замер, было мкс, стало мкс, изменение %)] для замеров, замедлившихся больше threshold %."""
+    regressions = []
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        change = (result['us'] / old['us'] - 1) * 100
+        if change > threshold:
+            regressions.append((name, old['us'], result['us'], change))
+    return regressions
+
+
+def report(current, baseline=None):
+    lines = [f"{'замер':<24} {'мкс/вызов':>12} {'медиана':>12} {'база':>12} {'изменение':>10}"]
+    for name, result in current['results'].items():
+        line = f"{name:<24} {result['us']:>12.2f} {result['median_us']:>12.2f}"
+        old = baseline['results'].get(name) if baseline else None
+        if old is not None:
+            line += f" {old['us']:>12.2f} {(result['us'] / old['us'] - 1) * 100:>+9.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей игры")
+    parser.add_argument('--output', metavar='PATH', help="сохранить результаты в JSON")
+    parser.add_argument('--baseline', metavar='PATH', help="JSON с базовыми результатами")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, metavar='PCT',
+                        help="допустимое замедление относительно базы, %% (по умолчанию 10)")
+    parser.add_argument('--filter', metavar='TEXT', help="только замеры, в имени которых есть TEXT")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="множитель числа вызовов (меньше — быстрее, но шумнее)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = [name for name in CASES if args.filter in name] if args.filter else None
+    current = run_suite(names, args.scale)
+
+    baseline = None
+    if args.baseline:
+        path = Path(args.baseline)
+        if path.exists():
+            baseline = json.loads(path.read_text(encoding='utf-8'))
+        else:
+            print(f"Базы {path} нет — сравнение пропущено (make bench-baseline)")
+    print(report(current, baseline))
+
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(current, indent=2) + "\n", encoding='utf-8')
+
+    if baseline is not None:
+        regressions = compare(baseline, current, args.threshold)
+        for name, old, new, change in regressions:
+            print(f"ЗАМЕДЛЕНИЕ {name}: {old:.2f} -> {new:.2f} мкс ({change:+.1f}% > {args.threshold:g}%)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""Модуль для пакетной среды: тысячи игр в массивах numpy, один шаг — один вызов.
+
+Состояние N игр хранится «структурой массивов»: номер текущей комнаты,
+шаги, счёт, число решённых загадок, флаги конца игры и победы — по
+массиву на всё; инвентари — матрица id предметов [игра, ячейка] в порядке
+получения (ловушка теряет предмет по номеру, как Inventory.pop), предметы
+на полу — [игра, комната, ячейка], оставшиеся загадки — [игра, комната].
+
+step(actions) продвигает все игры сразу: actions — массив номеров
+действий (ACTIONS), по одному на игру. Правила те же, что у
+move_player, take_item, use_item, solve_puzzle, attempt_open_treasure и
+стандартных триггеров (constants.TRIGGERS: монета, шорох, ловушка; карты
+со своими триггерами среда не принимает), а случайности берутся из того
+же счётного генератора (rng.game_rolls), поэтому игра номер i идёт шаг в шаг с
+process_command(game_state, env.command(i, action)) при том же зерне.
+Сверка с обычной игрой: python -m benchmarks.check_batch
+
+Каждая игра хранит свою копию предметов и загадок всех комнат, поэтому
+память растёт как N × число комнат: среда рассчитана на стандартную карту
+и карты до нескольких тысяч комнат. Нужен numpy (extra batch).
+"""
+
+from labyrinth_game import rng, triggers
+from labyrinth_game.items import CATALOGUE, intern, reward_items
+from labyrinth_game.rng import DRAW_SHIFT, EVENT_CHANCE, EVENT_KIND, TRAP_DAMAGE, TRAP_ITEM
+from labyrinth_game.utils import DEFAULT_REWARDS
+from labyrinth_game.world import as_template
+
+# Номера действий (их команды — в BatchEnv.command)
+ACTIONS = ('north', 'south', 'west', 'east', 'take', 'use_box', 'solve', 'solve_wrong', 'open')
+NORTH, SOUTH, WEST, EAST, TAKE, USE_BOX, SOLVE, SOLVE_WRONG, OPEN = range(len(ACTIONS))
+DIRECTIONS = ACTIONS[:4]
+
+START = 'entrance'
+TRAP_ROOM = 'trap_room'
+TREASURE_ROOM = 'treasure_room'
+WRONG_ANSWER = "не знаю"
+CODE_BONUS = 100    # очки за сундук, открытый кодом (attempt_open_treasure)
+EMPTY = -1          # пустая ячейка инвентаря или комнаты
+INVENTORY_SIZE = 16  # начальная ёмкость инвентаря; растёт вдвое по мере надобности
+
+
+def _numpy():
+    np = rng.numpy()
+    if np is None:
+        raise ImportError("Пакетной среде нужен numpy: poetry install --extras batch")
+    return np
+
+
+def _answer(answer):
+    # Ответ загадки может быть списком вариантов — годится любой
+    if isinstance(answer, (list, tuple)):
+        answer = answer[0]
+    return str(answer)
+
+
+def _without(rows, index, length):
+    """Строки rows без ячейки index (сдвиг хвоста влево, как list.pop)."""
+    np = rng.numpy()
+    columns = np.arange(rows.shape[1])
+    source = columns + (columns >= index[:, None])
+    shifted = np.take_along_axis(rows, np.minimum(source, rows.shape[1] - 1), axis=1)
+    shifted[np.arange(len(rows)), length - 1] = EMPTY
+    return shifted
+
+
+def _last(rows, item_id):
+    """Номер последней ячейки с item_id в каждой строке (предмет в строке должен быть)."""
+    np = rng.numpy()
+    return rows.shape[1] - 1 - np.argmax(rows[:, ::-1] == item_id, axis=1)
+
+
+class BatchEnv:
+    """N независимых игр на одной карте (шаблоне комнат)."""
+
+    def __init__(self, n, seeds=None, template=None):
+        np = self._np = _numpy()
+        template = as_template(template)
+        if not triggers.is_default(template.trigger_rules):
+            raise ValueError("Пакетная среда повторяет только стандартные триггеры (constants.TRIGGERS)")
+        self.keys = list(template.keys())
+        index = {key: node for node, key in enumerate(self.keys)}
+        rooms = len(self.keys)
+        self.start = index[START]
+        self.trap_room = index.get(TRAP_ROOM, EMPTY)
+        self.treasure = index.get(TREASURE_ROOM, EMPTY)
+
+        self.coin = intern('coin')
+        self.torch = intern('torch')
+        self.box = intern('bronze_box')
+        self.rusty = intern("ржавый ключ")   # так его кладёт use_item
+        self.treasure_key = intern('treasure_key')
+        self.chest = intern('treasure_chest')
+
+        self.exits = np.full((rooms, len(DIRECTIONS)), EMPTY, dtype=np.int32)
+        floor = []
+        rewards = []
+        self.points = np.zeros(rooms, dtype=np.int64)
+        self.answers = [None] * rooms   # комната -> верный ответ (строка) или None
+        for node, key in enumerate(self.keys):
+            room = template[key]
+            for column, direction in enumerate(DIRECTIONS):
+                target = room.exits.get(direction)
+                if target in index:
+                    self.exits[node, column] = index[target]
+            floor.append(list(room.items))
+            puzzle = room.puzzle
+            if puzzle:
+                self.answers[node] = _answer(puzzle.get('answer', ''))
+                if key == TREASURE_ROOM:
+                    # Очки за код считает attempt_open_treasure, награды не выдаются
+                    self.points[node] = puzzle.get('points', 25)
+                    rewards.append([])
+                else:
+                    self.points[node] = puzzle.get('points', 10)
+                    reward = puzzle.get('reward') or DEFAULT_REWARDS.get(key)
+                    rewards.append([intern(item) for item in reward_items(reward)])
+            else:
+                rewards.append([])
+
+        # На пол попадает разве что одна монета сверх исходных предметов (триггер drop)
+        width = max(map(len, floor), default=0) + 1
+        self.floor = np.full((rooms, width), EMPTY, dtype=np.int32)
+        for node, items in enumerate(floor):
+            self.floor[node, :len(items)] = items
+        self.floor_count = np.array([len(items) for items in floor], dtype=np.int32)
+        self.rewards = np.full((rooms, max(map(len, rewards), default=0)), EMPTY, dtype=np.int32)
+        for node, items in enumerate(rewards):
+            self.rewards[node, :len(items)] = items
+        self.puzzles = np.array([answer is not None for answer in self.answers])
+
+        self.reset(n, seeds)
+
+    def reset(self, n=None, seeds=None):
+        """Начинает все игры заново; seeds — зёрна игр (по умолчанию 0..n-1)."""
+        np = self._np
+        n = self.n if n is None else n
+        self.n = n
+        self.seeds = (np.arange(n, dtype=np.uint64) if seeds is None
+                      else np.asarray(seeds, dtype=np.uint64).copy())
+        if self.seeds.shape != (n,):
+            raise ValueError(f"Нужно {n} зёрен, передано {self.seeds.shape}")
+        self.room = np.full(n, self.start, dtype=np.int32)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.solved = np.zeros(n, dtype=np.int32)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.victory = np.zeros(n, dtype=bool)
+        self.draw_step = np.full(n, -1, dtype=np.int64)   # шаг последней ловушки
+        self.draws = np.zeros(n, dtype=np.int64)          # её номер на этом шаге
+        self.inventory = np.full((n, INVENTORY_SIZE), EMPTY, dtype=np.int32)
+        self.inventory_count = np.zeros(n, dtype=np.int32)
+        self.items = np.broadcast_to(self.floor, (n, *self.floor.shape)).copy()
+        self.item_count = np.broadcast_to(self.floor_count, (n, len(self.keys))).copy()
+        self.puzzle = np.broadcast_to(self.puzzles, (n, len(self.keys))).copy()
+
+    # --- Шаг ---
+
+    def step(self, actions):
+        """Одно действие в каждой игре; возвращает (прирост счёта, game_over).
+
+        Закончившиеся игры действия не меняют, как и process_command.
+        """
+        np = self._np
+        actions = np.asarray(actions)
+        if actions.shape != (self.n,):
+            raise ValueError(f"Нужно {self.n} действий, передано {actions.shape}")
+        score = self.score.copy()
+        live = ~self.game_over
+        rows = np.flatnonzero(live & (actions >= NORTH) & (actions <= EAST))
+        if rows.size:
+            self._move(rows, actions[rows])
+        for action, handler in ((TAKE, self._take), (USE_BOX, self._use_box),
+                                (SOLVE, self._solve), (SOLVE_WRONG, self._solve_wrong),
+                                (OPEN, self._open_code)):
+            rows = np.flatnonzero(live & (actions == action))
+            if rows.size:
+                handler(rows)
+        return self.score - score, self.game_over.copy()
+
+    def _move(self, rows, directions):
+        # move_player: выход есть, а дверь в treasure_room открывает ржавый ключ
+        target = self.exits[self.room[rows], directions]
+        locked = (target == self.treasure) & ~self._has(rows, self.rusty)
+        passed = (target != EMPTY) & ~locked
+        rows = rows[passed]
+        self.room[rows] = target[passed]
+        self.steps[rows] += 1
+        self._enter_triggers(rows)
+
+    def _enter_triggers(self, rows):
+        seeds, steps = self.seeds[rows], self.steps[rows]
+        happened = rng.game_rolls(seeds, steps, EVENT_CHANCE, 10) == 0
+        kind = rng.game_rolls(seeds[happened], steps[happened], EVENT_KIND, 3)
+        rows = rows[happened]
+        self._drop_coin(rows[kind == 0])
+        # Шорох (kind == 1) ничего не меняет; ловушка — только в trap_room без факела
+        trapped = rows[kind == 2]
+        trapped = trapped[(self.room[trapped] == self.trap_room) & ~self._has(trapped, self.torch)]
+        self._trap(trapped)
+
+    def _drop_coin(self, rows):
+        rooms = self.room[rows]
+        fresh = ~(self.items[rows, rooms] == self.coin).any(axis=1)
+        rows, rooms = rows[fresh], rooms[fresh]
+        self.items[rows, rooms, self.item_count[rows, rooms]] = self.coin
+        self.item_count[rows, rooms] += 1
+
+    def _trap(self, rows):
+        # trigger_trap: с предметами теряется один из них, без предметов — шанс 30% погибнуть
+        # Номер ловушки на этом шаге (rng.next_draw): вторая подряд бросает новые кости
+        steps = self.steps[rows]
+        draw = self._np.where(self.draw_step[rows] == steps, self.draws[rows] + 1, 0)
+        self.draw_step[rows] = steps
+        self.draws[rows] = draw
+        counters = steps + (draw << DRAW_SHIFT)
+        count = self.inventory_count[rows]
+        losing = count > 0
+        lose = rows[losing]
+        index = rng.game_rolls(self.seeds[lose], counters[losing], TRAP_ITEM, count[losing])
+        self._remove(lose, index)
+        hurt = rows[~losing]
+        damage = rng.game_rolls(self.seeds[hurt], counters[~losing], TRAP_DAMAGE, 10)
+        self.game_over[hurt[damage < 3]] = True
+
+    def _take(self, rows):
+        # take: берётся первый предмет на полу (см. command)
+        rooms = self.room[rows]
+        present = self.item_count[rows, rooms] > 0
+        rows, rooms = rows[present], rooms[present]
+        self._append(rows, self.items[rows, rooms, 0])
+        self._drop(rows, rooms, self._np.zeros(len(rows), dtype=self._np.int64))
+
+    def _use_box(self, rows):
+        # use_item: шкатулка даёт ржавый ключ, если его нет, и исчезает (последняя из взятых)
+        rows = rows[self._has(rows, self.box)]
+        self._append(rows[~self._has(rows, self.rusty)], self.rusty)
+        self._remove(rows, _last(self.inventory[rows], self.box))
+
+    def _solve(self, rows):
+        treasure = self.room[rows] == self.treasure
+        self._open(rows[treasure], code=True)
+        rows = rows[~treasure]
+        rooms = self.room[rows]
+        open_puzzle = self.puzzle[rows, rooms]
+        rows, rooms = rows[open_puzzle], rooms[open_puzzle]
+        self.puzzle[rows, rooms] = False
+        for column in range(self.rewards.shape[1]):
+            reward = self.rewards[rooms, column]
+            given = reward != EMPTY
+            self._append(rows[given], reward[given])
+        self.score[rows] += self.points[rooms]
+        self.solved[rows] += 1
+
+    def _solve_wrong(self, rows):
+        treasure = self.room[rows] == self.treasure
+        self._open(rows[treasure], code=False)
+        # Неверный ответ на загадку trap_room запускает ловушку
+        rows = rows[~treasure]
+        rows = rows[(self.room[rows] == self.trap_room) & self.puzzle[rows, self.room[rows]]]
+        self._trap(rows)
+
+    def _open_code(self, rows):
+        self._open(rows[self.room[rows] == self.treasure], code=True)
+
+    def _open(self, rows, code):
+        # attempt_open_treasure: ключ от сокровищ или верный код (если загадка на месте)
+        np = self._np
+        treasure = self.treasure
+        rows = rows[(self.items[rows, treasure] == self.chest).any(axis=1)]
+        key = self._has(rows, self.treasure_key)
+        cracked = ~key & self.puzzle[rows, treasure] if code else np.zeros(len(rows), dtype=bool)
+        opened = rows[key | cracked]
+        rooms = np.full(len(opened), treasure, dtype=np.int32)
+        self._drop(opened, rooms, np.argmax(self.items[opened, treasure] == self.chest, axis=1))
+        self.victory[opened] = True
+        self.game_over[opened] = True
+        cracked = rows[cracked]
+        self.score[cracked] += CODE_BONUS + self.points[treasure]
+        self.puzzle[cracked, treasure] = False
+
+    # --- Инвентарь и предметы на полу ---
+
+    def _has(self, rows, item_id):
+        return (self.inventory[rows] == item_id).any(axis=1)
+
+    def _append(self, rows, item_ids):
+        np = self._np
+        if not len(rows):
+            return
+        count = self.inventory_count[rows]
+        size = self.inventory.shape[1]
+        if count.max() >= size:
+            grown = np.full((self.n, size * 2), EMPTY, dtype=np.int32)
+            grown[:, :size] = self.inventory
+            self.inventory = grown
+        self.inventory[rows, count] = item_ids
+        self.inventory_count[rows] = count + 1
+
+    def _remove(self, rows, index):
+        if len(rows):
+            count = self.inventory_count[rows]
+            self.inventory[rows] = _without(self.inventory[rows], index, count)
+            self.inventory_count[rows] = count - 1
+
+    def _drop(self, rows, rooms, index):
+        if len(rows):
+            count = self.item_count[rows, rooms]
+            self.items[rows, rooms] = _without(self.items[rows, rooms], index, count)
+            self.item_count[rows, rooms] = count - 1
+
+    # --- Наблюдение ---
+
+    def command(self, game, action):
+        """Команда process_command, равносильная действию action в игре game."""
+        if action < len(DIRECTIONS):
+            return f"go {DIRECTIONS[action]}"
+        node = int(self.room[game])
+        if action == TAKE:
+            if not self.item_count[game, node]:
+                return "take"
+            return f"take {CATALOGUE[int(self.items[game, node, 0])].key}"
+        if action == USE_BOX:
+            return "use bronze_box"
+        if action == SOLVE_WRONG:
+            return f"solve {WRONG_ANSWER}"
+        verb = "open" if action == OPEN else "solve"
+        answer = self.answers[self.treasure if action == OPEN else node]
+        if answer is None or not self.puzzle[game, self.treasure if action == OPEN else node]:
+            return f"{verb} {WRONG_ANSWER}"
+        return f"{verb} {answer}"
+
+    def room_key(self, game):
+        return self.keys[self.room[game]]
+
+    def inventory_ids(self, game):
+        """id предметов игры game в порядке получения."""
+        return self.inventory[game, :self.inventory_count[game]].tolist()
+
+    def room_ids(self, game, node):
+        """id предметов на полу комнаты node в игре game."""
+        return self.items[game, node, :self.item_count[game, node]].tolist()
@@ -0,0 +1,331 @@
+"""Модуль для реестра игровых команд.
+
+Таблица "псевдоним -> обработчик" строится один раз при импорте из описаний
+constants.COMMANDS, поэтому поиск команды — одно обращение к словарю,
+сколько бы глаголов и локализованных псевдонимов ни было.
+
+Новая команда добавляется декоратором, без правки main.py:
+
+    @command('dance', 'танцевать')
+    def dance(game_state, args, command_string):
+        emit(game_state, 'message', "Вы танцуете.")
+        return True
+
+Обработчик получает состояние, список аргументов и исходную строку и
+возвращает то же, что process_command: False — если игра завершена.
+"""
+
+from types import MappingProxyType
+
+from labyrinth_game.constants import COMMANDS
+from labyrinth_game.events import emit
+from labyrinth_game.player_actions import describe_current_room, move_player, show_inventory, take_item, use_item
+from labyrinth_game.utils import attempt_open_treasure, solve_puzzle
+from labyrinth_game.world import PATH_SEARCH_LIMIT, PathSearchLimit, get_world
+
+# Нормализация направлений: любое написание -> стандартное английское название
+DIRECTIONS = MappingProxyType({
+    'север': 'north', 'north': 'north', 'n': 'north',
+    'юг': 'south', 'south': 'south', 's': 'south',
+    'запад': 'west', 'west': 'west', 'w': 'west',
+    'восток': 'east', 'east': 'east', 'e': 'east',
+    'вверх': 'up', 'вниз': 'down'
+})
+
+# Псевдоним (в нижнем регистре) -> обработчик
+HANDLERS = {}
+
+# Псевдонимы команд, которые получают всю строку целиком: ';' в ней не делит
+# строку на цепочку команд (см. main.process_command)
+WHOLE_LINE = set()
+
+# Справка по командам: описание псевдонимов -> что делает команда.
+# Дополняется командами из файла мира (add_specs).
+HELP = dict(COMMANDS)
+
+
+def parse_aliases(spec):
+    """'take <предмет> / взять <предмет>' -> ['take', 'взять']."""
+    return [part.split()[0].lower() for part in spec.split(' / ') if part.strip()]
+
+
+# Первый псевдоним описания -> все псевдонимы из constants.COMMANDS
+_SPEC_ALIASES = {}
+for _spec in COMMANDS:
+    _aliases = parse_aliases(_spec)
+    _SPEC_ALIASES[_aliases[0]] = _aliases
+
+
+def command(name, *aliases, whole_line=False):
+    """Регистрирует обработчик команды name.
+
+    Псевдонимы берутся из описания команды в constants.COMMANDS (если оно
+    есть) и дополняются aliases. Повторная регистрация чужого псевдонима
+    считается ошибкой. whole_line=True — команда получает строку вместе
+    с ';' (например, тело макроса), а не первую команду цепочки.
+    """
+    names = [*_SPEC_ALIASES.get(name, [name]), *(alias.lower() for alias in aliases)]
+
+    def decorator(handler):
+        for alias in names:
+            registered = HANDLERS.get(alias)
+            if registered is not None and registered is not handler:
+                raise ValueError(f"Команда '{alias}' уже зарегистрирована: {registered.__name__}")
+            HANDLERS[alias] = handler
+            if whole_line:
+                WHOLE_LINE.add(alias)
+        return handler
+
+    return decorator
+
+
+def add_specs(specs):
+    """Добавляет псевдонимы и справку из описаний вида {'look / смотреть': 'описание'}.
+
+    Первый псевдоним описания должен быть уже зарегистрированной командой,
+    остальные становятся её новыми псевдонимами (так файл мира может
+    локализовать команды, не меняя кода).
+    """
+    for spec, text in specs.items():
+        name, *aliases = parse_aliases(spec)
+        handler = HANDLERS.get(name)
+        if handler is None:
+            raise ValueError(f"Неизвестная команда '{name}' в описании '{spec}'")
+        command(name, *aliases)(handler)
+        HELP[spec] = text
+
+
+def lookup(cmd):
+    """Обработчик для первого слова команды или None."""
+    return HANDLERS.get(cmd.lower())
+
+
+# --- Встроенные команды ---
+
+@command('look')
+def look(game_state, args, command_string):
+    describe_current_room(game_state)
+    return True
+
+
+@command('inventory')
+def inventory(game_state, args, command_string):
+    show_inventory(game_state)
+    return True
+
+
+@command('go', 'move')
+def go(game_state, args, command_string):
+    if not args:
+        emit(game_state, 'missing_argument', "Укажите направление движения.", command='go')
+        return True
+
+    # Берем последнее слово, если ввели "идти на север"
+    direction = args[-1].lower()
+    # Если направления нет в таблице, передаем как есть (вдруг там кастомный выход)
+    move_player(game_state, DIRECTIONS.get(direction, direction))
+    return True
+
+
+def _move_to(direction):
+    def handler(game_state, args, command_string):
+        move_player(game_state, direction)
+        return True
+    handler.__name__ = direction
+    return handler
+
+
+# Односложные команды движения (без слова go)
+for _direction in ('north', 'south', 'west', 'east'):
+    command(_direction)(_move_to(_direction))
+
+
+@command('take')
+def take(game_state, args, command_string):
+    if not args:
+        emit(game_state, 'missing_argument', "Укажите, какой предмет вы хотите взять.",
+             command='take')
+        return True
+    take_item(game_state, " ".join(args))
+    return True
+
+
+@command('use')
+def use(game_state, args, command_string):
+    if not args:
+        emit(game_state, 'missing_argument', "Укажите, какой предмет вы хотите использовать.",
+             command='use')
+        return True
+    use_item(game_state, " ".join(args))
+    return True
+
+
+# Ответ можно сразу указать после команды: "solve 10"
+@command('solve')
+def solve(game_state, args, command_string):
+    answer = " ".join(args) if args else None
+    if game_state['current_room'] == 'treasure_room':
+        # В treasure_room вызываем функцию открытия сундука
+        attempt_open_treasure(game_state, answer)
+    else:
+        # В других комнатах решаем загадки
+        solve_puzzle(game_state, answer)
+    return True
+
+
+@command('open')
+def open_chest(game_state, args, command_string):
+    if game_state['current_room'] == 'treasure_room':
+        attempt_open_treasure(game_state, " ".join(args) if args else None)
+    else:
+        emit(game_state, 'no_chest', "Здесь нечего открывать.")
+    return True
+
+
+@command('path')
+def path(game_state, args, command_string):
+    if not args:
+        emit(game_state, 'missing_argument', "Укажите, до какой комнаты проложить путь.",
+             command='path')
+        return True
+    world = get_world(game_state)
+    # "treasure room" и "Treasure_Room" означают одну комнату
+    target = "_".join(" ".join(args).lower().replace('_', ' ').split())
+    if target not in world:
+        emit(game_state, 'not_found', f"Комнаты '{' '.join(args)}' нет в лабиринте.")
+        return True
+    try:
+        steps = world.path(game_state['current_room'], target)
+    except PathSearchLimit:
+        emit(game_state, 'path', f"До {target} слишком далеко: путь ищется не дальше "
+             f"{PATH_SEARCH_LIMIT} комнат.", room=target, steps=None)
+        return True
+    if steps is None:
+        emit(game_state, 'path', f"Отсюда в {target} не попасть.", room=target, steps=None)
+    elif not steps:
+        emit(game_state, 'path', "Вы уже здесь.", room=target, steps=[])
+    else:
+        route = " -> ".join(direction for direction, _ in steps)
+        emit(game_state, 'path', f"Путь в {target} ({len(steps)} шаг.): {route}",
+             room=target, steps=steps)
+    return True
+
+
+@command('quit')
+def quit_game(game_state, args, command_string):
+    game_state['game_over'] = True
+    emit(game_state, 'quit', "Вы покидаете Лабиринт. Игра окончена.")
+    return False
+
+
+@command('help')
+def show_commands(game_state, args, command_string):
+    emit(game_state, 'help', "\n".join([
+        str(HELP),
+        "nОсобые предметы:",
+        "  torch/факел - освещает комнату",
+        "  sword/меч - придает уверенность",
+        "  bronze box/бронзовая шкатулка - можно открыть",
+        "nЦепочки и макросы:",
+        "  Несколько команд через ';': n; take torch; use torch",
+        "  macro loot take torch; take coin — затем просто 'loot'",
+        "nЗагадки:",
+        "  Решайте загадки с помощью команды 'solve'",
+        "  Каждая решенная загадка дает очки и награду",
+        "nПОБЕДА:",
+        "  Чтобы победить, найдите ключ от сокровищ и откройте сундук",
+        "  в treasure_room. Или взломайте сундук, решив загадку.",
+    ]))
+    return True
+
+
+@command('score')
+def score(game_state, args, command_string):
+    # Инвентарь мог ещё не создаваться (старые game_state)
+    inv_count = len(game_state.get('player_inventory', []))
+    emit(game_state, 'score',
+         f"nВаш текущий счет: {game_state['score']} очков\n"
+         f"Решено загадок: {game_state.get('solved_puzzles', 0)}\n"
+         f"Собрано предметов: {inv_count}",
+         score=game_state['score'], solved_puzzles=game_state.get('solved_puzzles', 0),
+         items=inv_count)
+    return True
+
+
+# Макросы сессии хранятся в game_state['macros'] (имя -> цепочка команд).
+# Словарь не меняется на месте, а заменяется новым: копии состояния
+# (engine.copy_state) не должны делить макросы.
+@command('macro', whole_line=True)
+def macro(game_state, args, command_string):
+    macros = game_state.get('macros', {})
+    if not args:
+        if not macros:
+            emit(game_state, 'macros', "Макросов нет. Пример: macro loot take torch; take coin",
+                 macros={})
+        else:
+            lines = [f"  {name}: {body}" for name, body in macros.items()]
+            emit(game_state, 'macros', "Макросы:\n" + "\n".join(lines), macros=dict(macros))
+        return True
+
+    name = args[0].lower()
+    parts = command_string.strip().split(None, 2)
+    body = parts[2].strip() if len(parts) > 2 else ''
+    if not body:
+        if name in macros:
+            game_state['macros'] = {key: value for key, value in macros.items() if key != name}
+            emit(game_state, 'macro', f"Макрос '{name}' удалён.", name=name, body=None)
+        else:
+            emit(game_state, 'not_found', f"Макроса '{name}' нет.", name=name)
+        return True
+    if lookup(name) is not None:
+        emit(game_state, 'error', f"'{name}' — уже команда игры, выберите другое имя.", name=name)
+        return True
+    game_state['macros'] = {**macros, name: body}
+    emit(game_state, 'macro', f"Макрос '{name}': {body}", name=name, body=body)
+    return True
+
+
+# Таблица рекордов подключается в main.py (--scores) и лежит в game_state['scores']
+def score_store(game_state):
+    """ScoreStore сессии или None; открывает таблицу, если main отложил это (main.LazyScores)."""
+    store = game_state.get('scores')
+    return store() if callable(store) else store
+
+
+@command('leaderboard')
+def leaderboard(game_state, args, command_string):
+    store = score_store(game_state)
+    if store is None:
+        emit(game_state, 'error', "Таблица рекордов не подключена.")
+        return True
+    from labyrinth_game.leaderboard import TOP, format_entry
+    # isdigit() верно и для "²", а int() его не разберёт; store.top() сам ограничит 1..MAX_ROWS
+    limit = int(args[0]) if args and args[0].isascii() and args[0].isdigit() else TOP
+    entries = store.top(limit)
+    if not entries:
+        emit(game_state, 'leaderboard', "Сыгранных игр пока нет.", entries=[])
+        return True
+    lines = ["\n🏆 Таблица рекордов:"]
+    lines += [format_entry(place, entry) for place, entry in enumerate(entries, 1)]
+    emit(game_state, 'leaderboard', "\n".join(lines), entries=[entry._asdict() for entry in entries])
+    return True
+
+
+@command('history')
+def history(game_state, args, command_string):
+    store = score_store(game_state)
+    if store is None:
+        emit(game_state, 'error', "Таблица рекордов не подключена.")
+        return True
+    from labyrinth_game.leaderboard import default_player, format_entry
+    player = " ".join(args) if args else game_state.get('player') or default_player()
+    entries = store.history(player)
+    if not entries:
+        emit(game_state, 'history', f"У игрока {player} ещё нет законченных игр.",
+             player=player, entries=[])
+        return True
+    lines = [f"\n📜 Последние игры {player}:"]
+    lines += [format_entry(place, entry, with_player=False) for place, entry in enumerate(entries, 1)]
+    emit(game_state, 'history', "\n".join(lines), player=player,
+         entries=[entry._asdict() for entry in entries])
+    return True
@@ -1,5 +1,7 @@
 """Модуль для хранения неизменяемых данных игры (карта комнат, команды и т.п.)."""
 
+from types import MappingProxyType
+
 ROOMS = {
     'entrance': {
         'description': 'Вы в темном входе лабиринта. Стены покрыты мхом. На полу лежит старый факел.',
@@ -103,7 +105,79 @@ COMMANDS = {
     "inventory / инвентарь / инв": "показать инвентарь",
     "solve / решить / загадка": "попытаться решить загадку в комнате (в treasure_room открыть сундук)",
     "open / открыть": "попытаться открыть сундук (только в treasure_room)",
+    "path <комната> / путь <комната>": "показать кратчайший путь до комнаты",
     "score / очки / счет": "показать текущий счет и статистику",
+    "leaderboard / рекорды": "показать таблицу рекордов (leaderboard 20 — больше строк)",
+    "history / история": "показать последние законченные игры (свои или игрока: history <имя>)",
+    "macro <имя> <команды> / макрос <имя> <команды>": "запомнить цепочку команд под именем (без команд — удалить)",
     "quit / exit / выход / выйти": "выйти из игры",
     "help / помощь / ?": "показать это сообщение"
-}
\ No newline at end of file
+}
+
+
+# Триггеры стандартной карты (формат и действия — в triggers.py). Три
+# случайных события при входе в комнату бросают одни и те же кости (поток 0):
+# событие бывает в одном входе из десяти и тогда одно из трёх — монета,
+# шорох или ловушка (последняя только в trap_room и только без факела).
+TRIGGERS = [
+    {
+        'on': 'enter', 'chance': 10, 'pick': [0, 3],
+        'effects': [
+            {'say': "\n✨ На полу вы замечаете блестящую монетку!",
+             'kind': 'random_event', 'data': {'event': 'coin'}},
+            {'drop': 'coin', 'text': "🪙 Монета добавлена в комнату."},
+        ],
+    },
+    {
+        'on': 'enter', 'chance': 10, 'pick': [1, 3],
+        'effects': [
+            {'say': "\n👣 Вы слышите странный шорох в темноте...",
+             'kind': 'random_event', 'data': {'event': 'rustle'}},
+            {'if': {'has': 'sword'},
+             'then': [{'say': "⚔️ Вы достаете меч, и шорох тут же затихает."}],
+             'else': [{'say': "😨 Шорох продолжается. Вам становится не по себе."}]},
+        ],
+    },
+    {
+        'on': 'enter', 'room': 'trap_room', 'if': {'lacks': 'torch'}, 'chance': 10, 'pick': [2, 3],
+        'effects': [
+            {'say': "\n⚠️ Вы не заметили ловушку в темноте!",
+             'kind': 'random_event', 'data': {'event': 'trap'}},
+            {'trap': True},
+        ],
+    },
+    {
+        'on': 'fail_puzzle', 'room': 'trap_room',
+        'effects': [
+            {'say': "⚠️ Ошибка активирует ловушку!"},
+            {'trap': True},
+        ],
+    },
+]
+
+
+def _freeze(value):
+    """Рекурсивно заменяет словари и списки их неизменяемыми аналогами."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# Карта комнат — общий шаблон для всех игровых сессий, поэтому она заморожена.
+# Изменения конкретной сессии хранятся в её World (см. world.py).
+ROOMS = _freeze(ROOMS)
+TRIGGERS = _freeze(TRIGGERS)
+
+# Общая таблица псевдонимов предметов: канонический id -> другие названия.
+# Регистр, пробелы и '_' при сравнении не важны ('rusty key' == 'rusty_key').
+# Используется индексом инвентаря (inventory.py) вместо списков в каждой функции.
+ITEM_ALIASES = MappingProxyType({
+    'torch': ('факел',),
+    'sword': ('меч',),
+    'rusty_key': ('ржавый ключ',),
+    'bronze_box': ('бронзовая шкатулка',),
+    'treasure_key': ('ключ от сокровищ',),
+    'coin': ('монета', 'монетка'),
+})
@@ -0,0 +1,63 @@
+"""Модуль безголового игрового движка (без print() и input()).
+
+Пример прогона сценария:
+
+    state, events = engine.new_game()
+    state, events = engine.step(state, "east")
+    state, events = engine.step(state, "solve", answers=["шаг шаг шаг"])
+
+Все сообщения возвращаются как список events.Event, а ответы на загадки и
+вопросы сундука передаются аргументом answers вместо чтения с клавиатуры.
+"""
+
+from collections import deque
+
+from labyrinth_game.inventory import get_inventory
+from labyrinth_game.main import process_command
+from labyrinth_game.player_actions import describe_current_room
+from labyrinth_game.world import get_world, new_game_state
+
+
+def copy_state(game_state):
+    """Независимая копия состояния сессии (шаблон мира остаётся общим)."""
+    new_state = dict(game_state)
+    new_state['player_inventory'] = get_inventory(game_state).copy()
+    new_state['world'] = get_world(game_state).copy()
+    return new_state
+
+
+def _run(game_state, action, answers):
+    events = game_state['events'] = []
+    game_state['answers'] = deque(answers)
+    try:
+        action(game_state)
+    finally:
+        # Буфер событий и очередь ответов живут только в пределах одного хода
+        del game_state['events']
+        del game_state['answers']
+    return events
+
+
+def new_game(template=None, seed=None):
+    """Создаёт новую сессию и возвращает (state, events) с описанием стартовой комнаты.
+
+    seed — зерно случайных событий; с одним зерном одинаковые команды дают одинаковую игру.
+    """
+    game_state = new_game_state(template, seed)
+    events = _run(game_state, describe_current_room, ())
+    return game_state, events
+
+
+def step(state, command, answers=(), inplace=False):
+    """Выполняет одну команду игрока.
+
+    answers — ответы на вопросы, которые команда задаёт по ходу
+    (загадка, "попробовать ввести код?", сам код). Если ответов не хватило,
+    среди событий будет 'prompt' с текстом вопроса.
+    При inplace=True состояние изменяется на месте без копирования.
+
+    Возвращает (new_state, events).
+    """
+    new_state = state if inplace else copy_state(state)
+    events = _run(new_state, lambda gs: process_command(gs, command), answers)
+    return new_state, events
@@ -0,0 +1,68 @@
+"""Модуль для игровых событий и ввода-вывода игрока.
+
+Действия игрока не печатают напрямую, а сообщают о результатах через emit().
+Если в game_state есть список 'events' (безголовый режим, см. engine.py),
+события складываются в него; иначе текст уходит в рендерер сессии
+game_state['renderer'] (см. renderer.py), а без него — сразу в терминал.
+Ответы на загадки и вопросы сундука берутся через ask(): из очереди
+game_state['answers'], если она есть, иначе с клавиатуры.
+"""
+
+from collections import namedtuple
+
+# collections.namedtuple, а не typing.NamedTuple: модуль typing заметно
+# удлиняет запуск каждой игровой сессии.
+#   kind — тип события: 'room', 'move', 'take', 'puzzle_solved', ...
+#   text — текст для игрока (как его видит терминал)
+#   data — словарь структурированных подробностей события
+Event = namedtuple('Event', ('kind', 'text', 'data'))
+
+
+def get_input(prompt="> "):
+    try:
+        return input(prompt).strip()
+    except (KeyboardInterrupt, EOFError):
+        print("\n\nВыход из игры.")
+        return "quit"
+
+
+def emit(game_state, kind, text='', **data):
+    """Сообщает о событии: в буфер событий сессии или сразу в терминал."""
+    event = Event(kind, text, data)
+    events = game_state.get('events')
+    if events is not None:
+        events.append(event)
+    elif text:
+        renderer = game_state.get('renderer')
+        if renderer is None:
+            print(text)
+        else:
+            renderer.write(text)
+    return event
+
+
+def ask(game_state, prompt):
+    """Запрашивает ответ игрока.
+
+    В безголовом режиме ответ берётся из очереди game_state['answers'];
+    если ответов не осталось, возвращается None и публикуется событие
+    'prompt', чтобы вызывающий код знал, какого ответа не хватило.
+    """
+    answers = game_state.get('answers')
+    if answers is None:
+        renderer = game_state.get('renderer')
+        if renderer is not None:
+            renderer.flush()  # вопрос должен быть на экране до ввода ответа
+        answer = get_input(prompt)
+        asked = game_state.get('asked')
+        if asked is not None:
+            asked.append(answer)  # запись сессии, см. replay.Recorder
+        return answer
+    if answers:
+        answer = str(answers.popleft()).strip()
+        asked = game_state.get('asked')
+        if asked is not None:
+            asked.append(answer)  # пакетный режим с записью (main.run_script)
+        return answer
+    emit(game_state, 'prompt', prompt.strip(), prompt=prompt.strip())
+    return None
@@ -0,0 +1,180 @@
+"""Модуль для процедурной генерации лабиринтов произвольного размера.
+
+Комнаты лежат на сетке width x width (width = ceil(sqrt(size))) и
+соединяются по алгоритму "двоичного дерева": каждая комната, кроме входа,
+открывает проход на запад или на север, и иногда оба сразу (циклы). Всё,
+что нужно знать о комнате, выводится из (seed, номер комнаты) хэшем rng.mix,
+поэтому любую комнату можно построить за O(1) без соседей и без общей
+таблицы: генерация всего лабиринта линейна, а память не растёт с размером.
+
+    rooms = GeneratedRooms(1_000_000, seed=42)     # ленивая карта, как ROOMS
+    state, events = engine.new_game(rooms)
+
+    for key, room in generate_rooms(100_000, seed=7):  # потоковая выгрузка
+        ...
+
+Схема комнаты та же, что в constants.ROOMS. Вход — 'entrance' (комната 0),
+сокровищница — 'treasure_room' (последняя комната, всегда тупик): войти в неё
+можно только с ржавым ключом, который лежит где-то в лабиринте.
+"""
+
+from collections.abc import Mapping
+from math import isqrt
+
+from labyrinth_game.rng import mix
+
+# Назначения случайных чисел: у каждого свой поток, чтобы изменение одного
+# правила генерации не сдвигало все остальные
+_LINK, _LOOP, _TEXT, _ITEM, _PUZZLE, _SPECIAL = range(6)
+
+LOOP_CHANCE = 8      # из 100: комната открывает оба прохода назад
+ITEM_CHANCE = 25     # из 100: в комнате лежит предмет
+PUZZLE_CHANCE = 20   # из 100: в комнате есть загадка
+
+DESCRIPTIONS = (
+    'Сырой коридор. С потолка капает вода, под ногами хрустит гравий.',
+    'Низкий зал с закопчёнными сводами. Пахнет старым дымом.',
+    'Узкий проход между каменными плитами. Где-то вдали слышно эхо.',
+    'Пустая келья с выцарапанными на стенах отметками.',
+    'Круглая комната, пол выложен потрескавшейся мозаикой.',
+    'Заброшенная кладовая: пустые полки и разбитые бочки.',
+    'Галерея с осыпавшимися колоннами. Ветер гуляет между ними.',
+    'Тёмный тупичок, стены покрыты мхом и паутиной.',
+)
+ITEMS = ('coin', 'silver_coin', 'ancient_book', 'sword', 'bronze_box')
+REWARDS = (None, None, 'coin', 'silver_coin')
+
+
+class GeneratedRooms(Mapping):
+    """Ленивая карта лабиринта: ключ комнаты -> описание в формате ROOMS.
+
+    Комната строится при каждом обращении и нигде не хранится, поэтому
+    объект занимает O(1) памяти при любом size. Подходит везде, где
+    ожидается ROOMS (World, engine.new_game, savegame.loads).
+    """
+
+    __slots__ = ('size', 'seed', 'width', '_rusty_key', '_treasure_key')
+
+    def __init__(self, size, seed=0):
+        if size < 2:
+            raise ValueError("В лабиринте должно быть хотя бы две комнаты: вход и сокровищница")
+        self.size = size
+        self.seed = seed
+        self.width = isqrt(size - 1) + 1
+        # Ключи кладутся в обычные комнаты (в лабиринте из двух комнат — во вход)
+        inner = size - 2
+        self._rusty_key = 1 + mix(seed, 0, _SPECIAL) % inner if inner else 0
+        self._treasure_key = 1 + mix(seed, 1, _SPECIAL) % inner if inner else 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return map(self.key, range(self.size))
+
+    def __contains__(self, room_key):
+        return self.index(room_key) is not None
+
+    def __getitem__(self, room_key):
+        index = self.index(room_key)
+        if index is None:
+            raise KeyError(room_key)
+        return self.room(index)
+
+    def key(self, index):
+        if index == 0:
+            return 'entrance'
+        if index == self.size - 1:
+            return 'treasure_room'
+        return f'room_{index}'
+
+    def index(self, room_key):
+        """Номер комнаты по ключу или None."""
+        if room_key == 'entrance':
+            return 0
+        if room_key == 'treasure_room':
+            return self.size - 1
+        if isinstance(room_key, str) and room_key.startswith('room_'):
+            digits = room_key[5:]
+            if digits.isdigit() and digits[0] != '0':
+                index = int(digits)
+                if index < self.size - 1:
+                    return index
+        return None
+
+    def _links(self, index):
+        """Проходы, которые комната index открывает назад: (на запад, на север)."""
+        row, col = divmod(index, self.width)
+        if row == 0:
+            return col > 0, False
+        if col == 0:
+            return False, True
+        if index != self.size - 1 and mix(self.seed, index, _LOOP) % 100 < LOOP_CHANCE:
+            return True, True
+        west = mix(self.seed, index, _LINK) & 1
+        return bool(west), not west
+
+    def room(self, index):
+        """Описание комнаты номер index в формате ROOMS."""
+        seed, width, size = self.seed, self.width, self.size
+        exits = {}
+        west, north = self._links(index) if index else (False, False)
+        if north:
+            exits['north'] = self.key(index - width)
+        if west:
+            exits['west'] = self.key(index - 1)
+        # Проходы в сторону соседей с большими номерами открывают сами соседи
+        east = index + 1
+        if east % width and east < size and self._links(east)[0]:
+            exits['east'] = self.key(east)
+        south = index + width
+        if south < size and self._links(south)[1]:
+            exits['south'] = self.key(south)
+
+        if index == size - 1:
+            return {
+                'description': 'Сокровищница! Посреди комнаты стоит окованный железом сундук.',
+                'exits': exits,
+                'items': ['treasure_chest'],
+                'puzzle': {
+                    'question': 'На сундуке кодовый замок. Введите код (подсказка: номер этой комнаты)',
+                    'answer': str(index),
+                    'reward': None,
+                    'points': 25,
+                },
+            }
+
+        items = []
+        if index == 0:
+            items.append('torch')
+        elif mix(seed, index, _ITEM) % 100 < ITEM_CHANCE:
+            items.append(ITEMS[(mix(seed, index, _ITEM) >> 8) % len(ITEMS)])
+        if index == self._rusty_key:
+            items.append('rusty_key')
+        if index == self._treasure_key:
+            items.append('treasure_key')
+
+        puzzle = None
+        roll = mix(seed, index, _PUZZLE)
+        if index and roll % 100 < PUZZLE_CHANCE:
+            a, b = (roll >> 8) % 50 + 1, (roll >> 16) % 50 + 1
+            puzzle = {
+                'question': f'На стене выбито: "Сколько будет {a}+{b}?" (введите ответ цифрой)',
+                'answer': str(a + b),
+                'reward': REWARDS[(roll >> 24) % len(REWARDS)],
+                'points': 5 + (roll >> 32) % 4 * 5,
+            }
+
+        return {
+            'description': DESCRIPTIONS[mix(seed, index, _TEXT) % len(DESCRIPTIONS)],
+            'exits': exits,
+            'items': items,
+            'puzzle': puzzle,
+        }
+
+
+def generate_rooms(size, seed=0):
+    """Поток пар (ключ, описание комнаты) по порядку номеров, без общей таблицы."""
+    rooms = GeneratedRooms(size, seed)
+    for index in range(size):
+        yield rooms.key(index), rooms.room(index)
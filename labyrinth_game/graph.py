@@ -0,0 +1,163 @@
+"""Модуль для графа комнат: кратчайшие пути, достижимость и проверка связей.
+
+Индекс смежности строится один раз по выходам комнат. Кратчайшие пути
+считаются обходом в ширину от нужной комнаты и кэшируются по комнате-
+источнику, поэтому повторные запросы ничего не пересчитывают. При изменении
+выходов комнаты (set_exits) сбрасываются только кэши тех источников, из
+которых эта комната вообще достижима.
+"""
+
+from array import array
+from collections import deque
+from collections.abc import Mapping
+
+UNREACHABLE = -1
+
+
+class RoomGraph:
+    """Индекс смежности комнат с кэшем кратчайших путей."""
+
+    __slots__ = ('_index', '_keys', '_exits', '_missing', '_bfs')
+
+    def __init__(self, rooms=None):
+        # rooms — карта "ключ -> комната": описания в формате ROOMS или записи Room
+        self._index = {}    # ключ комнаты -> номер вершины
+        self._keys = []     # номер вершины -> ключ комнаты
+        self._exits = []    # номер вершины -> ((направление, номер соседа), ...)
+        self._missing = {}  # номер вершины -> ((направление, ключ), ...) для выходов в никуда
+        self._bfs = {}      # номер источника -> (расстояния, предки)
+        if rooms is not None:
+            for room_key in rooms.keys():
+                self._node(room_key)
+            for room_key, room in rooms.items():
+                exits = (room.get('exits') or {}) if isinstance(room, Mapping) else room.exits
+                self._set(self._index[room_key], exits)
+
+    def __contains__(self, room_key):
+        return room_key in self._index
+
+    def __len__(self):
+        return len(self._keys)
+
+    def copy(self):
+        graph = RoomGraph()
+        graph._index = dict(self._index)
+        graph._keys = list(self._keys)
+        graph._exits = list(self._exits)
+        graph._missing = dict(self._missing)
+        graph._bfs = dict(self._bfs)
+        return graph
+
+    def _node(self, room_key):
+        node = self._index.get(room_key)
+        if node is None:
+            node = self._index[room_key] = len(self._keys)
+            self._keys.append(room_key)
+            self._exits.append(())
+            # Новая вершина удлиняет массивы расстояний: старые кэши больше не годятся
+            self._bfs.clear()
+        return node
+
+    def _set(self, node, exits):
+        # Выход в комнату, которой нет в индексе, считается битым
+        edges, missing = [], []
+        for direction, target in exits.items():
+            neighbour = self._index.get(target)
+            if neighbour is None:
+                missing.append((direction, target))
+            else:
+                edges.append((direction, neighbour))
+        self._exits[node] = tuple(edges)
+        if missing:
+            self._missing[node] = tuple(missing)
+        else:
+            self._missing.pop(node, None)
+
+    def set_exits(self, room_key, exits):
+        """Обновляет выходы одной комнаты без перестройки всего индекса."""
+        node = self._node(room_key)
+        # Новые выходы node меняют только пути, проходящие через node, а через
+        # неё идут пути лишь из тех источников, откуда она достижима.
+        stale = [source for source, (dist, _) in self._bfs.items() if dist[node] != UNREACHABLE]
+        for source in stale:
+            del self._bfs[source]
+        self._set(node, exits)
+
+    def _search(self, source):
+        cached = self._bfs.get(source)
+        if cached is None:
+            size = len(self._keys)
+            dist = array('i', [UNREACHABLE]) * size
+            parent = array('i', [UNREACHABLE]) * size
+            dist[source] = 0
+            queue = deque((source,))
+            exits = self._exits
+            while queue:
+                node = queue.popleft()
+                next_dist = dist[node] + 1
+                for _, neighbour in exits[node]:
+                    if dist[neighbour] == UNREACHABLE:
+                        dist[neighbour] = next_dist
+                        parent[neighbour] = node
+                        queue.append(neighbour)
+            cached = self._bfs[source] = (dist, parent)
+        return cached
+
+    def distance(self, start, goal):
+        """Число переходов от start до goal или None, если пути нет."""
+        dist, _ = self._search(self._index[start])
+        steps = dist[self._index[goal]]
+        return None if steps == UNREACHABLE else steps
+
+    def path(self, start, goal):
+        """Кратчайший путь [(направление, комната), ...] или None, если пути нет."""
+        source, target = self._index[start], self._index[goal]
+        dist, parent = self._search(source)
+        if dist[target] == UNREACHABLE:
+            return None
+        steps = []
+        node = target
+        while node != source:
+            previous = parent[node]
+            direction = next(d for d, n in self._exits[previous] if n == node)
+            steps.append((direction, self._keys[node]))
+            node = previous
+        steps.reverse()
+        return steps
+
+    def reachable(self, start):
+        """Множество комнат, куда можно попасть из start (включая её саму)."""
+        dist, _ = self._search(self._index[start])
+        return {self._keys[node] for node, steps in enumerate(dist) if steps != UNREACHABLE}
+
+    def unreachable(self, start):
+        """Комнаты, куда из start попасть нельзя."""
+        dist, _ = self._search(self._index[start])
+        return [self._keys[node] for node, steps in enumerate(dist) if steps == UNREACHABLE]
+
+    def all_pairs(self):
+        """Кратчайшие расстояния между всеми парами: {начало: {конец: шаги}}."""
+        return {
+            self._keys[source]: {
+                self._keys[node]: steps
+                for node, steps in enumerate(self._search(source)[0]) if steps != UNREACHABLE
+            }
+            for source in range(len(self._keys))
+        }
+
+    def one_way_links(self):
+        """Переходы без обратного выхода: [(откуда, направление, куда), ...]."""
+        links = []
+        for node, edges in enumerate(self._exits):
+            for direction, neighbour in edges:
+                if all(back != node for _, back in self._exits[neighbour]):
+                    links.append((self._keys[node], direction, self._keys[neighbour]))
+        return links
+
+    def broken_links(self):
+        """Выходы в несуществующие комнаты: [(откуда, направление, куда), ...]."""
+        return [
+            (self._keys[node], direction, target)
+            for node, missing in self._missing.items()
+            for direction, target in missing
+        ]
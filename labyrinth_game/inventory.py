@@ -0,0 +1,127 @@
+"""Модуль для инвентаря игрока с индексом по id предметов."""
+
+from array import array
+
+from labyrinth_game.items import CATALOGUE, find_id, intern
+
+_REMOVED = -1  # метка освободившейся ячейки
+
+
+class Inventory:
+    """Инвентарь с индексом по id предметов.
+
+    Предметы хранятся компактным массивом целых id в порядке получения,
+    а индекс id -> ячейки позволяет проверять, брать и удалять предметы
+    по названию или псевдониму за O(1), не просматривая весь инвентарь.
+    Удалённые ячейки помечаются и изредка уплотняются целиком.
+    """
+
+    __slots__ = ('_ids', '_slots', '_count')
+
+    def __init__(self, items=()):
+        self._ids = array('i')   # ячейка -> id предмета (или _REMOVED)
+        self._slots = {}         # id предмета -> номера ячеек
+        self._count = 0
+        for item in items:
+            self.append(item)
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __iter__(self):
+        return (CATALOGUE[item_id] for item_id in self._ids if item_id != _REMOVED)
+
+    def __contains__(self, name):
+        return self.has(name)
+
+    def __getitem__(self, index):
+        return list(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, Inventory):
+            other = list(other)
+        return list(self) == other
+
+    def __repr__(self):
+        return f"Inventory({[item.name for item in self]!r})"
+
+    @classmethod
+    def from_ids(cls, item_ids):
+        """Инвентарь из готовых id каталога (без разбора названий)."""
+        inventory = cls()
+        inventory._ids = array('i', item_ids)
+        slots = inventory._slots
+        for slot, item_id in enumerate(inventory._ids):
+            slots.setdefault(item_id, []).append(slot)
+        inventory._count = len(inventory._ids)
+        return inventory
+
+    def ids(self):
+        """id предметов в порядке получения."""
+        return array('i', (item_id for item_id in self._ids if item_id != _REMOVED))
+
+    def append(self, item):
+        """Кладёт предмет (id, Item, строку или словарь) в инвентарь."""
+        item_id = item if isinstance(item, int) else intern(item)
+        self._slots.setdefault(item_id, []).append(len(self._ids))
+        self._ids.append(item_id)
+        self._count += 1
+
+    def has(self, name):
+        """Есть ли предмет с таким названием или псевдонимом."""
+        return find_id(name) in self._slots
+
+    def find(self, name):
+        """Запись Item с таким названием или псевдонимом (или None)."""
+        item_id = find_id(name)
+        return CATALOGUE[item_id] if item_id in self._slots else None
+
+    def take(self, name):
+        """Забирает предмет из инвентаря и возвращает его Item (или None)."""
+        item_id = find_id(name)
+        slots = self._slots.get(item_id)
+        if not slots:
+            return None
+        self._release(item_id, slots.pop())
+        return CATALOGUE[item_id]
+
+    def remove(self, name):
+        """Удаляет предмет по названию; возвращает True, если он был."""
+        return self.take(name) is not None
+
+    def pop(self, index=-1):
+        """Удаляет предмет по позиции, как list.pop (используется ловушкой)."""
+        positions = [slot for slot, item_id in enumerate(self._ids) if item_id != _REMOVED]
+        slot = positions[index]
+        item_id = self._ids[slot]
+        self._slots[item_id].remove(slot)
+        self._release(item_id, slot)
+        return CATALOGUE[item_id]
+
+    def copy(self):
+        return Inventory.from_ids(self.ids())
+
+    def _release(self, item_id, slot):
+        if not self._slots[item_id]:
+            del self._slots[item_id]
+        self._ids[slot] = _REMOVED
+        self._count -= 1
+        # Уплотняем, когда пустых ячеек стало больше, чем занятых
+        if len(self._ids) > 2 * self._count + 8:
+            live = self.ids()
+            self._ids = array('i')
+            self._slots = {}
+            self._count = 0
+            for item_id in live:
+                self.append(item_id)
+
+
+def get_inventory(game_state):
+    """Возвращает инвентарь сессии, превращая старый список в Inventory."""
+    inventory = game_state.get('player_inventory')
+    if not isinstance(inventory, Inventory):
+        inventory = game_state['player_inventory'] = Inventory(inventory or ())
+    return inventory
@@ -0,0 +1,96 @@
+"""Модуль для каталога предметов с целочисленными id.
+
+Каждый предмет (строка вроде 'torch' или словарь с 'name'/'description')
+один раз превращается в запись Item с целым id. Комнаты и инвентари хранят
+только массивы таких id, а название и описание берутся из каталога.
+"""
+
+from collections import namedtuple
+from collections.abc import Mapping
+
+from labyrinth_game.constants import ITEM_ALIASES, ROOMS
+
+
+# Запись каталога (namedtuple, а не typing.NamedTuple — ради скорости запуска):
+#   id          — индекс записи в CATALOGUE
+#   key         — канонический ключ ('rusty_key')
+#   name        — отображаемое название
+#   description — описание или None
+Item = namedtuple('Item', ('id', 'key', 'name', 'description'))
+
+
+def normalize_name(name):
+    """Приводит название к виду для сравнения: регистр, '_' и лишние пробелы не важны."""
+    return " ".join(name.lower().replace('_', ' ').split())
+
+
+# Нормализованное название или псевдоним -> канонический ключ предмета
+_ALIAS_INDEX = {}
+for _key, _aliases in ITEM_ALIASES.items():
+    for _alias in (_key, *_aliases):
+        _ALIAS_INDEX[normalize_name(_alias)] = _key
+
+
+def item_key(name):
+    """Канонический ключ предмета по названию или псевдониму."""
+    name = normalize_name(name)
+    return _ALIAS_INDEX.get(name, name)
+
+
+CATALOGUE = []  # id -> Item
+_IDS = {}       # канонический ключ -> id
+_NAMES = {}     # точное название -> id (быстрый путь без нормализации)
+
+
+def intern(item):
+    """Возвращает id предмета, при необходимости добавляя его в каталог."""
+    if isinstance(item, Item):
+        return item.id
+    if isinstance(item, str):
+        item_id = _NAMES.get(item)
+        if item_id is not None:
+            return item_id
+    if isinstance(item, Mapping):
+        name, description = item.get('name', 'предмет'), item.get('description')
+    else:
+        name, description = str(item), None
+    key = item_key(name)
+    item_id = _IDS.get(key)
+    if item_id is None:
+        item_id = len(CATALOGUE)
+        CATALOGUE.append(Item(item_id, key, name, description))
+        _IDS[key] = item_id
+    if description is None:
+        _NAMES[name] = item_id
+    return item_id
+
+
+def find_id(name):
+    """id предмета по названию игрока или None (каталог при этом не растёт)."""
+    item_id = _NAMES.get(name)
+    if item_id is None:
+        item_id = _IDS.get(item_key(name))
+    return item_id
+
+
+def get_item(item_id):
+    return CATALOGUE[item_id]
+
+
+def reward_items(reward):
+    """Награда загадки (один предмет, список или ничего) как последовательность."""
+    if not reward:
+        return ()
+    if isinstance(reward, (list, tuple)):
+        return reward
+    return (reward,)
+
+
+# Каталог заполняется предметами стандартной карты заранее, поэтому их id
+# одинаковы во всех процессах; новые предметы добавляются по мере появления.
+for _room in ROOMS.values():
+    _puzzle = _room.get('puzzle') or {}
+    for _item in (*_room.get('items', ()), *reward_items(_puzzle.get('reward'))):
+        intern(_item)
+for _key in ITEM_ALIASES:
+    intern(_key)
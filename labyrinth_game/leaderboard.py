@@ -0,0 +1,254 @@
+"""Модуль для таблицы рекордов и истории сессий в локальной базе SQLite.
+
+Итоги законченной игры (шаги, счёт, решённые загадки, рейтинг) не пишутся
+на диск в игровом цикле: record() только кладёт строку в очередь, а
+фоновый поток забирает из неё всё накопившееся и вставляет пачкой в одной
+транзакции. Поэтому завершение игры не ждёт диска, а сервер с тысячами
+сессий (server.py) пишет тысячи игр в секунду несколькими транзакциями.
+
+Запросы идут по индексам: лучшие результаты — по (счёт, шаги), история
+игрока — по имени игрока. Таблица в игре — команды leaderboard и history,
+из терминала:
+
+    python -m labyrinth_game.leaderboard                  # лучшие 10
+    python -m labyrinth_game.leaderboard --player alice   # последние игры игрока
+
+По умолчанию база лежит в $XDG_DATA_HOME/labyrinth/scores.db
+(~/.local/share/labyrinth/scores.db), путь меняется флагом --scores или
+переменной окружения LABYRINTH_SCORES.
+"""
+
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+BATCH_SIZE = 1000   # строк в одной транзакции записи, не больше
+TOP = 10
+MAX_ROWS = 1000     # больше строк за один запрос таблица не отдаёт
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id       INTEGER PRIMARY KEY,
+    player   TEXT    NOT NULL,
+    seed     INTEGER NOT NULL,
+    score    INTEGER NOT NULL,
+    steps    INTEGER NOT NULL,
+    solved   INTEGER NOT NULL,
+    items    INTEGER NOT NULL,
+    victory  INTEGER NOT NULL,
+    rating   TEXT    NOT NULL,
+    finished REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_top ON sessions (score DESC, steps);
+CREATE INDEX IF NOT EXISTS sessions_player ON sessions (player);
+"""
+_INSERT = ("INSERT INTO sessions (player, seed, score, steps, solved, items, victory, rating, finished)"
+           " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+_COLUMNS = "player, score, steps, solved, victory, rating, finished"
+
+# Строка таблицы рекордов или истории
+Entry = namedtuple('Entry', ('player', 'score', 'steps', 'solved', 'victory', 'rating', 'finished'))
+
+_STOP = object()   # метка в очереди: писатель завершает работу
+
+
+def default_path():
+    """База по умолчанию: LABYRINTH_SCORES или $XDG_DATA_HOME/labyrinth/scores.db."""
+    path = os.environ.get('LABYRINTH_SCORES')
+    if path:
+        return Path(path)
+    base = os.environ.get('XDG_DATA_HOME') or Path.home() / '.local' / 'share'
+    return Path(base) / 'labyrinth' / 'scores.db'
+
+
+def default_player():
+    return os.environ.get('LABYRINTH_PLAYER') or os.environ.get('USER') or "игрок"
+
+
+def _connect(path, **options):
+    connection = sqlite3.connect(path, **options)
+    # WAL: чтение таблицы не ждёт писателя, а писатель — читателей
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class ScoreStore:
+    """Таблица рекордов в файле SQLite с фоновой пакетной записью.
+
+    record() не обращается к диску; flush() ждёт, пока записано всё
+    отправленное раньше; close() дописывает очередь и останавливает поток.
+    Читать (top, history) можно из любого потока.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # Соединение писателя открывается здесь: ошибка (база занята, нет прав)
+        # достаётся вызывающему, а не убивает поток, которого потом ждёт flush()
+        self._connection = _connect(self.path, check_same_thread=False)
+        try:
+            with self._connection:
+                self._connection.executescript(SCHEMA)
+        except sqlite3.Error:
+            self._connection.close()
+            raise
+        self.batch_size = batch_size
+        self.written = 0       # строк записано
+        self.transactions = 0  # транзакций записи
+        self.failed = 0        # строк, которые не удалось записать
+        self._queue = queue.SimpleQueue()
+        self._reader = None
+        self._read_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name='scores', daemon=True)
+        self._writer.start()
+
+    # --- Запись ---
+
+    def record(self, game_state, rating=''):
+        """Ставит итоги законченной игры в очередь записи."""
+        self._queue.put((
+            game_state.get('player') or default_player(),
+            game_state.get('seed', 0),
+            game_state.get('score', 0),
+            game_state.get('steps_taken', 0),
+            game_state.get('solved_puzzles', 0),
+            len(game_state.get('player_inventory', ())),
+            int(bool(game_state.get('victory'))),
+            rating,
+            time.time(),
+        ))
+
+    def record_rows(self, rows):
+        """Ставит в очередь готовые строки в порядке столбцов _INSERT (импорт, нагрузочные прогоны)."""
+        for row in rows:
+            self._queue.put(tuple(row))
+
+    def flush(self, timeout=None):
+        """Ждёт, пока записано всё, что поставлено в очередь до вызова; True — успели."""
+        if not self._writer.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._read_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_loop(self):
+        connection = self._connection
+        stop = False
+        while not stop:
+            rows, waiting = [], []
+            item = self._queue.get()
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiting.append(item)
+                else:
+                    rows.append(item)
+                if stop or len(rows) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if rows:
+                try:
+                    with connection:
+                        connection.executemany(_INSERT, rows)
+                    self.written += len(rows)
+                    self.transactions += 1
+                except sqlite3.Error as error:
+                    # Игра не должна падать из-за таблицы рекордов: пачка теряется, поток живёт
+                    self.failed += len(rows)
+                    print(f"Таблица рекордов: не удалось записать {len(rows)} игр: {error}",
+                          file=sys.stderr)
+            for done in waiting:
+                done.set()
+        connection.close()
+
+    # --- Чтение ---
+
+    def _query(self, sql, parameters):
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = _connect(self.path, check_same_thread=False)
+            return [Entry(*row) for row in self._reader.execute(sql, parameters)]
+
+    def top(self, limit=TOP):
+        """Лучшие результаты: больше очков, при равенстве — меньше шагов."""
+        return self._query(f"SELECT {_COLUMNS} FROM sessions ORDER BY score DESC, steps LIMIT ?",
+                           (_rows(limit),))
+
+    def history(self, player, limit=TOP):
+        """Последние игры игрока, новые сначала."""
+        return self._query(f"SELECT {_COLUMNS} FROM sessions WHERE player = ? ORDER BY id DESC LIMIT ?",
+                           (player, _rows(limit)))
+
+    def count(self):
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = _connect(self.path, check_same_thread=False)
+            return self._reader.execute("SELECT count(*) FROM sessions").fetchone()[0]
+
+
+def _rows(limit):
+    # LIMIT 0 выглядел бы как пустая таблица, а огромное число SQLite не примет
+    return min(max(int(limit), 1), MAX_ROWS)
+
+
+def format_entry(place, entry, with_player=True):
+    """Строка таблицы: '1. alice — 150 очков, 8 шагов, загадок 2, победа'."""
+    outcome = "победа" if entry.victory else "без победы"
+    who = f"{entry.player} — " if with_player else ""
+    when = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry.finished))
+    return (f"{place:>3}. {who}{entry.score} очков, {entry.steps} шагов, "
+            f"загадок {entry.solved}, {outcome} ({when})")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='leaderboard', description="Таблица рекордов лабиринта")
+    parser.add_argument('--scores', metavar='PATH', help="файл базы (по умолчанию — %(default)s)",
+                        default=str(default_path()))
+    parser.add_argument('--player', help="показать историю игр этого игрока")
+    parser.add_argument('--top', type=int, default=TOP, metavar='N', help="сколько строк показать")
+    args = parser.parse_args(argv)
+
+    with ScoreStore(args.scores) as store:
+        if args.player:
+            entries = store.history(args.player, args.top)
+            title = f"Последние игры {args.player}:"
+        else:
+            entries = store.top(args.top)
+            title = "Таблица рекордов:"
+        if not entries:
+            print("Сыгранных игр пока нет.")
+            return
+        print(title)
+        for place, entry in enumerate(entries, 1):
+            print(format_entry(place, entry, with_player=not args.player))
+
+
+if __name__ == '__main__':
+    main()
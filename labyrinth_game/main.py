@@ -1,11 +1,22 @@
 #!/usr/bin/env python3
 # остальной код ниже
 
-from constants import ROOMS, COMMANDS
-from player_actions import show_inventory, get_input, move_player, take_item, use_item
-from utils import describe_current_room, solve_puzzle, attempt_open_treasure, show_help
+import os
+import sys
+from collections import deque
 
-def process_command(game_state, command_string):
+from labyrinth_game.commands import WHOLE_LINE, lookup, score_store
+from labyrinth_game.events import emit
+from labyrinth_game.player_actions import describe_current_room, get_input
+from labyrinth_game.puzzles import warm_up
+from labyrinth_game.renderer import TerminalRenderer
+from labyrinth_game.world import Template, get_world, new_game_state
+
+CHAIN_SEPARATOR = ';'
+MACRO_DEPTH = 8   # макрос может вызывать другие макросы, но не бесконечно
+PROFILE_MODES = ('cpu', 'memory')   # как metrics.PROFILE_MODES: сам metrics грузится по запросу
+
+def process_command(game_state, command_string, depth=0):
     # Если игра уже завершена, не обрабатываем команды
     if game_state.get('game_over', False):
         return False
@@ -13,211 +24,339 @@ def process_command(game_state, command_string):
     # Разделяем строку на части
     parts = command_string.strip().split()
     if not parts:
-        print("Вы ничего не ввели.")
+        emit(game_state, 'empty_command', "Вы ничего не ввели.")
         return True
+
+    # Цепочка "n; take torch; use torch": команды по очереди, пока игра не закончится
+    if CHAIN_SEPARATOR in command_string and parts[0].lower() not in WHOLE_LINE:
+        result = True
+        for part in command_string.split(CHAIN_SEPARATOR):
+            if part.strip():
+                result = process_command(game_state, part, depth)
+                if game_state.get('game_over', False):
+                    break
+        return result
     
-    # Первое слово - команда, остальное - аргументы
-    cmd = parts[0].lower()
-    args = parts[1:]
-    
-    # Используем match/case для обработки команд
-    match cmd:
-        # Команда осмотреться
-        case "look" | "осмотреться" | "осмотр":
-            describe_current_room(game_state)
-            return True
-        
-        # Команда инвентаря
-        case "inventory" | "инвентарь" | "инв":
-            show_inventory(game_state)
-            return True
-        
-        # Команда перемещения с указанием направления
-        case "go" | "идти" | "move":
-            if not args:
-                print("Укажите направление движения.")
-                return True
-            
-            # Берем последнее слово, если ввели "идти на север"
-            direction = args[-1].lower() 
-            
-            direction_map = {
-                'север': 'north', 'north': 'north', 'n': 'north',
-                'юг': 'south', 'south': 'south', 's': 'south',
-                'запад': 'west', 'west': 'west', 'w': 'west',
-                'восток': 'east', 'east': 'east', 'e': 'east',
-                'вверх': 'up', 'вниз': 'down' 
-            }
-            
-            if direction in direction_map:
-                # Передаем уже стандартизированное английское название
-                move_player(game_state, direction_map[direction])
-            else:
-                # Если направления нет в мапе, пробуем передать как есть (вдруг там кастомный выход)
-                move_player(game_state, direction)
-            return True
-        
-        # Команда взять предмет
-        case "take" | "взять" | "подобрать":
-            if not args:
-                print("Укажите, какой предмет вы хотите взять.")
-                return True
-            
-            item_name = " ".join(args)
-            take_item(game_state, item_name)
-            return True
-        
-        # Команда использования предмета
-        case "use" | "использовать":
-            if not args:
-                print("Укажите, какой предмет вы хотите использовать.")
+    # Первое слово - команда, остальное - аргументы.
+    # Обработчик ищется в реестре команд (commands.py) за одно обращение к словарю.
+    handler = lookup(parts[0])
+    if handler is None:
+        body = game_state.get('macros', {}).get(parts[0].lower())
+        if body is not None:
+            if depth >= MACRO_DEPTH:
+                emit(game_state, 'error', f"Макрос '{parts[0]}' вызывает сам себя слишком глубоко.",
+                     command=command_string)
                 return True
-            
-            item_name = " ".join(args)
-            use_item(game_state, item_name)
-            return True
-        
-        # Команда решения загадки или открытия сундука
-        case "solve" | "решить" | "загадка":
-            # Проверка на treasure_room 
-            if game_state['current_room'] == 'treasure_room':
-                # В treasure_room вызываем функцию открытия сундука
-                from utils import attempt_open_treasure
-                attempt_open_treasure(game_state)
-            else:
-                # В других комнатах решаем загадки
-                solve_puzzle(game_state)
-            return True
-        
-        # Команда открытия сундука (специальная команда)
-        case "open" | "открыть":
-            if game_state['current_room'] == 'treasure_room':
-                from utils import attempt_open_treasure
-                attempt_open_treasure(game_state)
-            else:
-                print("Здесь нечего открывать.")
-            return True
-        
-        # Команды завершения игры
-        case "quit" | "exit" | "выход" | "выйти":
-            print("Вы покидаете Лабиринт. Игра окончена.")
-            game_state['game_over'] = True
-            return False
-        
-        # Команда помощи
-        case "help" | "помощь" | "?":
-            print(COMMANDS)
-            print("nОсобые предметы:")
-            print("  torch/факел - освещает комнату")
-            print("  sword/меч - придает уверенность")
-            print("  bronze box/бронзовая шкатулка - можно открыть")
-            print("nЗагадки:")
-            print("  Решайте загадки с помощью команды 'solve'")
-            print("  Каждая решенная загадка дает очки и награду")
-            print("nПОБЕДА:")
-            print("  Чтобы победить, найдите ключ от сокровищ и откройте сундук")
-            print("  в treasure_room. Или взломайте сундук, решив загадку.")
-            return True
-                  
-        # Команда показа счета 
-        case "score" | "очки" | "счет":
-            print(f"nВаш текущий счет: {game_state['score']} очков")
-            print(f"Решено загадок: {game_state.get('solved_puzzles', 0)}")
-            # Гарантируем, что player_inventory существует и это список/словарь
-            inv_count = len(game_state.get('player_inventory', []))
-            print(f"Собрано предметов: {inv_count}")
-            return True
-        
-        # Односложные команды движения (без слова go)
-        case "north" | "n" | "север":
-            move_player(game_state, 'north')
-            return True
-        case "south" | "s" | "юг":
-            move_player(game_state, 'south')
-            return True
-        case "west" | "w" | "запад":
-            move_player(game_state, 'west')
-            return True
-        case "east" | "e" | "восток":
-            move_player(game_state, 'east')
-            return True
-        
-        # Неизвестная команда (ОСТАВЛЯЕМ ТОЛЬКО ЭТОТ БЛОК В КОНЦЕ ФУНКЦИИ)
-        case _:
-            print(f"Неизвестная команда: '{command_string}'")
-            print("Введите 'help' для списка доступных команд.")
-            return True
-
-
-def main():
-    # Глобальное состояние игры
-    game_state = {
-        'player_inventory': [],      # Инвентарь игрока
-        'current_room': 'entrance',  # Текущая комната
-        'game_over': False,          # Флаг окончания игры
-        'steps_taken': 0,            # Количество шагов
-        'score': 0,                  # Счет игрока
-        'solved_puzzles': 0,         # Количество решенных загадок
-        'victory': False             # Флаг победы
-    }
+            return process_command(game_state, body, depth + 1)
+        emit(game_state, 'unknown_command',
+             f"Неизвестная команда: '{command_string}'\n"
+             "Введите 'help' для списка доступных команд.",
+             command=command_string)
+        return True
 
-    # Приветственное сообщение
-    print("=" * 40)
-    print("Добро пожаловать в Лабиринт сокровищ!")
-    print("=" * 40)
-    print("nВаша цель - исследовать лабиринт, собирать предметы,")
-    print("решать загадки и находить сокровища.")
-    print("nКЛЮЧ К ПОБЕДЕ:")
-    print("1. Найдите ключ от сокровищ (treasure_key)")
-    print("2. Или взломайте сундук кодом")
-    print("3. Откройте сундук в treasure_room")
-    print("nВведите 'help' для списка команд, 'score' для просмотра счета.")
-    print("-" * 50)
+    return handler(game_state, parts[1:], command_string)
 
-    # Описание стартовой комнаты
-    describe_current_room(game_state)
 
-    # Основной игровой цикл
-    while not game_state['game_over']:
-        command = get_input("n> ").strip()
-        if not command:
-            print("Введите команду. Для справки введите 'помощь'.")
-            continue
-        process_command(game_state, command)
+def welcome_text():
+    """Приветственное сообщение в начале игры."""
+    return "\n".join([
+        "=" * 40,
+        "Добро пожаловать в Лабиринт сокровищ!",
+        "=" * 40,
+        "nВаша цель - исследовать лабиринт, собирать предметы,",
+        "решать загадки и находить сокровища.",
+        "nКЛЮЧ К ПОБЕДЕ:",
+        "1. Найдите ключ от сокровищ (treasure_key)",
+        "2. Или взломайте сундук кодом",
+        "3. Откройте сундук в treasure_room",
+        "nВведите 'help' для списка команд, 'score' для просмотра счета.",
+        "-" * 50,
+    ])
 
-    # Завершение игры
-    print("n" + "=" * 50)
-    if game_state.get('victory', False):
-        print("🎉🎉🎉 ПОЗДРАВЛЯЕМ С ПОБЕДОЙ! 🎉🎉🎉")
-        print("Вы нашли сокровище и победили в игре!")
-    else:
-        print("ИГРА ЗАВЕРШЕНА")
-    print("=" * 50)
-
-    print(f"nВаши результаты:")
-    print(f"• Количество сделанных шагов: {game_state['steps_taken']}")
-    print(f"• Ваш счет: {game_state['score']} очков")
-    print(f"• Решено загадок: {game_state.get('solved_puzzles', 0)}")
-    print(f"• Предметов собрано: {len(game_state['player_inventory'])}")
-    
-    # Определяем уровень по очкам
+
+def get_rating(game_state):
+    """Уровень игрока по очкам и исходу игры."""
     score = game_state['score']
     if game_state.get('victory', False):
         if score >= 200:
-            rating = "Легендарный герой! 🏆🏆🏆"
+            return "Легендарный герой! 🏆🏆🏆"
         elif score >= 150:
-            rating = "Великий победитель! 🏆🏆"
+            return "Великий победитель! 🏆🏆"
         else:
-            rating = "Победитель лабиринта! 🏆"
+            return "Победитель лабиринта! 🏆"
     else:
         if score >= 100:
-            rating = "Было близко! ⭐️⭐️⭐️"
+            return "Было близко! ⭐️⭐️⭐️"
         elif score >= 50:
-            rating = "Хорошая попытка! ⭐️⭐️"
+            return "Хорошая попытка! ⭐️⭐️"
         else:
-            rating = "Попробуйте еще раз! ⭐️"
-    print(f"• Рейтинг: {rating}")
-    print("\nСпасибо за игру! До новых приключений")
+            return "Попробуйте еще раз! ⭐️"
+
+
+def final_report(game_state):
+    """Итоги завершённой игры."""
+    lines = ["n" + "=" * 50]
+    if game_state.get('victory', False):
+        lines.append("🎉🎉🎉 ПОЗДРАВЛЯЕМ С ПОБЕДОЙ! 🎉🎉🎉")
+        lines.append("Вы нашли сокровище и победили в игре!")
+    else:
+        lines.append("ИГРА ЗАВЕРШЕНА")
+    lines.append("=" * 50)
+
+    lines.append("nВаши результаты:")
+    lines.append(f"• Количество сделанных шагов: {game_state['steps_taken']}")
+    lines.append(f"• Ваш счет: {game_state['score']} очков")
+    lines.append(f"• Решено загадок: {game_state.get('solved_puzzles', 0)}")
+    lines.append(f"• Предметов собрано: {len(game_state['player_inventory'])}")
+    lines.append(f"• Рейтинг: {get_rating(game_state)}")
+    lines.append("\nСпасибо за игру! До новых приключений")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    # argparse нужен только точке входа: engine и сервер импортируют main без него
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='project', description="Лабиринт сокровищ")
+    parser.add_argument(
+        '--serve', metavar='ADDRESS',
+        help="запустить сервер для многих игроков: HOST:PORT или unix:/путь/к/сокету",
+    )
+    parser.add_argument(
+        '--generate', type=int, metavar='ROOMS',
+        help="играть в сгенерированном лабиринте из ROOMS комнат вместо стандартной карты",
+    )
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help="зерно генератора лабиринта (по умолчанию 0)",
+    )
+    parser.add_argument(
+        '--world', metavar='PATH',
+        help="карта из файла мира (.json, .toml или скомпилированный .lbw)",
+    )
+    parser.add_argument(
+        '--record', metavar='PATH',
+        help="записать команды сессии в журнал для повтора (replay.py)",
+    )
+    parser.add_argument(
+        '--batch', action=argparse.BooleanOptionalAction, default=None,
+        help="пакетный режим: команды и ответы из stdin без приглашений, вывод одной записью "
+             "в конце (по умолчанию — если stdin не терминал, например project < script.txt)",
+    )
+    parser.add_argument(
+        '--scores', metavar='PATH',
+        help="файл SQLite с таблицей рекордов (по умолчанию LABYRINTH_SCORES "
+             "или ~/.local/share/labyrinth/scores.db)",
+    )
+    parser.add_argument(
+        '--no-scores', action='store_true',
+        help="не записывать итоги игр в таблицу рекордов",
+    )
+    parser.add_argument(
+        '--player', metavar='NAME',
+        help="имя игрока в таблице рекордов (по умолчанию LABYRINTH_PLAYER или имя пользователя)",
+    )
+    parser.add_argument(
+        '--idle-timeout', type=float, default=600.0, metavar='SECONDS',
+        help="через сколько секунд без команд сервер закрывает сессию",
+    )
+    parser.add_argument(
+        '--metrics', metavar='PATH',
+        help="собирать метрики команд и записать их в JSON при выходе (или LABYRINTH_METRICS)",
+    )
+    parser.add_argument(
+        '--metrics-serve', metavar='HOST:PORT',
+        help="отдавать метрики по HTTP в формате Prometheus (/metrics) и JSON (/metrics.json)",
+    )
+    parser.add_argument(
+        '--profile', choices=PROFILE_MODES,
+        help="профилировать сессию: cProfile или tracemalloc (или LABYRINTH_PROFILE)",
+    )
+    parser.add_argument(
+        '--profile-out', metavar='PATH',
+        help="куда сохранить статистику cProfile (файл pstats)",
+    )
+    args = parser.parse_args(argv)
+    # Переменная окружения проверяется так же, как choices у --profile
+    if not args.profile and os.environ.get('LABYRINTH_PROFILE'):
+        args.profile = os.environ['LABYRINTH_PROFILE']
+        if args.profile not in PROFILE_MODES:
+            parser.error(f"LABYRINTH_PROFILE: недопустимое значение {args.profile!r} "
+                         f"(выберите из {', '.join(map(repr, PROFILE_MODES))})")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profile = args.profile
+    metrics_path = args.metrics or os.environ.get('LABYRINTH_METRICS')
+    if not (profile or metrics_path or args.metrics_serve):
+        play(args)
+        return
+
+    # Метрики и профилировщик подключаются только по запросу: без них
+    # горячие функции остаются исходными (см. metrics.py)
+    from labyrinth_game import metrics
+    metrics.enable()
+    if args.metrics_serve:
+        metrics.serve(args.metrics_serve)
+    profiler = metrics.Profiler(profile, args.profile_out) if profile else None
+    if profiler:
+        profiler.start()
+    try:
+        play(args)
+    finally:
+        if profiler:
+            profiler.report()
+        if metrics_path:
+            metrics.write_json(metrics_path)
+
+
+def play(args):
+    """Запускает игру (или сервер) с разобранными аргументами командной строки."""
+    template = None
+    rooms = None   # как пересоздать карту при повторе журнала (replay.py)
+    if args.world:
+        from labyrinth_game.worldfile import load_world
+        # Файл мира проверяется и компилируется один раз, дальше читается из кэша через mmap
+        try:
+            template = load_world(args.world)
+        except (ValueError, OSError) as error:
+            # WorldError (ValueError) перечисляет все ошибки файла; трассировка игроку не нужна
+            print(f"Не удалось загрузить мир: {error}", file=sys.stderr)
+            sys.exit(1)
+        rooms = args.world
+    elif args.generate:
+        from labyrinth_game.generator import GeneratedRooms
+        # Один шаблон на все сессии: комнаты компилируются и кэшируются один раз
+        template = Template(GeneratedRooms(args.generate, args.seed))
+        rooms = (args.generate, args.seed)
+    scores = None if args.no_scores else LazyScores(args.scores)
+    try:
+        if args.serve:
+            from labyrinth_game.server import run_server
+            # Сервер пишет итоги многих сессий, поэтому таблица открывается сразу
+            run_server(args.serve, idle_timeout=args.idle_timeout, template=template,
+                       scores=scores() if scores is not None else None)
+            return
+        game_state = new_game_state(template)
+        if scores is not None:
+            game_state['scores'] = scores
+            if args.player:
+                game_state['player'] = args.player   # иначе ScoreStore.record возьмёт default_player()
+        play_session(game_state, args, rooms)
+        store = score_store(game_state)
+        if store is not None:
+            store.record(game_state, get_rating(game_state))
+    finally:
+        if scores is not None:
+            scores.close()
+
+
+class LazyScores:
+    """Таблица рекордов, которая открывается при первом вызове.
+
+    ScoreStore тянет sqlite3 и запускает поток записи, а терминальной игре
+    таблица нужна только в конце (или по команде leaderboard/history), поэтому
+    запуск игры этого не ждёт. Вызов возвращает ScoreStore или None, если
+    база недоступна; game_state['scores'] может хранить такой объект вместо
+    самой таблицы (см. commands.score_store).
+    """
+
+    __slots__ = ('path', 'store', 'opened')
+
+    def __init__(self, path=None):
+        self.path = path   # None — leaderboard.default_path()
+        self.store = None
+        self.opened = False
+
+    def __call__(self):
+        if not self.opened:
+            self.opened = True
+            # Итоги игр пишет фоновый поток таблицы рекордов, игровой цикл диска не ждёт
+            import sqlite3
+
+            from labyrinth_game.leaderboard import ScoreStore, default_path
+            path = self.path or default_path()
+            try:
+                self.store = ScoreStore(path)
+            except (OSError, sqlite3.Error) as error:
+                print(f"Таблица рекордов {path} недоступна ({error}); итоги не сохранятся.",
+                      file=sys.stderr)
+        return self.store
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+
+
+def play_session(game_state, args, rooms=None):
+    """Одна игра в терминале (или по сценарию из stdin) от приветствия до итогов."""
+    # Вывод хода копится в рендерере и пишется в терминал одной записью
+    renderer = game_state['renderer'] = TerminalRenderer()
+
+    recorder = None
+    if args.record:
+        from labyrinth_game.replay import Recorder
+        recorder = Recorder(args.record, rooms)
+
+    # Приветственное сообщение
+    renderer.write(welcome_text())
+
+    # Описание стартовой комнаты
+    if recorder:
+        recorder.start(game_state)
+    else:
+        describe_current_room(game_state)
+
+    batch = args.batch if args.batch is not None else not sys.stdin.isatty()
+    if batch:
+        # Весь ввод читается сразу; вывод копится и пишется одной записью в конце
+        run_script(game_state, sys.stdin.read(), recorder)
+    else:
+        renderer.flush()
+        # Пока игрок читает первую комнату, ответы загадок карты компилируются заранее
+        warm_up(get_world(game_state).template.rooms)
+        # Основной игровой цикл
+        while not game_state['game_over']:
+            command = get_input("n> ").strip()
+            if not command:
+                renderer.write("Введите команду. Для справки введите 'помощь'.")
+            elif recorder:
+                recorder.turn(game_state, command)
+            else:
+                process_command(game_state, command)
+            renderer.flush()
+
+    if recorder:
+        recorder.close()
+
+    # Завершение игры
+    renderer.write(final_report(game_state))
+    renderer.flush()
+
+
+def run_script(game_state, text, recorder=None):
+    """Пакетный режим: выполняет строки text как команды игрока.
+
+    Команды, ответы на загадки и вопросы сундука идут одним потоком:
+    строки лежат в очереди game_state['answers'], так что вопрос команды
+    забирает следующую строку, а не ждёт клавиатуры. Пустые строки и
+    строки с '#' пропускаются; когда строки кончаются, игра завершается
+    командой quit, как при конце ввода в обычном режиме.
+    """
+    lines = game_state['answers'] = deque(line.strip() for line in text.splitlines())
+    try:
+        while not game_state['game_over']:
+            command = lines.popleft() if lines else 'quit'
+            if not command or command.startswith('#'):
+                continue
+            if recorder:
+                recorder.turn(game_state, command)
+            else:
+                process_command(game_state, command)
+    finally:
+        del game_state['answers']
 
 
 # Точка входа
@@ -0,0 +1,305 @@
+"""Модуль для метрик горячих путей и профилирования сессии.
+
+Пока метрики выключены, игра работает с исходными функциями: enable() не
+добавляет проверок в process_command, а подменяет обработчики в реестре
+команд (commands.HANDLERS), методы поиска в Inventory и отрисовку описания
+комнаты (player_actions._room_text) обёртками с замером времени.
+disable() возвращает исходные функции, так что выключенные метрики ничего
+не стоят.
+
+Собирается:
+    гистограмма времени каждой команды по глаголу (look, go, take, ...);
+    число вызовов и суммарное время поиска в инвентаре;
+    число вызовов и суммарное время отрисовки описания комнаты.
+
+Снимок отдаётся словарём (snapshot), JSON-файлом (write_json) или текстом
+в формате Prometheus (prometheus) — в том числе по HTTP (serve):
+
+    project --metrics metrics.json --metrics-serve 127.0.0.1:9100
+    curl 127.0.0.1:9100/metrics
+
+Профилирование (cProfile или tracemalloc) включается флагом --profile или
+переменной окружения LABYRINTH_PROFILE=cpu|memory, метрики — флагом
+--metrics или LABYRINTH_METRICS=путь.
+"""
+
+import json
+import sys
+import time
+from bisect import bisect_left
+
+from labyrinth_game import commands, player_actions
+from labyrinth_game.inventory import Inventory
+
+# Верхние границы корзин гистограммы, секунды (последняя корзина — +Inf)
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+INVENTORY_METHODS = ('has', 'find', 'take', 'pop')
+PROFILE_MODES = ('cpu', 'memory')
+PROFILE_TOP = 25   # строк в отчёте профилировщика
+
+_clock = time.perf_counter
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными корзинами BUCKETS."""
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, fraction):
+        """Верхняя граница корзины, в которую попадает доля fraction замеров.
+
+        None — если это корзина +Inf: у неё нет конечной границы, а Infinity
+        в JSON (write_json, /metrics.json) строгие разборщики не принимают.
+        """
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip((*BUCKETS, None), self.counts):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0.0
+
+
+class Timer:
+    """Число вызовов и суммарное время одного участка кода."""
+
+    __slots__ = ('calls', 'seconds')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+
+commands_seconds = {}      # глагол -> Histogram
+inventory = Timer()
+render = Timer()
+_originals = []            # (объект, атрибут или ключ, исходное значение) для disable()
+_unwrapped = {}            # обёртка обработчика команды -> исходный обработчик
+
+
+def enabled():
+    return bool(_originals)
+
+
+def reset():
+    """Обнуляет собранные метрики (обёртки остаются на месте)."""
+    commands_seconds.clear()
+    inventory.calls = inventory.seconds = 0
+    render.calls = render.seconds = 0
+
+
+def _timed_command(verb, handler):
+    histogram = commands_seconds.setdefault(verb, Histogram())
+
+    def timed(game_state, args, command_string):
+        start = _clock()
+        try:
+            return handler(game_state, args, command_string)
+        finally:
+            histogram.observe(_clock() - start)
+
+    timed.__name__ = handler.__name__
+    timed.__wrapped__ = handler
+    return timed
+
+
+def _timed(timer, function):
+    def timed(*args):
+        start = _clock()
+        try:
+            return function(*args)
+        finally:
+            timer.calls += 1
+            timer.seconds += _clock() - start
+
+    timed.__name__ = function.__name__
+    timed.__wrapped__ = function
+    return timed
+
+
+def enable():
+    """Подменяет горячие функции обёртками с замером времени (повторный вызов ничего не делает)."""
+    if _originals:
+        return
+    # Глагол команды — первый псевдоним, под которым зарегистрирован обработчик
+    wrapped = {}
+    for alias, handler in list(commands.HANDLERS.items()):
+        if handler not in wrapped:
+            wrapped[handler] = _timed_command(alias, handler)
+            _unwrapped[wrapped[handler]] = handler
+        _originals.append((commands.HANDLERS, alias, handler))
+        commands.HANDLERS[alias] = wrapped[handler]
+    for name in INVENTORY_METHODS:
+        method = getattr(Inventory, name)
+        _originals.append((Inventory, name, method))
+        setattr(Inventory, name, _timed(inventory, method))
+    _originals.append((player_actions, '_room_text', player_actions._room_text))
+    player_actions._room_text = _timed(render, player_actions._room_text)
+
+
+def disable():
+    """Возвращает исходные функции; собранные метрики сохраняются."""
+    while _originals:
+        target, name, original = _originals.pop()
+        if isinstance(target, dict):
+            target[name] = original
+        else:
+            setattr(target, name, original)
+    # Псевдонимы, добавленные после enable() (commands.add_specs из файла мира),
+    # ссылаются на обёртки — их в _originals нет, поэтому проходим по всему реестру
+    for alias, handler in list(commands.HANDLERS.items()):
+        original = _unwrapped.get(handler)
+        if original is not None:
+            commands.HANDLERS[alias] = original
+    _unwrapped.clear()
+
+
+def snapshot():
+    """Метрики в виде словаря, пригодного для json.dumps."""
+    return {
+        'commands': {
+            verb: {
+                'calls': histogram.count,
+                'seconds': histogram.total,
+                'p50': histogram.quantile(0.5),
+                'p99': histogram.quantile(0.99),
+                'buckets': dict(zip([*map(str, BUCKETS), '+Inf'], histogram.counts)),
+            }
+            for verb, histogram in sorted(commands_seconds.items()) if histogram.count
+        },
+        'inventory': {'calls': inventory.calls, 'seconds': inventory.seconds},
+        'render': {'calls': render.calls, 'seconds': render.seconds,
+                   'cached_rooms': len(player_actions._room_texts)},
+    }
+
+
+def write_json(path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(snapshot(), file, ensure_ascii=False, allow_nan=False, indent=2)
+        file.write("\n")
+
+
+def _label(value):
+    """Значение метки Prometheus: \\, " и перевод строки экранируются по формату."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus():
+    """Метрики в текстовом формате Prometheus (exposition format 0.0.4)."""
+    lines = [
+        "# HELP labyrinth_command_seconds Время обработки команды игрока.",
+        "# TYPE labyrinth_command_seconds histogram",
+    ]
+    for verb, histogram in sorted(commands_seconds.items()):
+        if not histogram.count:
+            continue
+        # Глаголы приходят и из псевдонимов файла мира (commands.add_specs)
+        verb = _label(verb)
+        seen = 0
+        for bound, count in zip((*map(repr, BUCKETS), '+Inf'), histogram.counts):
+            seen += count
+            lines.append(f'labyrinth_command_seconds_bucket{{verb="{verb}",le="{bound}"}} {seen}')
+        lines.append(f'labyrinth_command_seconds_sum{{verb="{verb}"}} {histogram.total!r}')
+        lines.append(f'labyrinth_command_seconds_count{{verb="{verb}"}} {histogram.count}')
+    for name, timer, title in (('inventory', inventory, "поиск в инвентаре"),
+                               ('render', render, "отрисовка описания комнаты")):
+        lines += [
+            f"# HELP labyrinth_{name}_calls_total Вызовы: {title}.",
+            f"# TYPE labyrinth_{name}_calls_total counter",
+            f"labyrinth_{name}_calls_total {timer.calls}",
+            f"# HELP labyrinth_{name}_seconds_total Суммарное время: {title}.",
+            f"# TYPE labyrinth_{name}_seconds_total counter",
+            f"labyrinth_{name}_seconds_total {timer.seconds!r}",
+        ]
+    lines += [
+        "# HELP labyrinth_room_text_cache_entries Готовые описания комнат в кэше.",
+        "# TYPE labyrinth_room_text_cache_entries gauge",
+        f"labyrinth_room_text_cache_entries {len(player_actions._room_texts)}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def serve(address):
+    """Отдаёт метрики по HTTP в фоновом потоке: /metrics (Prometheus) и /metrics.json.
+
+    address — HOST:PORT; возвращает запущенный HTTP-сервер.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, kind = prometheus(), 'text/plain; version=0.0.4; charset=utf-8'
+            elif self.path == '/metrics.json':
+                body = json.dumps(snapshot(), ensure_ascii=False, allow_nan=False)
+                kind = 'application/json'
+            else:
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', kind)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # запросы сборщика метрик не должны попадать в вывод игры
+
+    host, _, port = address.rpartition(':')
+    server = ThreadingHTTPServer((host or '127.0.0.1', int(port)), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
+
+
+class Profiler:
+    """Профилирование сессии: 'cpu' — cProfile, 'memory' — tracemalloc.
+
+    report() пишет в stream самые тяжёлые функции (или места выделения
+    памяти); для 'cpu' при заданном path туда же сохраняется файл pstats.
+    """
+
+    def __init__(self, mode, path=None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Неизвестный режим профилирования: {mode!r}")
+        self.mode = mode
+        self.path = path
+        self._profile = None
+
+    def start(self):
+        if self.mode == 'cpu':
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            import tracemalloc
+            tracemalloc.start(10)
+
+    def report(self, stream=None):
+        stream = stream or sys.stderr
+        if self.mode == 'cpu':
+            self._profile.disable()
+            import pstats
+            if self.path:
+                self._profile.dump_stats(self.path)
+            pstats.Stats(self._profile, stream=stream).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        else:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            stream.write(f"Память: сейчас {current / 1024:.0f} КиБ, пик {peak / 1024:.0f} КиБ\n")
+            for stat in snapshot.statistics('lineno')[:PROFILE_TOP]:
+                stream.write(f"{stat}\n")
+
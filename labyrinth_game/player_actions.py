@@ -1,251 +1,212 @@
 """Модуль для функций, связанных с действиями игрока."""
 
-from constants import ROOMS
+from collections import OrderedDict
 
-def get_input(prompt="> "):
-    try:
-        return input(prompt).strip()
-    except (KeyboardInterrupt, EOFError):
-        print("\n\nВыход из игры.")
-        return "quit"
+from labyrinth_game.events import emit, get_input  # noqa: F401 (get_input — для совместимости)
+from labyrinth_game.inventory import get_inventory
+from labyrinth_game.items import CATALOGUE, find_id
+from labyrinth_game.triggers import fire
+from labyrinth_game.world import get_world
 
-def describe_current_room(game_state):
-    current_room_key = game_state.get('current_room')
-    room = ROOMS.get(current_room_key)
-    
-    if not room:
-        print("Вы находитесь в неизвестном месте.")
-        return
+# Готовые описания комнат: stamp комнаты -> (текст, предметы, выходы).
+# Версия меняется при любом изменении комнаты (World.edit_room), так что
+# устаревшие записи просто перестают запрашиваться и вытесняются по LRU.
+ROOM_TEXT_CACHE_SIZE = 4096
+_room_texts = OrderedDict()
 
-    name = room.get('name', current_room_key).upper()
-    print(f"\n== {name} ==")
 
-    description = room.get('description', 'Здесь ничего особенного.')
-    print(description)
+def _room_text(room):
+    cached = _room_texts.get(room.stamp)
+    if cached is not None:
+        _room_texts.move_to_end(room.stamp)
+        return cached
 
-    # Список видимых предметов (исправлен отступ)
-    items = room.get('items', [])
+    # Используем имя комнаты или ключ, если имя не указано
+    room_name = room.name.replace('_', ' ').upper()
+    lines = [f"\n== {room_name} =="]
+    lines.append(room.description)
+
+    # Список видимых предметов (названия берутся из каталога по id)
+    items = tuple(CATALOGUE[item_id].name for item_id in room.items)
     if items:
-        print("\nЗаметные предметы:")
-        for item in items:
-            if isinstance(item, dict):
-                print(f"  • {item.get('name', 'Неизвестный предмет')}")
-            else:
-                print(f"  • {item}")
+        lines.append("\n📦 Заметные предметы:")
+        for name in items:
+            lines.append(f"  • {name}")
     
     # Доступные выходы
-    exits = room.get('exits', {})
+    exits = room.exits
     if exits:
         exits_list = ", ".join(exits.keys())
-        print(f"\nВыходы: {exits_list}")
+        lines.append(f"\n🚪 Выходы: {exits_list}")
     
     # Сообщение о наличии загадки
-    if room.get('puzzle'):
-        print("\n🧩 Кажется, здесь есть загадка (используйте команду 'solve').")
+    if room.puzzle:
+        lines.append("\n❓ Кажется, здесь есть загадка (используйте команду 'solve').")
+
+    cached = _room_texts[room.stamp] = ("\n".join(lines), items, tuple(exits))
+    if len(_room_texts) > ROOM_TEXT_CACHE_SIZE:
+        _room_texts.popitem(last=False)
+    return cached
+
+
+def describe_current_room(game_state):
+    current_room_key = game_state.get('current_room')
+    room = get_world(game_state).room(current_room_key)
+    
+    if not room:
+        emit(game_state, 'room', "Вы находитесь в неизвестном месте.", room=current_room_key)
+        return
+
+    text, items, exits = _room_text(room)
+    emit(game_state, 'room', text, room=current_room_key,
+         items=list(items), exits=list(exits), puzzle=bool(room.puzzle))
 
 def show_inventory(game_state):
     
-    inventory = game_state.get('player_inventory') or []
+    inventory = get_inventory(game_state)
 
     if not inventory:
-        print("Инвентарь пуст.")
+        emit(game_state, 'inventory', "Инвентарь пуст.", items=[])
         return
 
-    print("\n=== ИНВЕНТАРЬ ===\n")
+    lines = ["\n=== ИНВЕНТАРЬ ===\n"]
 
     def print_item(index, name, desc=None):
-        print(f"{index}. {name}")
+        lines.append(f"{index}. {name}")
         if desc:
-            print(f"   {desc}")
-
-    if isinstance(inventory, list):
-        for index, item in enumerate(inventory, 1):
-            if isinstance(item, str):
-                print_item(index, item)
-            elif isinstance(item, dict):
-                print_item(
-                    index,
-                    item.get('name', 'Неизвестный предмет'),
-                    item.get('description')
-                )
-            else:
-                print_item(index, f"[неизвестный формат] {item}")
-
-    elif isinstance(inventory, dict):
-        for index, item in enumerate(inventory.values(), 1):
-            if isinstance(item, str):
-                print_item(index, item)
-            elif isinstance(item, dict):
-                print_item(index, item.get('name', 'Неизвестный предмет'), item.get('description'))
-            else:
-                print_item(index, f"[неизвестный формат] {item}")
+            lines.append(f"   {desc}")
 
-    else:
-        print(f"Содержимое инвентаря: {inventory}")
+    for index, item in enumerate(inventory, 1):
+        print_item(index, item.name, item.description)
+
+    emit(game_state, 'inventory', "\n".join(lines), items=[item.key for item in inventory])
 
 def move_player(game_state, direction):
     current_room_key = game_state['current_room']
-    current_room = ROOMS[current_room_key]
+    current_room = get_world(game_state).room(current_room_key)
     
-    exits = current_room.get('exits', {})
+    exits = current_room.exits
     
     if direction in exits:
         # Проверка для перехода в treasure_room
         if exits.get(direction) == 'treasure_room':
-            inventory = game_state.get('player_inventory', [])
-            has_rusty_key = False
-            
-            # Твоя логика поиска ключа
-            for item in inventory:
-                if isinstance(item, str) and item.lower() in ['rusty_key', 'rusty key', 'ржавый ключ']:
-                    has_rusty_key = True
-                    break
-                elif isinstance(item, dict):
-                    item_name = item.get('name', '').lower()
-                    if item_name in ['rusty_key', 'rusty key', 'ржавый ключ']:
-                        has_rusty_key = True
-                        break
-            
-            if not has_rusty_key:
-                print("\n🔒 Дверь заперта. Нужен ключ, чтобы пройти дальше.")
-                print("Похоже, нужен ржавый ключ...")
+            # Ключ ищется по индексу инвентаря с учетом всех псевдонимов
+            if not get_inventory(game_state).has('rusty_key'):
+                emit(game_state, 'blocked',
+                     "\n🔒 Дверь заперта. Нужен ключ, чтобы пройти дальше.\n"
+                     "Похоже, нужен ржавый ключ...",
+                     direction=direction, room=exits[direction], reason='locked')
                 return False
             else:
-                print("\n🗝️ Вы используете найденный ключ, чтобы открыть путь в комнату сокровищ.")
+                emit(game_state, 'unlock',
+                     "\n🗝️ Вы используете найденный ключ, чтобы открыть путь в комнату сокровищ.",
+                     room=exits[direction])
                
         # Перемещаем игрока
         game_state['current_room'] = exits[direction]
         game_state['steps_taken'] = game_state.get('steps_taken', 0) + 1
+        emit(game_state, 'move', '', direction=direction,
+             from_room=current_room_key, to_room=exits[direction])
         
         describe_current_room(game_state)
         
-        # Случайное событие (импорт внутри функции — ок для скриптов)
-        try:
-            from utils import random_event
-            random_event(game_state)
-        except ImportError:
-            pass # Если файла еще нет, игра не упадет
+        # Триггеры входа в комнату (случайные события, ловушки — см. triggers.py)
+        fire(game_state, 'enter')
         
         return True
     else:
-        print("🚫 Нельзя пойти в этом направлении.")
+        emit(game_state, 'blocked', "🚫 Нельзя пойти в этом направлении.",
+             direction=direction, room=None, reason='no_exit')
         return False
     
 def take_item(game_state, item_name):
     # Получаем текущую комнату
     current_room_key = game_state['current_room']
-    current_room = ROOMS[current_room_key]
-    
-    # Получаем список предметов в комнате
-    room_items = current_room.get('items', [])
+    world = get_world(game_state)
+    current_room = world.room(current_room_key)
     
     # Если предметов нет
-    if not room_items:
-        print("Здесь нет предметов.")
+    if not current_room.items:
+        emit(game_state, 'not_found', "Здесь нет предметов.", item=item_name)
         return False
     
-    # Ищем предмет в комнате (без учета регистра)
-    found_item = None
-    found_index = -1
-    
-    for i, item in enumerate(room_items):
-        # Проверяем разные форматы предметов
-        if isinstance(item, str):
-            if item.lower() == item_name.lower():
-                found_item = item
-                found_index = i
-                break
-        elif isinstance(item, dict):
-            # Если предмет - словарь, ищем по ключу 'name'
-            item_name_in_dict = item.get('name', '')
-            if item_name_in_dict.lower() == item_name.lower():
-                found_item = item
-                found_index = i
-                break
+    # Ищем предмет в комнате по id (без учета регистра, с учетом псевдонимов)
+    found_id = find_id(item_name)
     
     # Если предмет найден
-    if found_item is not None:
+    if found_id is not None and found_id in current_room.items:
         # Добавляем предмет в инвентарь игрока
-        game_state['player_inventory'].append(found_item)
+        get_inventory(game_state).append(found_id)
         
-        # Удаляем предмет из комнаты
-        room_items.pop(found_index)
+        # Удаляем предмет из комнаты (в копии комнаты этой сессии)
+        world.edit_room(current_room_key).items.remove(found_id)
         
-        # Выводим сообщение об успешном взятии
-        if isinstance(found_item, dict):
-            print(f"🛍️ Вы подняли: {found_item.get('name', 'предмет')}")
-        else:
-            print(f"🛍️ Вы подняли: {found_item}")
+        # Сообщаем об успешном взятии
+        found_item = CATALOGUE[found_id]
+        emit(game_state, 'take', f"🛍️ Вы подняли: {found_item.name}",
+             item=found_item.key, room=current_room_key)
+        fire(game_state, 'take', found_id)
         
         return True
     else:
         # Предмет не найден (исправлен return)
-        print("Такого предмета здесь нет.")
+        emit(game_state, 'not_found', "Такого предмета здесь нет.", item=item_name)
         return
     
 def use_item(game_state, item_name):
     # Получаем инвентарь игрока
-    inventory = game_state.get('player_inventory', [])
-    
-    # Ищем предмет в инвентаре
-    found_item = None
-    item_index = -1
-    
-    for i, item in enumerate(inventory):
-        if isinstance(item, str):
-            if item.lower() == item_name.lower():
-                found_item = item
-                item_index = i
-                break
-        elif isinstance(item, dict):
-            item_name_in_dict = item.get('name', '')
-            if item_name_in_dict.lower() == item_name.lower():
-                found_item = item
-                item_index = i
-                break
+    inventory = get_inventory(game_state)
+    
+    # Ищем предмет в инвентаре по индексу (название или псевдоним)
+    found_item = inventory.find(item_name)
     
     # Если предмет не найден
     if found_item is None:
-        print("У вас нет такого предмета.")
+        emit(game_state, 'not_found', "У вас нет такого предмета.", item=item_name)
         return False
     
-    # Определяем фактическое название предмета
-    actual_name = found_item if isinstance(found_item, str) else found_item.get('name', 'предмет')
-    item_name_lower = actual_name.lower()
-    
-    if item_name_lower in ["torch", "факел"]:
-        print("\n🔥 Вы зажгли факел. Стало значительно светлее!")
-        print("Теперь вы можете разглядеть скрытые детали в комнатах.")
-        return True
-    
-    elif item_name_lower in ["sword", "меч"]:
-        print("\n⚔️ Вы достали меч и почувствовали уверенность в себе.")
-        print("Теперь вы готовы к опасностям!")
-        return True
-    
-    elif item_name_lower in ["bronze box", "бронзовая шкатулка"]:
-        print("\n📦 Вы открываете бронзовую шкатулку...")
-        print("Внутри вы находите старый ржавый ключ!")
+    # Определяем фактическое название предмета и его канонический ключ
+    actual_name = found_item.name
+    kind = found_item.key
+    
+    if kind == 'torch':
+        emit(game_state, 'use',
+             "\n🔥 Вы зажгли факел. Стало значительно светлее!\n"
+             "Теперь вы можете разглядеть скрытые детали в комнатах.",
+             item=kind)
+    
+    elif kind == 'sword':
+        emit(game_state, 'use',
+             "\n⚔️ Вы достали меч и почувствовали уверенность в себе.\n"
+             "Теперь вы готовы к опасностям!",
+             item=kind)
+    
+    elif kind == 'bronze_box':
+        emit(game_state, 'use',
+             "\n📦 Вы открываете бронзовую шкатулку...\n"
+             "Внутри вы находите старый ржавый ключ!",
+             item=kind)
         
         # Проверка дубликата ключа
-        has_key = any(
-            (isinstance(it, str) and it.lower() in ["rusty key", "ржавый ключ"]) or
-            (isinstance(it, dict) and it.get('name', '').lower() in ["rusty key", "ржавый ключ"])
-            for it in inventory
-        )
-        
-        if not has_key:
-            game_state['player_inventory'].append("ржавый ключ")
-            print("🎁 Вы получили: ржавый ключ")
+        if not inventory.has('rusty_key'):
+            inventory.append("ржавый ключ")
+            emit(game_state, 'reward', "🎁 Вы получили: ржавый ключ", item='rusty_key')
         else:
-            print("Но у вас уже есть такой ключ.")
+            emit(game_state, 'message', "Но у вас уже есть такой ключ.")
         
         # УДАЛЕНИЕ ШКАТУЛКИ (чтобы не открывать бесконечно)
-        inventory.pop(item_index)
-        print(f"(Предмет {actual_name} исчез из инвентаря)")
-        
-        return True
-    
+        inventory.remove(item_name)
+        emit(game_state, 'item_lost', f"(Предмет {actual_name} исчез из инвентаря)",
+             item=kind)
+    
+    # Остальные предметы используются только через триггеры use из данных мира
+    elif not fire(game_state, 'use', found_item.id):
+        emit(game_state, 'use_failed', f"Вы не знаете, как использовать {actual_name}.",
+             item=kind)
+        return False
     else:
-        print(f"Вы не знаете, как использовать {actual_name}.")
-        return False
\ No newline at end of file
+        return True
+
+    # Встроенное действие выполнено; триггеры use могут его дополнить
+    fire(game_state, 'use', found_item.id)
+    return True
\ No newline at end of file
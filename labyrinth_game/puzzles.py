@@ -0,0 +1,151 @@
+"""Модуль для проверки ответов на загадки.
+
+Ответ загадки один раз превращается в frozenset допустимых нормализованных
+форм (кэш по значению ответа), после чего каждая проверка — одна
+нормализация строки и одно обращение к множеству. Ответы карты заранее
+компилирует warm_up(), пока игрок читает первую комнату: сам импорт модуля
+таблицу числительных не строит, чтобы не замедлять запуск.
+
+Нормализация: регистр, ё -> е, лишние пробелы. Числа принимаются цифрами
+(с ведущими нулями тоже) и словами от 0 до 1000 в именительном,
+родительном и творительном падежах: "10", "десять", "десяти", "десятью".
+Словесные формы порождаются из таблиц частей числа, а не перечисляются
+вручную.
+"""
+
+from functools import lru_cache
+
+MAX_NUMBER_WORDS = 1000
+WARM_UP_ROOMS = 1000   # карты больше компилируют ответы при первой проверке
+
+# Части числительных по падежам: именительный, родительный, творительный
+_UNITS = (
+    ('ноль', 'ноля', 'нолем'),
+    ('один', 'одного', 'одним'),
+    ('два', 'двух', 'двумя'),
+    ('три', 'трех', 'тремя'),
+    ('четыре', 'четырех', 'четырьмя'),
+    ('пять', 'пяти', 'пятью'),
+    ('шесть', 'шести', 'шестью'),
+    ('семь', 'семи', 'семью'),
+    ('восемь', 'восьми', 'восемью'),
+    ('девять', 'девяти', 'девятью'),
+)
+_TEEN_STEMS = ('десят', 'одиннадцат', 'двенадцат', 'тринадцат', 'четырнадцат',
+               'пятнадцат', 'шестнадцат', 'семнадцат', 'восемнадцат', 'девятнадцат')
+_TEENS = tuple((stem + 'ь', stem + 'и', stem + 'ью') for stem in _TEEN_STEMS)
+_TENS = (
+    None,
+    None,
+    ('двадцать', 'двадцати', 'двадцатью'),
+    ('тридцать', 'тридцати', 'тридцатью'),
+    ('сорок', 'сорока', 'сорока'),
+    *((unit[0] + 'десят', unit[1] + 'десяти', unit[2] + 'десятью') for unit in _UNITS[5:9]),
+    ('девяносто', 'девяноста', 'девяноста'),
+)
+_HUNDREDS = (
+    None,
+    ('сто', 'ста', 'ста'),
+    ('двести', 'двухсот', 'двумястами'),
+    *((unit[0] + 'ста', unit[1] + 'сот', unit[2] + 'стами') for unit in _UNITS[3:5]),
+    *((unit[0] + 'сот', unit[1] + 'сот', unit[2] + 'стами') for unit in _UNITS[5:10]),
+)
+_THOUSAND = ('тысяча', 'тысячи', 'тысячей')
+_CASES = range(3)
+
+
+def number_words(number, case=0):
+    """Число от 0 до 1000 словами в заданном падеже (0 — именительный)."""
+    if number == 1000:
+        return _THOUSAND[case]
+    if number == 0:
+        return _UNITS[0][case]
+    hundreds, rest = divmod(number, 100)
+    tens, units = divmod(rest, 10)
+    parts = []
+    if hundreds:
+        parts.append(_HUNDREDS[hundreds][case])
+    if tens == 1:
+        parts.append(_TEENS[units][case])
+    else:
+        if tens:
+            parts.append(_TENS[tens][case])
+        if units:
+            parts.append(_UNITS[units][case])
+    return " ".join(parts)
+
+
+def normalize_answer(text):
+    """Форма ответа для сравнения: нижний регистр, ё -> е, одиночные пробелы."""
+    text = " ".join(str(text).lower().replace('ё', 'е').split())
+    if _is_number(text):
+        return str(int(text))  # "010" и "10" — один ответ
+    return text
+
+
+def _is_number(text):
+    # isdigit() верно и для "²" или "٣", но int() такие строки не разбирает
+    return text.isascii() and text.isdigit()
+
+
+@lru_cache(maxsize=None)
+def _word_numbers():
+    """Нормализованная словесная форма -> число; строится при первой загадке.
+
+    Таблица из ~3000 форм не нужна, пока игрок не дошёл до загадки, поэтому
+    она не замедляет запуск игры.
+    """
+    words = {}
+    for number in range(MAX_NUMBER_WORDS + 1):
+        for case in _CASES:
+            words.setdefault(normalize_answer(number_words(number, case)), number)
+    return words
+
+
+def _number_forms(number):
+    forms = {str(number)}
+    if number <= MAX_NUMBER_WORDS:
+        forms.update(normalize_answer(number_words(number, case)) for case in _CASES)
+    return forms
+
+
+@lru_cache(maxsize=4096)
+def _compile(answer):
+    accepted = set()
+    for option in answer if isinstance(answer, tuple) else (answer,):
+        form = normalize_answer(option)
+        number = int(form) if _is_number(form) else _word_numbers().get(form)
+        if number is None:
+            accepted.add(form)
+        else:
+            accepted.update(_number_forms(number))
+    return frozenset(accepted)
+
+
+def accepted_answers(answer):
+    """frozenset допустимых форм для ответа загадки (строка, число или список вариантов)."""
+    if isinstance(answer, list):
+        answer = tuple(answer)
+    return _compile(answer)
+
+
+def is_correct(answer, reply):
+    """Подходит ли ответ игрока reply к ответу загадки answer."""
+    return normalize_answer(reply) in accepted_answers(answer)
+
+
+def warm_up(rooms):
+    """Компилирует ответы всех загадок карты rooms (описания в формате ROOMS).
+
+    Возвращает число загадок; у огромных карт (больше WARM_UP_ROOMS комнат)
+    ничего не делает — обход всех комнат обошёлся бы дороже самих проверок.
+    """
+    if len(rooms) > WARM_UP_ROOMS:
+        return 0
+    compiled = 0
+    for data in rooms.values():
+        puzzle = data.get('puzzle')
+        if puzzle:
+            accepted_answers(puzzle.get('answer', ''))
+            compiled += 1
+    return compiled
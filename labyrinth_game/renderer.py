@@ -0,0 +1,89 @@
+"""Модуль для вывода текста игры с буферизацией по ходам.
+
+Сообщения хода (emit) не печатаются по одному, а копятся в рендерере как
+список фрагментов; flush() в конце хода выводит их одной записью. Это
+одна системная запись на ход вместо десятков print() — заметно, когда игра
+идёт через пайп или сокет.
+
+Рендерер сессии лежит в game_state['renderer']:
+
+    TerminalRenderer — терминал (или любой текстовый поток);
+    NullRenderer     — ничего не выводит (симуляции, нагрузочные прогоны);
+    BufferRenderer   — копит текст в строку для сетевой сессии (take()).
+"""
+
+import sys
+
+
+class Renderer:
+    """Общая часть: фрагменты хода копятся в списке до flush()."""
+
+    __slots__ = ('fragments',)
+
+    def __init__(self):
+        self.fragments = []
+
+    def write(self, text):
+        self.fragments.append(text)
+
+    def render(self):
+        """Текст накопленных фрагментов (по фрагменту на строку) с очисткой буфера."""
+        if not self.fragments:
+            return ''
+        text = "\n".join(self.fragments) + "\n"
+        self.fragments.clear()
+        return text
+
+    def flush(self):
+        raise NotImplementedError
+
+
+class TerminalRenderer(Renderer):
+    """Пишет ход в поток (по умолчанию sys.stdout) одним вызовом write."""
+
+    __slots__ = ('stream',)
+
+    def __init__(self, stream=None):
+        super().__init__()
+        self.stream = stream
+
+    def flush(self):
+        text = self.render()
+        if text:
+            stream = self.stream or sys.stdout
+            stream.write(text)
+            stream.flush()
+
+
+class NullRenderer(Renderer):
+    """Отбрасывает весь вывод, ничего не накапливая."""
+
+    __slots__ = ()
+
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+class BufferRenderer(Renderer):
+    """Собирает вывод в строку, которую забирает take() (например, для сокета)."""
+
+    __slots__ = ('_chunks',)
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def flush(self):
+        text = self.render()
+        if text:
+            self._chunks.append(text)
+
+    def take(self):
+        """Весь накопленный текст (включая ещё не сброшенный) с очисткой буфера."""
+        self.flush()
+        text = "".join(self._chunks)
+        self._chunks.clear()
+        return text
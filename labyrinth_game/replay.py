@@ -0,0 +1,197 @@
+"""Модуль для записи сессий в журнал команд и их детерминированного повтора.
+
+Журнал — текстовый файл JSON Lines. Первая строка — заголовок с зерном
+сессии и картой, дальше по строке на ход:
+
+    {"format": "labyrinth-replay", "version": 1, "seed": 42, "rooms": null, "start": "..."}
+    ["east", [], "9f2c..."]
+    ["solve", ["шаг шаг шаг"], "41d0..."]
+
+В строке хода — команда, ответы игрока на вопросы этой команды и отпечаток
+хода: хэш всех событий хода вместе с полным снимком game_state
+(savegame.dumps). Повтор прогоняет команды через process_command без
+терминала и сравнивает отпечатки, так что расхождение в любом событии или
+в состоянии находится с точностью до хода.
+
+    project --record session.jsonl           # записать свою игру
+    replay logs/*.jsonl --workers 8          # прогнать корпус журналов
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
+from typing import NamedTuple
+
+from labyrinth_game.generator import GeneratedRooms
+from labyrinth_game.main import process_command
+from labyrinth_game.player_actions import describe_current_room
+from labyrinth_game.savegame import dumps
+from labyrinth_game.world import Template, new_game_state
+
+FORMAT = 'labyrinth-replay'
+VERSION = 1
+
+
+class Divergence(NamedTuple):
+    turn: int           # номер хода (0 — описание стартовой комнаты)
+    command: str
+    expected: str       # отпечаток из журнала
+    actual: str         # отпечаток при повторе
+    events: list        # тексты событий хода при повторе
+
+
+class Result(NamedTuple):
+    path: str
+    turns: int
+    divergence: Divergence | None
+
+
+class _Echo(list):
+    """Буфер событий, который заодно передаёт их текст рендереру (запись живой игры)."""
+
+    def __init__(self, renderer):
+        super().__init__()
+        self.renderer = renderer
+
+    def append(self, event):
+        if event.text:
+            self.renderer.write(event.text)
+        super().append(event)
+
+
+def fingerprint(events, game_state):
+    """Отпечаток хода: события по порядку плюс байты снимка состояния."""
+    digest = blake2b(digest_size=8)
+    for event in events:
+        digest.update(f"{event.kind}\0{event.text}\0{sorted(event.data.items())!r}\n".encode())
+    digest.update(dumps(game_state))
+    return digest.hexdigest()
+
+
+def _template(rooms):
+    if rooms is None:
+        return None
+    if isinstance(rooms, str):
+        from labyrinth_game.worldfile import load_world
+        return load_world(rooms)
+    return Template(GeneratedRooms(*rooms))
+
+
+def _dump(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class Recorder:
+    """Записывает живую сессию: команды, ответы на вопросы и отпечатки ходов.
+
+    Вывод игроку не меняется: текст событий идёт в рендерер сессии
+    (game_state['renderer']), как и без записи.
+    """
+
+    def __init__(self, path, rooms=None):
+        # rooms — (размер, зерно) сгенерированного лабиринта, путь к файлу мира или None
+        self.file = open(path, 'w', encoding='utf-8')
+        self.rooms = rooms
+
+    def start(self, game_state):
+        """Описывает стартовую комнату и пишет заголовок журнала."""
+        events = self._run(game_state, describe_current_room)[0]
+        header = {'format': FORMAT, 'version': VERSION, 'seed': game_state['seed'],
+                  'rooms': self.rooms, 'start': fingerprint(events, game_state)}
+        self.file.write(_dump(header) + "\n")
+
+    def turn(self, game_state, command):
+        """Выполняет команду игрока и дописывает ход в журнал."""
+        events, asked, result = self._run(game_state, lambda gs: process_command(gs, command))
+        self.file.write(_dump([command, asked, fingerprint(events, game_state)]) + "\n")
+        self.file.flush()
+        return result
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def _run(game_state, action):
+        events = game_state['events'] = _Echo(game_state['renderer'])
+        asked = game_state['asked'] = []   # ответы с клавиатуры (см. events.ask)
+        try:
+            result = action(game_state)
+        finally:
+            del game_state['events'], game_state['asked']
+        return events, asked, result
+
+
+def read_log(path):
+    """Заголовок журнала и список ходов [(команда, ответы, отпечаток)]."""
+    with open(path, encoding='utf-8') as file:
+        header = json.loads(file.readline())
+        if header.get('format') != FORMAT or header.get('version') != VERSION:
+            raise ValueError(f"{path}: это не журнал сессии лабиринта")
+        turns = [tuple(json.loads(line)) for line in file if line.strip()]
+    return header, turns
+
+
+def replay(path):
+    """Повторяет журнал и возвращает Result с первым расхождением (или None)."""
+    header, turns = read_log(path)
+    rooms = header.get('rooms')
+    game_state = new_game_state(_template(tuple(rooms) if isinstance(rooms, list) else rooms),
+                                seed=header['seed'])
+
+    events = game_state['events'] = []
+    answers = game_state['answers'] = deque()
+    describe_current_room(game_state)
+    actual = fingerprint(events, game_state)
+    if actual != header['start']:
+        return Result(path, 0, Divergence(0, '', header['start'], actual, _texts(events)))
+
+    for turn, (command, asked, expected) in enumerate(turns, 1):
+        events.clear()
+        answers.clear()
+        answers.extend(asked)
+        process_command(game_state, command)
+        actual = fingerprint(events, game_state)
+        if actual != expected:
+            return Result(path, turn, Divergence(turn, command, expected, actual, _texts(events)))
+    return Result(path, len(turns), None)
+
+
+def _texts(events):
+    return [event.text for event in events if event.text]
+
+
+def replay_many(paths, workers=None):
+    """Повторяет журналы на пуле процессов; результаты в порядке paths."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        return [replay(path) for path in paths]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(replay, paths, chunksize=max(1, len(paths) // (workers * 8))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='replay', description="Повтор записанных сессий")
+    parser.add_argument('logs', nargs='+', help="журналы сессий (project --record)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="число процессов (по умолчанию — все ядра)")
+    args = parser.parse_args(argv)
+
+    results = replay_many(args.logs, args.workers)
+    failed = [result for result in results if result.divergence is not None]
+    for result in failed:
+        divergence = result.divergence
+        print(f"{result.path}: расхождение на ходу {divergence.turn} "
+              f"({divergence.command!r}): ожидался {divergence.expected}, получен {divergence.actual}")
+        for text in divergence.events:
+            print("    " + text.replace("\n", "\n    "))
+    turns = sum(result.turns for result in results)
+    print(f"Журналов: {len(results)}, ходов: {turns}, расхождений: {len(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
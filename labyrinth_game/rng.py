@@ -0,0 +1,161 @@
+"""Модуль для счётного генератора псевдослучайных чисел.
+
+Случайное число — чистая функция от (зерно сессии, номер шага, назначение):
+хэш splitmix64 от счётчика, без скрытого состояния. Поэтому у разных
+сессий разные броски, повтор хода с тем же зерном даёт тот же результат,
+а броски для миллионов шагов можно посчитать одним векторным вызовом
+(rolls), и они совпадут с поштучными (roll).
+
+Цена этого — поштучный бросок: в чистом Python хэш стоит около 0.8 мкс,
+примерно вдвое дороже прежней формулы sin(seed * 12.9898) (около 0.4 мкс).
+Почти всё время уходит на умножения 64-битных чисел в финализаторе, и
+кэшировать там нечего: каждый шаг даёт новый счётчик. В игре это мало
+заметно: на ход приходится около половины броска (симуляция стандартной
+карты), то есть ~0.2 мкс из ~15 мкс хода. Векторный rolls с numpy быстрее
+обоих (около 0.1 мкс на бросок).
+
+Проверка качества распределения и замер скорости: python -m benchmarks.check_rng
+"""
+
+import os
+
+MASK64 = (1 << 64) - 1
+_SEED_MULT = 0x9E3779B97F4A7C15
+_COUNTER_MULT = 0xBF58476D1CE4E5B9
+_PURPOSE_MULT = 0x94D049BB133111EB
+
+# Назначения бросков: у каждого свой независимый поток чисел
+EVENT_CHANCE = 1     # произойдёт ли случайное событие
+EVENT_KIND = 2       # какое именно событие
+TRAP_ITEM = 3        # какой предмет теряется в ловушке
+TRAP_DAMAGE = 4      # переживёт ли игрок ловушку без предметов
+GAME_SEED = 5        # зерно игры номер N в симуляции (simulate.py)
+POLICY_CHOICE = 6    # какую команду выбирает политика симуляции
+POLICY_ANSWER = 7    # знает ли симулируемый игрок ответ на загадку
+TRIGGER_STREAMS = 8  # с 8: пары (шанс, выбор) потоков триггеров 1, 2, ... (поток 0 — EVENT_*)
+
+# Повторный бросок того же назначения на том же шаге (вторая ловушка) получает
+# номер draw, который сдвигается в старшие биты счётчика: step + (draw << DRAW_SHIFT)
+DRAW_SHIFT = 32
+
+SEED_TERMS = 4096   # сколько зёрен помнит кэш roll()
+_seed_terms = {}    # зерно -> seed * _SEED_MULT mod 2**64
+
+
+_numpy = False  # модуль numpy, None (не установлен) или False (ещё не искали)
+
+
+def numpy():
+    """numpy, если он установлен, иначе None; импортируется при первом вызове.
+
+    Пакетный режим нужен симуляциям, а не игре, поэтому numpy не должен
+    замедлять запуск каждой игровой сессии.
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        _numpy = np
+    return _numpy
+
+
+def new_seed():
+    """Случайное зерно для новой сессии."""
+    return int.from_bytes(os.urandom(8), 'little') >> 1
+
+
+def mix(seed, counter, purpose):
+    """64-битный хэш (seed, counter, purpose): финализатор splitmix64."""
+    z = (seed * _SEED_MULT + counter * _COUNTER_MULT + purpose * _PURPOSE_MULT) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def roll(seed, step, purpose, modulo):
+    """Целое из [0, modulo) для шага step; при modulo <= 0 — всегда 0.
+
+    Тот же хэш, что mix(), развёрнутый вручную: в Python почти вся цена
+    броска — операции с длинными целыми, поэтому здесь нет вызова mix(), а
+    самое дорогое произведение, seed * _SEED_MULT, берётся из кэша по зерну.
+    """
+    if modulo <= 0:
+        return 0
+    base = _seed_terms.get(seed)
+    if base is None:
+        if len(_seed_terms) >= SEED_TERMS:
+            _seed_terms.clear()
+        base = _seed_terms[seed] = (seed * _SEED_MULT) & MASK64
+    # Константы — литералами: чтение глобальных имён тоже заметно в цене броска
+    z = (base + step * 0xBF58476D1CE4E5B9 + purpose * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return (z ^ (z >> 31)) % modulo
+
+
+def rolls(seed, steps, purpose, modulo):
+    """Броски roll(seed, step, purpose, modulo) сразу для последовательности шагов.
+
+    С numpy считается векторно и возвращается numpy-массив uint64, без
+    numpy — список, поштучно. Значения в обоих случаях совпадают с roll().
+    """
+    np = numpy()
+    if np is None:
+        return [roll(seed, step, purpose, modulo) for step in steps]
+    steps = np.asarray(steps, dtype=np.uint64)
+    if modulo <= 0:
+        return np.zeros(steps.shape, dtype=np.uint64)
+    base = np.uint64((seed * _SEED_MULT + purpose * _PURPOSE_MULT) & MASK64)
+    # Переполнение uint64 в массивах numpy — обычное умножение по модулю 2**64
+    z = steps * np.uint64(_COUNTER_MULT) + base
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z % np.uint64(modulo)
+
+
+def game_rolls(seeds, steps, purpose, modulo):
+    """Броски roll(seed, step, purpose, modulo) для массивов игр (нужен numpy).
+
+    seeds и steps — массивы одной длины (зерно и шаг каждой игры), modulo —
+    число или массив; где modulo <= 0, результат 0. Так пакетная среда
+    (batch.py) бросает кости сразу за все игры и получает те же значения,
+    что session_roll() в каждой из них.
+    """
+    np = numpy()
+    seeds = np.asarray(seeds, dtype=np.uint64)
+    steps = np.asarray(steps, dtype=np.uint64)
+    modulo = np.asarray(modulo, dtype=np.int64)
+    z = (seeds * np.uint64(_SEED_MULT) + steps * np.uint64(_COUNTER_MULT)
+         + np.uint64(purpose * _PURPOSE_MULT & MASK64))
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    positive = modulo > 0
+    return np.where(positive, z % np.maximum(modulo, 1).astype(np.uint64), 0).astype(np.int64)
+
+
+def session_roll(game_state, purpose, modulo, draw=0):
+    """Бросок сессии game_state для её текущего шага.
+
+    draw — номер повторного броска на этом шаге (см. next_draw); с draw=0
+    бросок тот же, что и без него.
+    """
+    step = game_state.get('steps_taken', 0)
+    return roll(game_state.get('seed', 0), step + (draw << DRAW_SHIFT), purpose, modulo)
+
+
+def next_draw(game_state):
+    """Номер очередного повторяемого броска на текущем шаге сессии: 0, 1, 2, ...
+
+    Шаг считается по steps_taken, поэтому две ловушки без хода между ними
+    (неверные ответы подряд) получают разные броски. Счётчик хранится
+    кортежем (шаг, номер), чтобы копии состояния (engine.copy_state) его не делили.
+    """
+    step = game_state.get('steps_taken', 0)
+    last_step, draw = game_state.get('draw', (None, -1))
+    draw = draw + 1 if last_step == step else 0
+    game_state['draw'] = (step, draw)
+    return draw
@@ -0,0 +1,449 @@
+"""Модуль для сохранения и загрузки игровой сессии в компактном бинарном формате.
+
+Сохраняется только то, что принадлежит сессии: счётчики из game_state,
+инвентарь, оверлей мира (изменённые комнаты) и макросы игрока. Шаблон комнат общий и в файл
+не пишется — при загрузке его нужно передать тот же, что был при игре.
+
+Формат файла (все числа little-endian, W — ширина ссылки: u16 или u32):
+
+    заголовок   b'LBSV', версия u16
+    запись      маска разделов u8, W u8 (2 или 4), затем разделы по порядку:
+                строки      u32 длина, utf-8 строки через '\\0'
+                предметы    u32 n, n x W название; u32 d, d x (W предмет, W описание)
+                счётчики    u32 комната, i32 шаги, i32 счёт, i32 загадки, u8 флаги,
+                            u64 зерно случайных событий (с версии 2),
+                            i32 номер повторного броска на шаге или -1 (с версии 3)
+                инвентарь   u32 n, n x W предмет
+                комнаты     u32 n, n x W ключ, n x u8 флаги, n x u32 число предметов,
+                            W предметы всех комнат подряд; для комнат с флагом
+                            _EXITS_CHANGED: u32 e, e x u32 число выходов,
+                            W направления, W комнаты назначения
+                макросы     u32 n, n x W имя, n x W тело (с версии 3)
+
+Ссылки на строки и предметы — номера в таблицах этой же записи, поэтому
+сохранение не зависит от id каталога в конкретном процессе.
+
+Журнал изменений (файл с суффиксом .log) — последовательность записей того
+же вида с префиксом длины u32; в каждую попадают только изменившиеся разделы
+и комнаты. Недописанная последняя запись (обрыв при сбое) игнорируется.
+"""
+
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from labyrinth_game.inventory import Inventory, get_inventory
+from labyrinth_game.items import CATALOGUE, intern
+from labyrinth_game.world import World, get_world
+
+MAGIC = b'LBSV'
+VERSION = 3
+
+_HEADER = struct.Struct('<4sH')
+_COUNTERS = struct.Struct('<IiiiBQi')
+_COUNTERS_V2 = struct.Struct('<IiiiBQ')  # версия 2: без номера броска
+_COUNTERS_V1 = struct.Struct('<IiiiB')   # версия 1: без зерна
+_U32 = struct.Struct('<I')
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+# Разделы записи
+_COUNTERS_SECTION = 1
+_INVENTORY_SECTION = 2
+_ROOMS_SECTION = 4
+_MACROS_SECTION = 8
+_ALL_SECTIONS = _COUNTERS_SECTION | _INVENTORY_SECTION | _ROOMS_SECTION | _MACROS_SECTION
+
+# Флаги game_state
+_GAME_OVER = 1
+_VICTORY = 2
+
+# Флаги комнаты
+_PUZZLE_CLEARED = 1   # загадка решена (в оверлее её нет, а в шаблоне есть)
+_EXITS_CHANGED = 2    # выходы отличаются от шаблона и записаны целиком
+_REVERTED = 4         # комната вернулась к шаблону (удалена из оверлея)
+
+
+class _Writer:
+    """Собирает одну запись: таблицы строк и предметов плюс тело разделов.
+
+    Тело пишется частями, а ссылки в нём — номера строк и предметов —
+    упаковываются в массивы нужной ширины только в finish(), когда
+    размер таблиц уже известен.
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.items = {}
+        self.parts = []
+
+    def string(self, text):
+        strings = self.strings
+        return strings.setdefault(text, len(strings))
+
+    def refs(self, indexes):
+        """Массив ссылок (номеров строк или предметов) с длиной впереди."""
+        self.parts.append(_U32.pack(len(indexes)))
+        self.parts.append(indexes)
+
+    def raw(self, data):
+        self.parts.append(data)
+
+    def finish(self, sections):
+        items = self.items
+        names = [self.string(CATALOGUE[item_id].name) for item_id in items]
+        described = [(index, self.string(CATALOGUE[item_id].description))
+                     for index, item_id in enumerate(items)
+                     if CATALOGUE[item_id].description is not None]
+
+        blob = '\0'.join(self.strings).encode('utf-8')
+        if len(self.strings) > 0xFFFF or len(items) > 0xFFFF:
+            typecode, width = 'I', 4
+        else:
+            typecode, width = 'H', 2
+
+        def pack(indexes):
+            packed = array(typecode, indexes)
+            if _BIG_ENDIAN:
+                packed.byteswap()
+            return packed.tobytes()
+
+        out = [bytes((sections, width)), _U32.pack(len(blob)), blob,
+               _U32.pack(len(names)), pack(names),
+               _U32.pack(len(described)), pack([ref for pair in described for ref in pair])]
+        out.extend(part if isinstance(part, bytes) else pack(part) for part in self.parts)
+        return b''.join(out)
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.sections, width = self.data[0], self.data[1]
+        self.typecode = 'H' if width == 2 else 'I'
+        self.width = width
+        self.pos = 2
+
+    def u32(self):
+        value, = _U32.unpack_from(self.data, self.pos)
+        self.pos += 4
+        return value
+
+    def refs(self, count=None):
+        if count is None:
+            count = self.u32()
+        values = array(self.typecode)
+        end = self.pos + self.width * count
+        values.frombytes(self.data[self.pos:end])
+        if _BIG_ENDIAN:
+            values.byteswap()
+        self.pos = end
+        return values
+
+    def u32_array(self, count):
+        values = array('I')
+        end = self.pos + 4 * count
+        values.frombytes(self.data[self.pos:end])
+        if _BIG_ENDIAN:
+            values.byteswap()
+        self.pos = end
+        return values
+
+    def unpack(self, fmt):
+        values = fmt.unpack_from(self.data, self.pos)
+        self.pos += fmt.size
+        return values
+
+
+def _u32_bytes(values):
+    values = array('I', values)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values.tobytes()
+
+
+def _current_draw(game_state):
+    """Номер последнего повторного броска на текущем шаге (rng.next_draw) или -1."""
+    step, draw = game_state.get('draw', (None, -1))
+    return draw if step == game_state.get('steps_taken', 0) else -1
+
+
+def _room_record(world, room_key, room):
+    """Флаги, id предметов и изменённые выходы комнаты оверлея."""
+    base = world.template.get(room_key)
+    flags = 0
+    if room.puzzle is None and base is not None and base.puzzle is not None:
+        flags |= _PUZZLE_CLEARED
+    exits = None
+    if base is None or room.exits is not base.exits and dict(room.exits) != dict(base.exits):
+        flags |= _EXITS_CHANGED
+        exits = tuple(room.exits.items())
+    return flags, room.items.tobytes(), exits
+
+
+def _encode(game_state, sections, rooms):
+    """Кодирует выбранные разделы; rooms — {ключ: запись комнаты или None (откат)}."""
+    writer = _Writer()
+    item_index = writer.items.setdefault
+
+    if sections & _COUNTERS_SECTION:
+        flags = (_GAME_OVER if game_state.get('game_over') else 0) | \
+                (_VICTORY if game_state.get('victory') else 0)
+        writer.raw(_COUNTERS.pack(
+            writer.string(game_state['current_room']),
+            game_state.get('steps_taken', 0),
+            game_state.get('score', 0),
+            game_state.get('solved_puzzles', 0),
+            flags,
+            game_state.get('seed', 0) & 0xFFFFFFFFFFFFFFFF,  # броски зависят от зерна по модулю 2**64
+            _current_draw(game_state),
+        ))
+
+    if sections & _INVENTORY_SECTION:
+        items = writer.items
+        writer.refs([item_index(item_id, len(items)) for item_id in get_inventory(game_state).ids()])
+
+    if sections & _ROOMS_SECTION:
+        # Разделы комнат пишутся столбцами, чтобы не дробить запись на мелкие части
+        items = writer.items
+        keys, flags_column, item_counts, item_refs = [], bytearray(), array('I'), []
+        exit_counts, directions, targets = array('I'), [], []
+        for room_key, record in rooms.items():
+            keys.append(writer.string(room_key))
+            if record is None:
+                flags_column.append(_REVERTED)
+                item_counts.append(0)
+                continue
+            flags, room_items, exits = record
+            flags_column.append(flags)
+            item_ids = array('i')
+            item_ids.frombytes(room_items)
+            item_counts.append(len(item_ids))
+            item_refs.extend([item_index(item_id, len(items)) for item_id in item_ids])
+            if exits is not None:
+                exit_counts.append(len(exits))
+                directions.extend([writer.string(direction) for direction, _ in exits])
+                targets.extend([writer.string(target) for _, target in exits])
+        writer.refs(keys)
+        writer.raw(bytes(flags_column))
+        writer.raw(_u32_bytes(item_counts))
+        writer.parts.append(item_refs)
+        writer.raw(_U32.pack(len(exit_counts)) + _u32_bytes(exit_counts))
+        writer.parts.append(directions)
+        writer.parts.append(targets)
+
+    if sections & _MACROS_SECTION:
+        macros = game_state.get('macros', {})
+        writer.refs([writer.string(name) for name in macros])
+        writer.parts.append([writer.string(body) for body in macros.values()])
+
+    return writer.finish(sections)
+
+
+def _apply(game_state, data, counters=_COUNTERS):
+    """Применяет одну запись к game_state; counters — формат счётчиков версии файла."""
+    reader = _Reader(data)
+    sections = reader.sections
+
+    length = reader.u32()
+    strings = bytes(reader.data[reader.pos:reader.pos + length]).decode('utf-8').split('\0')
+    reader.pos += length
+
+    # Локальные номера предметов -> id в каталоге этого процесса
+    names = reader.refs()
+    described = reader.refs(2 * reader.u32())
+    descriptions = dict(zip(described[::2], described[1::2]))
+    item_ids = [
+        intern({'name': strings[name], 'description': strings[descriptions[index]]})
+        if index in descriptions else intern(strings[name])
+        for index, name in enumerate(names)
+    ]
+
+    if sections & _COUNTERS_SECTION:
+        room_index, steps, score, solved, flags, *rest = reader.unpack(counters)
+        game_state['current_room'] = strings[room_index]
+        game_state['steps_taken'] = steps
+        game_state['score'] = score
+        game_state['solved_puzzles'] = solved
+        game_state['game_over'] = bool(flags & _GAME_OVER)
+        game_state['victory'] = bool(flags & _VICTORY)
+        game_state['seed'] = rest[0] if rest else 0
+        if len(rest) > 1 and rest[1] >= 0:
+            game_state['draw'] = (steps, rest[1])
+        else:
+            game_state.pop('draw', None)
+
+    if sections & _INVENTORY_SECTION:
+        game_state['player_inventory'] = Inventory.from_ids(
+            [item_ids[index] for index in reader.refs()])
+
+    if sections & _ROOMS_SECTION:
+        world = get_world(game_state)
+        keys = reader.refs()
+        count = len(keys)
+        flags_column = bytes(reader.data[reader.pos:reader.pos + count])
+        reader.pos += count
+        item_counts = reader.u32_array(count)
+        item_refs = reader.refs(sum(item_counts))
+        exit_counts = reader.u32_array(reader.u32())
+        directions = reader.refs(sum(exit_counts))
+        targets = reader.refs(len(directions))
+
+        item_pos = exit_room = exit_pos = 0
+        for room_index, flags, item_count in zip(keys, flags_column, item_counts):
+            room_key = strings[room_index]
+            room_refs = item_refs[item_pos:item_pos + item_count]
+            item_pos += item_count
+            world.revert_room(room_key)
+            if flags & _REVERTED:
+                continue
+            room = world.edit_room(room_key)
+            room.items = array('i', [item_ids[index] for index in room_refs])
+            if flags & _PUZZLE_CLEARED:
+                room.puzzle = None
+            if flags & _EXITS_CHANGED:
+                exit_count = exit_counts[exit_room]
+                exit_room += 1
+                world.set_exits(room_key, {
+                    strings[direction]: strings[target]
+                    for direction, target in zip(directions[exit_pos:exit_pos + exit_count],
+                                                 targets[exit_pos:exit_pos + exit_count])
+                })
+                exit_pos += exit_count
+
+    if sections & _MACROS_SECTION:
+        names = reader.refs()
+        bodies = reader.refs(len(names))
+        game_state['macros'] = {strings[name]: strings[body] for name, body in zip(names, bodies)}
+
+
+def dumps(game_state):
+    """Полный снимок сессии в байтах."""
+    world = get_world(game_state)
+    rooms = {key: _room_record(world, key, room) for key, room in world.overlay.items()}
+    return _HEADER.pack(MAGIC, VERSION) + _encode(game_state, _ALL_SECTIONS, rooms)
+
+
+def _counters_format(data):
+    """Формат счётчиков по заголовку снимка (заодно проверяет сам заголовок)."""
+    magic, version = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Это не файл сохранения лабиринта.")
+    if version == VERSION:
+        return _COUNTERS
+    if version == 2:
+        return _COUNTERS_V2
+    if version == 1:
+        return _COUNTERS_V1
+    raise ValueError(f"Неподдерживаемая версия сохранения: {version}")
+
+
+def loads(data, template=None):
+    """Восстанавливает game_state из снимка; template — шаблон комнат игры."""
+    counters = _counters_format(data)
+    game_state = {'world': World(template)}
+    _apply(game_state, memoryview(data)[_HEADER.size:], counters)
+    return game_state
+
+
+def save(game_state, path):
+    """Записывает полный снимок сессии в файл (атомарно, через временный файл)."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(dumps(game_state))
+    tmp_path.replace(path)
+
+
+def load(path, template=None):
+    """Загружает сессию из снимка и, если есть, применяет его журнал изменений."""
+    path = Path(path)
+    snapshot = path.read_bytes()
+    game_state = loads(snapshot, template)
+    # Журнал дописывается той же версией, что и снимок
+    counters = _counters_format(snapshot)
+    log_path = _log_path(path)
+    if log_path.exists():
+        data = log_path.read_bytes()
+        pos = 0
+        while pos + 4 <= len(data):
+            length, = _U32.unpack_from(data, pos)
+            if pos + 4 + length > len(data):
+                break  # недописанная запись после сбоя
+            _apply(game_state, memoryview(data)[pos + 4:pos + 4 + length], counters)
+            pos += 4 + length
+    return game_state
+
+
+def _log_path(path):
+    return path.with_name(path.name + '.log')
+
+
+class Checkpointer:
+    """Сохранение сессии на каждом ходу: снимок + дописываемый журнал изменений.
+
+    checkpoint() сравнивает состояние с последним записанным и дописывает
+    в журнал только изменившиеся разделы и комнаты. Когда журнал вырастает
+    больше snapshot_every записей, делается новый полный снимок.
+    """
+
+    def __init__(self, path, snapshot_every=1000):
+        self.path = Path(path)
+        self.log_path = _log_path(self.path)
+        self.snapshot_every = snapshot_every
+        self._records = 0
+        self._counters = None
+        self._inventory = None
+        self._rooms = None
+        self._macros = None
+
+    def snapshot(self, game_state):
+        """Пишет полный снимок и начинает журнал заново."""
+        save(game_state, self.path)
+        self.log_path.unlink(missing_ok=True)
+        self._records = 0
+        self._remember(*self._fingerprint(game_state))
+
+    def checkpoint(self, game_state):
+        """Дописывает в журнал изменения с прошлого сохранения (если они есть)."""
+        if self._rooms is None or self._records >= self.snapshot_every:
+            self.snapshot(game_state)
+            return
+        counters, inventory, rooms, macros = self._fingerprint(game_state)
+
+        sections = 0
+        if counters != self._counters:
+            sections |= _COUNTERS_SECTION
+        if inventory != self._inventory:
+            sections |= _INVENTORY_SECTION
+        changed = {key: record for key, record in rooms.items() if self._rooms.get(key) != record}
+        changed.update((key, None) for key in self._rooms if key not in rooms)
+        if changed:
+            sections |= _ROOMS_SECTION
+        if macros != self._macros:
+            sections |= _MACROS_SECTION
+        if not sections:
+            return
+
+        record = _encode(game_state, sections, changed)
+        with self.log_path.open('ab') as log:
+            log.write(_U32.pack(len(record)) + record)
+        self._records += 1
+        self._remember(counters, inventory, rooms, macros)
+
+    def _fingerprint(self, game_state):
+        world = get_world(game_state)
+        counters = (
+            game_state['current_room'], game_state.get('steps_taken', 0),
+            game_state.get('score', 0), game_state.get('solved_puzzles', 0),
+            bool(game_state.get('game_over')), bool(game_state.get('victory')),
+            game_state.get('seed', 0), _current_draw(game_state),
+        )
+        inventory = get_inventory(game_state).ids().tobytes()
+        rooms = {key: _room_record(world, key, room) for key, room in world.overlay.items()}
+        macros = game_state.get('macros', {})   # заменяется целиком, не меняется на месте
+        return counters, inventory, rooms, macros
+
+    def _remember(self, counters, inventory, rooms, macros):
+        self._counters = counters
+        self._inventory = inventory
+        self._rooms = rooms
+        self._macros = macros
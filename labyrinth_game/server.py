@@ -0,0 +1,160 @@
+"""Модуль для сетевого режима: много независимых сессий в одном процессе.
+
+Протокол строковый: клиент шлёт по одной команде в строке (UTF-8), сервер
+отвечает текстом хода и приглашением "> ". Если команда задаёт вопрос
+(загадка, код сундука), следующая строка клиента считается ответом.
+
+Запуск: project --serve 127.0.0.1:7777  или  project --serve unix:/tmp/labyrinth.sock
+"""
+
+import asyncio
+import itertools
+
+from labyrinth_game.engine import new_game, step
+from labyrinth_game.main import final_report, get_rating, welcome_text
+from labyrinth_game.puzzles import warm_up
+from labyrinth_game.renderer import BufferRenderer
+from labyrinth_game.world import as_template
+
+PROMPT = "> "
+MAX_LINE = 4096                 # самая длинная допустимая строка команды
+WRITE_BUFFER_HIGH = 64 * 1024   # после этого объёма запись ждёт, пока клиент прочитает
+
+
+class GameServer:
+    """Сервер игровых сессий: по одной сессии на соединение.
+
+    Каждое соединение обрабатывается по очереди: следующая строка читается
+    только после того, как ответ на предыдущую ушёл клиенту (writer.drain),
+    так что медленный клиент не раздувает буферы сервера. Сессия без команд
+    дольше idle_timeout секунд закрывается.
+    """
+
+    def __init__(self, idle_timeout=600.0, max_sessions=10000, template=None, scores=None):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.template = template   # общий шаблон комнат (None — стандартная карта)
+        self.scores = scores       # таблица рекордов (leaderboard.ScoreStore) или None
+        self.sessions = {}   # номер сессии -> game_state
+        self._ids = itertools.count(1)
+
+    async def start(self, address):
+        """Запускает asyncio-сервер по адресу HOST:PORT или unix:/путь."""
+        if address.startswith('unix:'):
+            return await asyncio.start_unix_server(self.handle, path=address[5:], limit=MAX_LINE)
+        host, _, port = address.rpartition(':')
+        return await asyncio.start_server(self.handle, host or None, int(port), limit=MAX_LINE)
+
+    async def handle(self, reader, writer):
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+        if len(self.sessions) >= self.max_sessions:
+            await self._send(writer, ["Сервер переполнен, попробуйте позже."], prompt=False)
+            await self._close(writer)
+            return
+
+        session_id = next(self._ids)
+        state, events = new_game(self.template)
+        if self.scores is not None:
+            state['scores'] = self.scores
+            state['player'] = f"сессия {session_id}"
+        self.sessions[session_id] = state
+        try:
+            if not await self._send(writer, [welcome_text(), *_texts(events)]):
+                return
+            await self._play(session_id, state, reader, writer)
+        finally:
+            self.sessions.pop(session_id, None)
+            await self._close(writer)
+
+    async def _play(self, session_id, state, reader, writer):
+        pending = None  # (команда, ответы, сколько событий уже показано) — ждём ответ
+        while not state['game_over']:
+            try:
+                line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                await self._send(writer, ["Сессия закрыта из-за бездействия."], prompt=False)
+                return
+            except ValueError:
+                # Строка длиннее MAX_LINE: reader уже отбросил её
+                if not await self._send(writer, ["Слишком длинная команда."]):
+                    return
+                continue
+            except ConnectionError:
+                return
+            if not line:
+                return  # клиент отключился
+
+            text = line.decode('utf-8', errors='replace').strip()
+            if pending is not None:
+                command, answers, shown = pending
+                answers = [*answers, text]
+            elif not text:
+                if not await self._send(writer, ["Введите команду. Для справки введите 'помощь'."]):
+                    return
+                continue
+            else:
+                command, answers, shown = text, [], 0
+
+            # Ход считается на копии состояния: если команде не хватило ответа,
+            # копия отбрасывается, а команда повторится с ответом из следующей строки.
+            new_state, events = step(state, command, answers)
+            if events and events[-1].kind == 'prompt':
+                pending = (command, answers, len(events) - 1)
+                output = [*_texts(events[shown:-1]), events[-1].text]
+            else:
+                pending = None
+                state = self.sessions[session_id] = new_state
+                output = _texts(events[shown:])
+            if state['game_over']:
+                if self.scores is not None:
+                    # Только очередь в памяти: запись на диск идёт в потоке таблицы рекордов
+                    self.scores.record(state, get_rating(state))
+                output.append(final_report(state))
+                await self._send(writer, output, prompt=False)
+                return
+            if not await self._send(writer, output):
+                return
+
+    async def _send(self, writer, texts, prompt=True):
+        """Отправляет ответ одним вызовом write и ждёт, пока он уйдёт клиенту."""
+        renderer = BufferRenderer()
+        for text in texts:
+            renderer.write(text)
+        data = renderer.take()
+        if prompt:
+            data += PROMPT
+        try:
+            writer.write(data.encode('utf-8'))
+            await asyncio.wait_for(writer.drain(), self.idle_timeout)
+        except (ConnectionError, asyncio.TimeoutError):
+            return False
+        return True
+
+    @staticmethod
+    async def _close(writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def _texts(events):
+    return [event.text for event in events if event.text]
+
+
+def run_server(address, idle_timeout=600.0, max_sessions=10000, template=None, scores=None):
+    """Запускает сервер и обслуживает клиентов до прерывания (Ctrl+C)."""
+    # Ответы загадок компилируются до первого клиента, а не на его первом solve
+    warm_up(as_template(template).rooms)
+
+    async def serve():
+        server = await GameServer(idle_timeout, max_sessions, template, scores).start(address)
+        print(f"Лабиринт ждёт игроков на {address}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\nСервер остановлен.")
@@ -0,0 +1,244 @@
+"""Модуль для массовой симуляции прохождений (метод Монте-Карло).
+
+Каждая игра идёт через ту же логику, что и у живого игрока (process_command),
+а команды выбирает политика: 'random' — любое доступное действие,
+'greedy' — сначала брать предметы и решать загадки, потом исследовать новые
+комнаты. Игры раздаются пачками по пулу процессов и считаются независимо,
+поэтому время растёт линейно с числом игр и делится на число ядер.
+
+Все случайности игры и политики выводятся из зерна симуляции и номера игры
+(rng.mix), поэтому результат не зависит от числа процессов и размера пачек:
+
+    simulate --games 1000000 --seed 42 --workers 8
+"""
+
+import argparse
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from labyrinth_game.generator import GeneratedRooms
+from labyrinth_game.inventory import get_inventory
+from labyrinth_game.items import CATALOGUE
+from labyrinth_game.main import get_rating, process_command
+from labyrinth_game.puzzles import accepted_answers
+from labyrinth_game.rng import GAME_SEED, POLICY_ANSWER, POLICY_CHOICE, mix, roll
+from labyrinth_game.world import Template, get_world, new_game_state
+
+POLICIES = ('random', 'greedy')
+USABLE = ('torch', 'sword', 'bronze_box')  # предметы, у которых есть действие в use_item
+WRONG_ANSWER = "не знаю"
+
+
+class Summary:
+    """Сводка по сериям игр; сводки отдельных пачек складываются merge()."""
+
+    __slots__ = ('games', 'wins', 'trap_deaths', 'quits', 'timeouts', 'traps',
+                 'scores', 'ratings', 'victory_steps')
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.trap_deaths = 0
+        self.quits = 0
+        self.timeouts = 0       # игра не закончилась за max_turns ходов
+        self.traps = 0          # сколько раз срабатывали ловушки
+        self.scores = Counter()         # счёт -> число игр
+        self.ratings = Counter()        # рейтинг из main.get_rating -> число игр
+        self.victory_steps = Counter()  # шагов до победы -> число побед
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins += other.wins
+        self.trap_deaths += other.trap_deaths
+        self.quits += other.quits
+        self.timeouts += other.timeouts
+        self.traps += other.traps
+        self.scores.update(other.scores)
+        self.ratings.update(other.ratings)
+        self.victory_steps.update(other.victory_steps)
+        return self
+
+    def report(self):
+        games = self.games or 1
+        lines = [
+            f"Игр: {self.games}",
+            f"Побед: {self.wins} ({self.wins / games:.1%})",
+            f"Гибель в ловушке: {self.trap_deaths} ({self.trap_deaths / games:.1%})",
+            f"Выход из игры: {self.quits} ({self.quits / games:.1%})",
+            f"Не закончены за лимит ходов: {self.timeouts} ({self.timeouts / games:.1%})",
+            f"Срабатываний ловушек на игру: {self.traps / games:.2f}",
+            f"Средний счёт: {_mean(self.scores):.1f}",
+        ]
+        if self.victory_steps:
+            lines.append(
+                f"Шагов до победы: среднее {_mean(self.victory_steps):.1f}, "
+                f"медиана {_percentile(self.victory_steps, 0.5)}, "
+                f"90% — не больше {_percentile(self.victory_steps, 0.9)}")
+        lines.append("Рейтинги:")
+        for rating, count in self.ratings.most_common():
+            lines.append(f"  {rating:<32} {count:>9} ({count / games:.1%})")
+        return "\n".join(lines)
+
+
+def _mean(counter):
+    total = sum(counter.values())
+    return sum(value * count for value, count in counter.items()) / total if total else 0.0
+
+
+def _percentile(counter, fraction):
+    target = fraction * sum(counter.values())
+    seen = 0
+    for value in sorted(counter):
+        seen += counter[value]
+        if seen >= target:
+            return value
+    return 0
+
+
+def _known_answer(answer):
+    """Ответ, который даёт знающий игрок: одна из форм, что примет puzzles.is_correct.
+
+    Ответ загадки бывает числом или списком вариантов, поэтому подставлять его
+    строкой нельзя; min() — чтобы выбор не зависел от порядка обхода множества.
+    """
+    return min(accepted_answers(answer))
+
+
+def _actions(game_state, visited):
+    """Доступные команды в текущей комнате: [(команда, приоритет для greedy)]."""
+    room_key = game_state['current_room']
+    room = get_world(game_state).room(room_key)
+    inventory = get_inventory(game_state)
+    actions = [(f"take {CATALOGUE[item_id].key}", 3) for item_id in room.items
+               if CATALOGUE[item_id].key != 'treasure_chest']
+    if room_key == 'treasure_room':
+        actions.append(("open", 4))
+    elif room.puzzle:
+        actions.append(("solve", 2))
+    actions.extend((f"use {key}", 0) for key in USABLE if inventory.has(key))
+    actions.extend((f"go {direction}", 1 if target not in visited else 0)
+                   for direction, target in room.exits.items())
+    return actions
+
+
+def play(game_seed, policy='random', max_turns=200, skill=70, template=None):
+    """Одна игра; возвращает (game_state, число сработавших ловушек, погиб ли в ловушке)."""
+    game_state = new_game_state(template, seed=game_seed)
+    events = game_state['events'] = []
+    # Пустая очередь ответов: вопрос без ответа не ждёт клавиатуру, а просто отменяется
+    game_state['answers'] = deque()
+    visited = {game_state['current_room']}
+    traps = 0
+    died = False
+
+    for turn in range(max_turns):
+        if game_state['game_over']:
+            break
+        actions = _actions(game_state, visited)
+        if policy == 'greedy':
+            best = max(priority for _, priority in actions)
+            actions = [action for action in actions if action[1] == best]
+        command = actions[roll(game_seed, turn, POLICY_CHOICE, len(actions))][0]
+
+        if command in ("solve", "open"):
+            # Игрок знает ответ с вероятностью skill процентов
+            room = get_world(game_state).room(game_state['current_room'])
+            knows = roll(game_seed, turn, POLICY_ANSWER, 100) < skill
+            if room.puzzle and knows:
+                command += f" {_known_answer(room.puzzle.get('answer', ''))}"
+            elif not get_inventory(game_state).has('treasure_key'):
+                command += f" {WRONG_ANSWER}"
+
+        process_command(game_state, command)
+        visited.add(game_state['current_room'])
+        for event in events:
+            if event.kind == 'trap':
+                traps += 1
+            elif event.kind == 'death':
+                died = True
+        events.clear()
+
+    del game_state['events'], game_state['answers']
+    return game_state, traps, died
+
+
+def run_batch(seed, start, count, policy='random', max_turns=200, skill=70, rooms=None):
+    """Играет игры с номерами start..start+count-1 и возвращает их сводку."""
+    template = Template(GeneratedRooms(*rooms)) if rooms is not None else None
+
+    summary = Summary()
+    for index in range(start, start + count):
+        game_state, traps, died = play(mix(seed, index, GAME_SEED), policy, max_turns,
+                                       skill, template)
+        summary.games += 1
+        summary.traps += traps
+        summary.scores[game_state['score']] += 1
+        summary.ratings[get_rating(game_state)] += 1
+        if game_state['victory']:
+            summary.wins += 1
+            summary.victory_steps[game_state['steps_taken']] += 1
+        elif died:
+            summary.trap_deaths += 1
+        elif not game_state['game_over']:
+            summary.timeouts += 1
+        else:
+            summary.quits += 1
+    return summary
+
+
+def simulate(games, seed=0, policy='random', workers=None, max_turns=200, skill=70,
+             rooms=None, batch_size=None):
+    """Запускает games игр на пуле процессов и возвращает общую Summary.
+
+    rooms — (размер, зерно) сгенерированного лабиринта или None для стандартной карты.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Несколько пачек на процесс, чтобы быстрые пачки не ждали медленные
+    batch_size = batch_size or max(1, min(10_000, games // (workers * 4) or 1))
+    batches = [(start, min(batch_size, games - start)) for start in range(0, games, batch_size)]
+
+    summary = Summary()
+    if workers == 1:
+        for start, count in batches:
+            summary.merge(run_batch(seed, start, count, policy, max_turns, skill, rooms))
+        return summary
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(run_batch, seed, start, count, policy, max_turns, skill, rooms)
+                   for start, count in batches]
+        for future in futures:
+            summary.merge(future.result())
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='simulate', description="Симуляция прохождений лабиринта")
+    parser.add_argument('--games', type=int, default=10_000, help="число игр")
+    parser.add_argument('--seed', type=int, default=0, help="зерно симуляции")
+    parser.add_argument('--policy', choices=POLICIES, default='random',
+                        help="как выбираются команды")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="число процессов (по умолчанию — все ядра)")
+    parser.add_argument('--max-turns', type=int, default=200, help="лимит ходов на игру")
+    parser.add_argument('--skill', type=int, default=70,
+                        help="вероятность (в процентах) знать ответ на загадку")
+    parser.add_argument('--generate', type=int, metavar='ROOMS',
+                        help="играть в сгенерированном лабиринте из ROOMS комнат")
+    parser.add_argument('--map-seed', type=int, default=0, help="зерно генератора лабиринта")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rooms = (args.generate, args.map_seed) if args.generate else None
+    start = time.perf_counter()
+    summary = simulate(args.games, args.seed, args.policy, args.workers, args.max_turns,
+                       args.skill, rooms)
+    elapsed = time.perf_counter() - start
+    print(summary.report())
+    print(f"\nВремя: {elapsed:.1f} с ({summary.games / elapsed:.0f} игр/с)")
+
+
+if __name__ == "__main__":
+    main()
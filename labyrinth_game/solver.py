@@ -0,0 +1,476 @@
+"""Модуль для полного перебора состояний игры: проходима ли карта и как лучше пройти.
+
+Состояние — комната плюс битовая маска возможностей игрока, упакованные в
+одно целое: номер комнаты << FLAG_BITS | флаги. Флаги повторяют правила
+игры, от которых зависит исход:
+
+    RUSTY       есть ржавый ключ — move_player пускает в treasure_room;
+    BOX         есть бронзовая шкатулка — use_item даёт из неё ржавый ключ;
+    TREASURE    есть ключ от сокровищ — attempt_open_treasure открывает сундук без кода;
+    CHEST_GONE  сундук унесён из treasure_room (take) — победить уже нельзя.
+
+Остальные предметы на исход и счёт не влияют, поэтому сколько бы их ни было
+на карте, состояний не больше 16 на комнату. Действия, которые ничего не
+стоят и ничего не портят (взять ржавый ключ или шкатулку, открыть шкатулку,
+решить загадку), применяются сразу при входе в комнату; ходом считается
+только переход (steps_taken). Переходы из каждого состояния вычисляются
+один раз и запоминаются.
+
+Для наибольшего счёта этого мало: важно, какие загадки уже решены. Поэтому
+max_score_route ищет по расширенному состоянию — к комнате и флагам
+добавляется битовое множество решённых загадок — и на картах, где таких
+состояний не больше EXACT_STATES (стандартная карта), ответ точный. На
+больших картах перебор экспоненциален, и маршрут строится жадно (ближайшая
+нерешённая загадка); такой Route помечен exact=False, его счёт — оценка снизу.
+
+Случайные события (ловушки, монеты) не моделируются: решатель отвечает на
+вопрос, можно ли пройти карту по её правилам.
+
+    python -m labyrinth_game.solver                       # стандартная карта
+    python -m labyrinth_game.solver --world worlds/classic.json
+    python -m labyrinth_game.solver --generate 10000 --seed 42
+"""
+
+from collections import deque
+
+from labyrinth_game.items import CATALOGUE, find_id, reward_items
+from labyrinth_game.world import as_template
+
+RUSTY = 1
+BOX = 2
+TREASURE = 4
+CHEST_GONE = 8
+FLAG_BITS = 4
+FLAG_MASK = (1 << FLAG_BITS) - 1
+
+TREASURE_ROOM = 'treasure_room'
+START = 'entrance'
+CODE_BONUS = 100   # очки за сундук, открытый кодом (attempt_open_treasure)
+EXACT_STATES = 1 << 16   # комнат × 2**загадок, до которых счёт ищется точным перебором
+
+_FLAGS = {'rusty_key': RUSTY, 'bronze_box': BOX, 'treasure_key': TREASURE}
+_FREE = RUSTY | BOX   # флаги, которые выгодно получать всегда
+
+
+class Route:
+    """Маршрут: команды игрока, число переходов и итоговый счёт.
+
+    exact — найден ли маршрут полным перебором (False — жадная оценка).
+    """
+
+    __slots__ = ('commands', 'steps', 'score', 'exact')
+
+    def __init__(self, commands, steps, score, exact=True):
+        self.commands = commands
+        self.steps = steps
+        self.score = score
+        self.exact = exact
+
+    def __repr__(self):
+        return (f"Route(steps={self.steps}, score={self.score}, exact={self.exact}, "
+                f"commands={self.commands!r})")
+
+
+def _answer(answer):
+    # Ответ загадки может быть списком вариантов — годится любой
+    if isinstance(answer, (list, tuple)):
+        answer = answer[0]
+    return str(answer)
+
+
+def _normalize(flags):
+    # Шкатулка нужна только ради ржавого ключа: открываем её сразу
+    if flags & BOX:
+        flags = (flags | RUSTY) & ~BOX
+    return flags
+
+
+class Solver:
+    """Граф состояний карты (шаблона комнат) с запомненными переходами.
+
+    Ключ от сокровищ — не бесплатное действие: с ним attempt_open_treasure
+    открывает сундук ключом и не даёт бонуса за код. Поэтому взять его (или
+    решить загадку, которая его даёт) — отдельный переход, как и унести сундук.
+    """
+
+    def __init__(self, template=None):
+        template = as_template(template)
+        self.keys = list(template.keys())
+        index = {key: node for node, key in enumerate(self.keys)}
+        self.exits = []     # комната -> ((направление, комната), ...)
+        self.items = []     # комната -> флаги от предметов на полу
+        self.rewards = []   # комната -> флаги от награды загадки
+        self.puzzles = []   # комната -> (очки, команда) или None
+        self.treasure = index.get(TREASURE_ROOM)
+        self.start = index[START]
+        self.code = None    # (очки, команда) сундука с кодом
+        self.chest = False
+        chest_id = find_id('treasure_chest')
+
+        for key in self.keys:
+            room = template[key]
+            self.exits.append(tuple((direction, index[target])
+                                    for direction, target in room.exits.items() if target in index))
+            items = 0
+            for item_id in room.items:
+                items |= _FLAGS.get(CATALOGUE[item_id].key, 0)
+            self.items.append(items)
+            puzzle = room.puzzle
+            rewards = 0
+            if puzzle and key != TREASURE_ROOM:
+                # Награды по умолчанию из solve_puzzle — не ключи, на исход не влияют
+                for reward in reward_items(puzzle.get('reward')):
+                    item_id = find_id(reward)
+                    if item_id is not None:
+                        rewards |= _FLAGS.get(CATALOGUE[item_id].key, 0)
+                self.puzzles.append((puzzle.get('points', 10),
+                                     f"solve {_answer(puzzle.get('answer', ''))}"))
+            else:
+                self.puzzles.append(None)
+            self.rewards.append(rewards)
+            if key == TREASURE_ROOM:
+                self.chest = chest_id in room.items
+                if puzzle:
+                    self.code = (puzzle.get('points', 25),
+                                 f"open {_answer(puzzle.get('answer', ''))}")
+
+        self._next = {}   # состояние -> ((действие, новое состояние, ходов), ...)
+
+    # --- Состояния ---
+
+    def _free(self, node):
+        """Флаги, которые игрок бесплатно получает в комнате node."""
+        gained = self.items[node] & _FREE
+        if not self.rewards[node] & TREASURE:
+            gained |= self.rewards[node]
+        return gained
+
+    def _enter(self, node, flags):
+        return node << FLAG_BITS | _normalize(flags | self._free(node))
+
+    def initial(self):
+        return self._enter(self.start, 0)
+
+    def successors(self, state):
+        """Переходы из состояния: ((команда, новое состояние, ходов), ...)."""
+        moves = self._next.get(state)
+        if moves is None:
+            node, flags = state >> FLAG_BITS, state & FLAG_MASK
+            moves = []
+            for direction, target in self.exits[node]:
+                # Дверь в treasure_room открывает только ржавый ключ (move_player)
+                if target == self.treasure and not flags & RUSTY:
+                    continue
+                moves.append((f"go {direction}", self._enter(target, flags), 1))
+            if not flags & TREASURE:
+                if self.items[node] & TREASURE:
+                    moves.append(("take treasure_key", state | TREASURE, 0))
+                if self.rewards[node] & TREASURE:
+                    gained = node << FLAG_BITS | _normalize(flags | self.rewards[node])
+                    moves.append((self.puzzles[node][1], gained, 0))
+            if node == self.treasure and self.chest and not flags & CHEST_GONE:
+                moves.append(("take treasure_chest", state | CHEST_GONE, 0))
+            moves = self._next[state] = tuple(moves)
+        return moves
+
+    def can_open(self, state):
+        """Можно ли в этом состоянии открыть сундук и победить."""
+        if state >> FLAG_BITS != self.treasure or not self.chest or state & CHEST_GONE:
+            return False
+        return bool(state & TREASURE) or self.code is not None
+
+    def _search(self, start, keyless=False, goal=None, successors=None):
+        """Обход 0-1 BFS: {состояние: (ходов, предыдущее состояние, команда)}.
+
+        keyless — не брать ключ от сокровищ (чтобы открыть сундук кодом).
+        goal — условие на состояние: обход останавливается на ближайшем
+        подходящем, и оно возвращается вторым значением.
+        successors — функция переходов (по умолчанию self.successors).
+        """
+        successors = successors or self.successors
+        seen = {start: (0, None, None)}
+        queue = deque(((0, start),))
+        while queue:
+            steps, state = queue.popleft()
+            if seen[state][0] != steps:
+                continue
+            if goal is not None and goal(state):
+                return seen, state
+            for action, target, cost in successors(state):
+                if keyless and target & TREASURE:
+                    continue
+                total = steps + cost
+                known = seen.get(target)
+                if known is None or known[0] > total:
+                    seen[target] = (total, state, action)
+                    if cost:
+                        queue.append((total, target))
+                    else:
+                        queue.appendleft((total, target))
+        return seen if goal is None else (seen, None)
+
+    def _winning(self, states, keyless=False):
+        """Состояния из states, откуда ещё можно победить."""
+        back = {}
+        for state in states:
+            for _, target, _ in self.successors(state):
+                if target in states and not (keyless and target & TREASURE):
+                    back.setdefault(target, []).append(state)
+        winning = {state for state in states if self.can_open(state)}
+        queue = deque(winning)
+        while queue:
+            for previous in back.get(queue.popleft(), ()):
+                if previous not in winning:
+                    winning.add(previous)
+                    queue.append(previous)
+        return winning
+
+    def reachable(self):
+        """Все состояния, достижимые из начала игры."""
+        return set(self._search(self.initial()))
+
+    # --- Анализ карты ---
+
+    def winnable(self):
+        return self.min_steps() is not None
+
+    def min_steps(self):
+        """Маршрут к победе с наименьшим числом переходов (Route) или None."""
+        start = self.initial()
+        seen = self._search(start)
+        wins = [state for state in seen if self.can_open(state)]
+        if not wins:
+            return None
+        best = min(wins, key=lambda state: (seen[state][0], -self._open_score(state)))
+        solved = set()
+        commands = self._start_actions(solved) + self._commands(seen, start, best, solved)
+        commands.append(self._open(best))
+        return Route(commands, seen[best][0], self._points(solved) + self._open_score(best))
+
+    def max_score(self):
+        """Наибольший счёт при победе или None, если карта непроходима.
+
+        Точен, если max_score_route нашёл маршрут перебором (Route.exact),
+        иначе — оценка снизу.
+        """
+        route = self.max_score_route()
+        return None if route is None else route.score
+
+    def max_score_route(self):
+        """Маршрут с наибольшим счётом, а при равном счёте — с наименьшим числом переходов.
+
+        Если комнат × 2**загадок не больше EXACT_STATES, перебираются все
+        состояния (комната, флаги, решённые загадки) — и односторонние
+        переходы, и выбор между ключом и кодом учитываются точно. Иначе —
+        жадный маршрут (greedy_score_route).
+        """
+        puzzles = sum(puzzle is not None for puzzle in self.puzzles)
+        if len(self.keys) << puzzles <= EXACT_STATES:
+            return self._exact_route()
+        return self.greedy_score_route()
+
+    def greedy_score_route(self):
+        """Эвристика для больших карт: все доступные загадки жадно, затем сундук (exact=False).
+
+        Сравниваются два способа победы: кодом (ключ от сокровищ не берётся,
+        +100 и очки загадки сундука) и ключом (можно решать и загадки, дающие
+        ключ). Загадки обходятся жадно — каждый раз ближайшая нерешённая, —
+        поэтому на картах с односторонними переходами можно упустить загадки,
+        а переходов не обязательно меньше всего (это задача коммивояжёра).
+        """
+        routes = [self._greedy_route(keyless=False)]
+        if self.code is not None:
+            routes.append(self._greedy_route(keyless=True))
+        routes = [route for route in routes if route is not None]
+        return max(routes, key=lambda route: (route.score, -route.steps), default=None)
+
+    def _greedy_route(self, keyless):
+        state = self.initial()
+        winning = self._winning(set(self._search(state, keyless)), keyless)
+        if state not in winning:
+            return None
+        solved = set()
+        commands, steps = self._start_actions(solved), 0
+        while True:
+            node = state >> FLAG_BITS
+            if self.puzzles[node] and node not in solved and not (
+                    keyless and self.rewards[node] & TREASURE):
+                solved.add(node)
+                commands.append(self.puzzles[node][1])
+                state = node << FLAG_BITS | _normalize(state & FLAG_MASK | self.rewards[node])
+            seen, target = self._search(
+                state, keyless, lambda s: s in winning and self._wanted(s, solved, keyless))
+            if target is None:
+                break
+            commands += self._commands(seen, state, target, solved)
+            steps += seen[target][0]
+            state = target
+
+        seen = self._search(state, keyless)
+        wins = [s for s in seen if self.can_open(s)]
+        best = max(wins, key=lambda s: (self._open_score(s), -seen[s][0]))
+        commands += self._commands(seen, state, best, solved)
+        commands.append(self._open(best))
+        return Route(commands, steps + seen[best][0], self._points(solved) + self._open_score(best),
+                     exact=False)
+
+    # --- Точный перебор для наибольшего счёта ---
+
+    def _exact_route(self):
+        """Лучший маршрут по состояниям (решённые загадки << shift | комната << FLAG_BITS | флаги)."""
+        shift = len(self.keys).bit_length() + FLAG_BITS
+        room_mask = (1 << shift) - 1
+        bits = {node: 1 << (shift + number)
+                for number, node in enumerate(node for node, puzzle in enumerate(self.puzzles) if puzzle)}
+
+        def successors(state):
+            solved, node, flags = state & ~room_mask, (state & room_mask) >> FLAG_BITS, state & FLAG_MASK
+            for direction, target in self.exits[node]:
+                if target == self.treasure and not flags & RUSTY:
+                    continue
+                # При входе берутся только предметы; загадка — отдельное действие
+                entered = _normalize(flags | self.items[target] & _FREE)
+                yield f"go {direction}", solved | target << FLAG_BITS | entered, 1
+            if self.items[node] & TREASURE and not flags & TREASURE:
+                yield "take treasure_key", state | TREASURE, 0
+            bit = bits.get(node)
+            if bit and not state & bit:
+                gained = _normalize(flags | self.rewards[node])
+                yield self.puzzles[node][1], solved | bit | node << FLAG_BITS | gained, 0
+
+        start = self.start << FLAG_BITS | _normalize(self.items[self.start] & _FREE)
+        seen = self._search(start, successors=successors)
+        best, best_key = None, None
+        for state, (steps, _, _) in seen.items():
+            room_state = state & room_mask
+            if self.can_open(room_state):
+                score = sum(self.puzzles[node][0] for node, bit in bits.items() if state & bit)
+                key = (score + self._open_score(room_state), -steps)
+                if best_key is None or key > best_key:
+                    best, best_key = state, key
+        if best is None:
+            return None
+
+        path = []
+        state = best
+        while state != start:
+            _, previous, action = seen[state]
+            path.append((action, previous & FLAG_MASK, state))
+            state = previous
+        commands = self._actions(self.start, 0, puzzles=False)
+        for action, flags, state in reversed(path):
+            commands.append(action)
+            node = (state & room_mask) >> FLAG_BITS
+            if action.startswith('go '):
+                commands += self._actions(node, flags, puzzles=False)
+            elif action.startswith('solve ') and self.rewards[node] & BOX and not (
+                    flags | self.rewards[node]) & RUSTY:
+                commands.append("use bronze_box")
+        commands.append(self._open(best & room_mask))
+        return Route(commands, seen[best][0], best_key[0])
+
+    def _wanted(self, state, solved, keyless):
+        node = state >> FLAG_BITS
+        return (self.puzzles[node] is not None and node not in solved
+                and not (keyless and self.rewards[node] & TREASURE))
+
+    def dead_ends(self):
+        """Достижимые состояния, из которых победить уже нельзя: [(комната, флаги), ...]."""
+        reachable = self.reachable()
+        return sorted((self.keys[state >> FLAG_BITS], state & FLAG_MASK)
+                      for state in reachable - self._winning(reachable))
+
+    # --- Команды маршрута ---
+
+    def _open(self, state):
+        # С ключом сундук открывается ключом, код уже не спрашивается
+        return "open" if state & TREASURE or self.code is None else self.code[1]
+
+    def _open_score(self, state):
+        # Код даёт бонус и очки загадки сундука, ключ — ничего (attempt_open_treasure)
+        return 0 if state & TREASURE else CODE_BONUS + self.code[0]
+
+    def _points(self, solved):
+        return sum(self.puzzles[node][0] for node in solved)
+
+    def _start_actions(self, solved):
+        return self._actions(self.start, 0, solved)
+
+    def _commands(self, seen, start, goal, solved):
+        """Команды от start до goal по предкам обхода, с действиями при входе в комнаты."""
+        path = []
+        state = goal
+        while state != start:
+            _, previous, action = seen[state]
+            path.append((action, previous, state))
+            state = previous
+        commands = []
+        for action, previous, state in reversed(path):
+            commands.append(action)
+            node = state >> FLAG_BITS
+            if action.startswith('go '):
+                commands += self._actions(node, previous & FLAG_MASK, solved)
+            elif action.startswith('solve '):
+                solved.add(node)
+        return commands
+
+    def _actions(self, node, flags, solved=None, puzzles=True):
+        """Бесплатные команды при входе в комнату node: взять ключи, решить загадку.
+
+        puzzles=False — только предметы (точный перебор решает загадки сам).
+        """
+        commands = []
+        for key, flag in (('rusty_key', RUSTY), ('bronze_box', BOX)):
+            if self.items[node] & flag and not flags & (RUSTY | flag):
+                commands.append(f"take {key}")
+                flags |= flag
+        rewards = self.rewards[node]
+        if puzzles and rewards & ~flags & _FREE and not rewards & TREASURE and node not in solved:
+            solved.add(node)
+            commands.append(self.puzzles[node][1])
+            flags |= rewards
+        if flags & BOX and not flags & RUSTY:
+            commands.append("use bronze_box")
+        return commands
+
+
+def main(argv=None):
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Проверка проходимости карты")
+    parser.add_argument('--world', metavar='PATH', help="файл мира (.json, .toml, .lbw)")
+    parser.add_argument('--generate', type=int, metavar='ROOMS', help="сгенерированный лабиринт")
+    parser.add_argument('--seed', type=int, default=0, help="зерно генератора лабиринта")
+    parser.add_argument('--route', action='store_true', help="вывести команды маршрутов")
+    args = parser.parse_args(argv)
+
+    template = None
+    if args.world:
+        from labyrinth_game.worldfile import load_world
+        template = load_world(args.world)
+    elif args.generate:
+        from labyrinth_game.generator import GeneratedRooms
+        template = GeneratedRooms(args.generate, args.seed)
+
+    solver = Solver(template)
+    fastest = solver.min_steps()
+    if fastest is None:
+        print("Карта непроходима: до открытого сундука не добраться.")
+        sys.exit(1)
+    richest = solver.max_score_route()
+    dead_ends = solver.dead_ends()
+    print(f"Состояний: {len(solver.reachable())}, комнат: {len(solver.keys)}")
+    print(f"Кратчайшая победа: {fastest.steps} переходов, {fastest.score} очков")
+    kind = "точно" if richest.exact else "жадная оценка снизу"
+    print(f"Наибольший счёт: {richest.score} очков ({kind}; маршрут: {richest.steps} переходов)")
+    print(f"Тупиковых состояний: {len(dead_ends)}")
+    for key, flags in dead_ends[:10]:
+        print(f"  {key}, флаги {flags:04b}")
+    if args.route:
+        print("Кратчайший маршрут: " + "; ".join(fastest.commands))
+        print("Маршрут на наибольший счёт: " + "; ".join(richest.commands))
+
+
+if __name__ == "__main__":
+    main()
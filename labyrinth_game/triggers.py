@@ -0,0 +1,362 @@
+"""Модуль для триггеров: правил «событие -> условия -> действия» из данных мира.
+
+Случайные события, ловушки и прочие реакции мира не зашиты в код, а
+описаны правилами (стандартные — constants.TRIGGERS, своя карта — раздел
+"triggers" файла мира):
+
+    {"on": "enter", "room": "trap_room", "if": {"lacks": "torch"},
+     "chance": 10, "pick": [2, 3], "effects": [{"trap": true}]}
+
+    on       событие: enter (вход в комнату), take (предмет поднят),
+             use (предмет использован), fail_puzzle (неверный ответ на загадку);
+    room     ключ комнаты (без него — любая);
+    item     предмет для take и use (без него — любой);
+    if       условия, все сразу: has / lacks (есть или нет предмета), room;
+    chance   правило срабатывает в одном случае из chance;
+    pick     [k, n] — и только если бросок из n вариантов дал k;
+    stream   номер потока костей (по умолчанию 0). Правила одного потока
+             бросают одни и те же кости на одном шаге, поэтому правила с
+             разными k в pick взаимоисключающие; у независимых правил
+             должны быть разные потоки;
+    effects  действия по порядку (EFFECTS): say, drop, give, remove, score,
+             trap и if с ветками then / else. У say можно задать kind
+             (вид события) и data — поля события, кроме kind и text.
+
+Правила компилируются один раз на шаблон (Template.triggers) в индекс по
+(событие, комната, предмет), поэтому на каждое событие проверяются только
+правила, которые могут сработать, сколько бы их ни было на карте.
+"""
+
+from itertools import chain
+
+from labyrinth_game.constants import TRIGGERS
+from labyrinth_game.events import emit
+from labyrinth_game.inventory import get_inventory
+from labyrinth_game.items import CATALOGUE, intern
+from labyrinth_game.rng import EVENT_CHANCE, EVENT_KIND, TRAP_DAMAGE, TRAP_ITEM, TRIGGER_STREAMS, next_draw, session_roll
+from labyrinth_game.world import get_world
+
+EVENTS = ('enter', 'take', 'use', 'fail_puzzle')
+CONDITIONS = ('has', 'lacks', 'room')
+RULE_FIELDS = ('on', 'room', 'item', 'if', 'chance', 'pick', 'stream', 'effects')
+
+# Действие -> функция (game_state, effect); заполняется декоратором @effect
+EFFECTS = {}
+
+
+def effect(name):
+    """Регистрирует действие триггера name."""
+    def decorator(function):
+        EFFECTS[name] = function
+        return function
+    return decorator
+
+
+def _purposes(stream):
+    # Поток 0 — прежние назначения random_event: журналы сессий и пакетная среда совпадают
+    if not stream:
+        return EVENT_CHANCE, EVENT_KIND
+    base = TRIGGER_STREAMS + 2 * (stream - 1)
+    return base, base + 1
+
+
+class Trigger:
+    """Скомпилированное правило: условия, броски и действия."""
+
+    __slots__ = ('number', 'condition', 'chance', 'pick', 'purposes', 'effects')
+
+    def __init__(self, number, rule):
+        self.number = number
+        self.condition = _condition(rule.get('if'))
+        self.chance = rule.get('chance')
+        self.pick = tuple(rule['pick']) if rule.get('pick') else None
+        self.purposes = _purposes(rule.get('stream', 0))
+        self.effects = _effects(rule['effects'])
+
+    def fires(self, game_state, dice):
+        """Выполнены ли условия и выпали ли кости на текущем шаге сессии.
+
+        dice — броски уже проверенных правил этого события, (назначение, модуль) -> число:
+        правила одного потока бросают кости один раз, а не каждое заново.
+        """
+        if self.condition and not _holds(self.condition, game_state):
+            return False
+        if self.chance and _roll(game_state, dice, self.purposes[0], self.chance) != 0:
+            return False
+        if self.pick and _roll(game_state, dice, self.purposes[1], self.pick[1]) != self.pick[0]:
+            return False
+        return True
+
+
+def _roll(game_state, dice, purpose, modulo):
+    value = dice.get((purpose, modulo))
+    if value is None:
+        value = dice[purpose, modulo] = session_roll(game_state, purpose, modulo)
+    return value
+
+
+class TriggerIndex:
+    """Правила, разложенные по ключам (событие, комната или None, id предмета или None)."""
+
+    __slots__ = ('_rules',)
+
+    def __init__(self, rules):
+        errors = validate(rules)
+        if errors:
+            raise ValueError("Ошибки в триггерах:\n  " + "\n  ".join(errors))
+        self._rules = {}
+        for number, rule in enumerate(rules):
+            item = rule.get('item')
+            key = (rule['on'], rule.get('room'), None if item is None else intern(item))
+            self._rules.setdefault(key, []).append(Trigger(number, rule))
+
+    def __len__(self):
+        return sum(map(len, self._rules.values()))
+
+    def match(self, event, room, item=None):
+        """Правила, которые могут сработать на событие, в порядке описания."""
+        rules = self._rules
+        found = [rules.get((event, room, None)), rules.get((event, None, None))]
+        if item is not None:
+            found += [rules.get((event, room, item)), rules.get((event, None, item))]
+        found = [triggers for triggers in found if triggers]
+        if len(found) < 2:
+            return found[0] if found else ()
+        return sorted(chain.from_iterable(found), key=lambda trigger: trigger.number)
+
+
+def fire(game_state, event, item=None):
+    """Выполняет правила события event в текущей комнате; возвращает число сработавших.
+
+    item — id предмета для событий take и use.
+    """
+    room = game_state['current_room']
+    fired = 0
+    dice = {}
+    for trigger in get_world(game_state).template.triggers().match(event, room, item):
+        if trigger.fires(game_state, dice):
+            fired += 1
+            run(game_state, trigger.effects)
+    return fired
+
+
+def run(game_state, effects):
+    for name, data in effects:
+        EFFECTS[name](game_state, data)
+
+
+# --- Условия ---
+
+def _condition(condition):
+    if not condition:
+        return ()
+    return tuple((test, condition[test]) for test in CONDITIONS if test in condition)
+
+
+def _holds(condition, game_state):
+    inventory = get_inventory(game_state)
+    for test, value in condition:
+        if test == 'has':
+            if not inventory.has(value):
+                return False
+        elif test == 'lacks':
+            if inventory.has(value):
+                return False
+        elif game_state['current_room'] != value:
+            return False
+    return True
+
+
+# --- Действия ---
+
+def _effects(effects):
+    """Описание действий -> ((имя, данные), ...); у ветвления ветки компилируются заранее."""
+    compiled = []
+    for data in effects:
+        name = next(name for name in EFFECTS if name in data)
+        if name == 'if':
+            data = {'condition': _condition(data['if']),
+                    'then': _effects(data.get('then', ())), 'else': _effects(data.get('else', ()))}
+        compiled.append((name, data))
+    return tuple(compiled)
+
+
+@effect('say')
+def say(game_state, data):
+    emit(game_state, data.get('kind', 'message'), data['say'], **data.get('data', {}))
+
+
+@effect('drop')
+def drop(game_state, data):
+    # Предмет появляется в текущей комнате, если его там ещё нет
+    item_id = intern(data['drop'])
+    room_key = game_state['current_room']
+    world = get_world(game_state)
+    if item_id not in world.room(room_key).items:
+        # Копия комнаты создаётся только при реальном изменении
+        world.edit_room(room_key).items.append(item_id)
+        if data.get('text'):
+            emit(game_state, 'message', data['text'])
+
+
+@effect('give')
+def give(game_state, data):
+    item = CATALOGUE[intern(data['give'])]
+    get_inventory(game_state).append(item.id)
+    emit(game_state, 'reward', data.get('text', f"🎁 Вы получаете: {item.name}"), item=item.key)
+
+
+@effect('remove')
+def remove(game_state, data):
+    item = get_inventory(game_state).take(data['remove'])
+    if item is not None:
+        emit(game_state, 'item_lost', data.get('text', f"📉 Вы потеряли предмет: {item.name}"),
+             item=item.key)
+
+
+@effect('score')
+def add_score(game_state, data):
+    points = data['score']
+    game_state['score'] = game_state.get('score', 0) + points
+    emit(game_state, 'score', data.get('text', f"⭐️ +{points} очков! Всего: {game_state['score']}"),
+         points=points, score=game_state['score'])
+
+
+@effect('trap')
+def trap(game_state, data):
+    trigger_trap(game_state)
+
+
+@effect('if')
+def branch(game_state, data):
+    run(game_state, data['then'] if _holds(data['condition'], game_state) else data['else'])
+
+
+def trigger_trap(game_state):
+    emit(game_state, 'trap', "\n⚠️ Ловушка активирована! Пол стал дрожать...",
+         room=game_state.get('current_room'))
+
+    inventory = get_inventory(game_state)
+    # Вторая ловушка на том же шаге бросает новые кости, а не повторяет первую
+    draw = next_draw(game_state)
+
+    if inventory:
+        # Выбираем случайный предмет для удаления
+        item_index = session_roll(game_state, TRAP_ITEM, len(inventory), draw)
+        lost_item = inventory.pop(item_index)
+
+        emit(game_state, 'item_lost', f"📉 Вы потеряли предмет: {lost_item.name}",
+             item=lost_item.key)
+    else:
+        # Игрок получает "урон"
+        damage_chance = session_roll(game_state, TRAP_DAMAGE, 10, draw)
+
+        if damage_chance < 3:  # 30% шанс поражения
+            game_state['game_over'] = True
+            emit(game_state, 'death', "☠️ Вас настигла ловушка! Игра окончена.")
+        else:
+            emit(game_state, 'message', "🏃 Вам удалось увернуться от ловушки. Вы уцелели!")
+
+
+# --- Проверка данных мира ---
+
+def _plain(value):
+    if hasattr(value, 'items'):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def is_default(rules):
+    """Совпадают ли правила со стандартными constants.TRIGGERS (в любом представлении)."""
+    return rules is TRIGGERS or _plain(rules) == _plain(TRIGGERS)
+
+
+def validate(rules, where='triggers'):
+    """Список ошибок в описании правил (пустой, если всё в порядке)."""
+    if not isinstance(rules, (list, tuple)):
+        return [f"{where}: нужен список правил"]
+    errors = []
+    for number, rule in enumerate(rules):
+        at = f"{where}[{number}]"
+        if not hasattr(rule, 'get'):
+            errors.append(f"{at}: правило должно быть объектом")
+            continue
+        unknown = [field for field in rule if field not in RULE_FIELDS]
+        if unknown:
+            errors.append(f"{at}: неизвестные поля {', '.join(map(str, unknown))}")
+        if rule.get('on') not in EVENTS:
+            errors.append(f"{at}.on: нужно одно из {', '.join(EVENTS)}")
+        for field in ('room', 'item'):
+            if field in rule and not isinstance(rule[field], str):
+                errors.append(f"{at}.{field}: нужна строка")
+        if 'item' in rule and rule.get('on') not in ('take', 'use'):
+            errors.append(f"{at}.item: предмет указывают только для take и use")
+        errors.extend(_condition_errors(f"{at}.if", rule.get('if')))
+        chance = rule.get('chance')
+        if chance is not None and not (isinstance(chance, int) and chance > 0):
+            errors.append(f"{at}.chance: нужно целое число больше нуля")
+        pick = rule.get('pick')
+        if pick is not None and not (isinstance(pick, (list, tuple)) and len(pick) == 2
+                                     and all(isinstance(value, int) for value in pick)
+                                     and 0 <= pick[0] < pick[1]):
+            errors.append(f"{at}.pick: нужна пара [k, n], 0 <= k < n")
+        stream = rule.get('stream', 0)
+        if not (isinstance(stream, int) and stream >= 0):
+            errors.append(f"{at}.stream: нужно целое число не меньше нуля")
+        errors.extend(_effect_errors(f"{at}.effects", rule.get('effects')))
+    return errors
+
+
+def _condition_errors(where, condition):
+    if condition is None:
+        return []
+    if not hasattr(condition, 'get') or not condition:
+        return [f"{where}: нужен объект с условиями {', '.join(CONDITIONS)}"]
+    errors = [f"{where}: неизвестное условие {test}" for test in condition if test not in CONDITIONS]
+    errors += [f"{where}.{test}: нужна строка" for test in CONDITIONS
+               if test in condition and not isinstance(condition[test], str)]
+    return errors
+
+
+_EFFECT_VALUES = {'say': str, 'drop': str, 'give': str, 'remove': str, 'score': int}
+# Поля data у say уходят в emit(**data) и не должны совпадать с его параметрами
+_EMIT_PARAMETERS = ('game_state', 'kind', 'text')
+
+
+def _say_errors(where, data):
+    errors = []
+    if 'kind' in data and not isinstance(data['kind'], str):
+        errors.append(f"{where}.kind: нужна строка")
+    fields = data.get('data', {})
+    # Как и правила, data может быть любым отображением (constants — MappingProxyType)
+    if not hasattr(fields, 'keys') or not all(isinstance(key, str) for key in fields.keys()):
+        errors.append(f"{where}.data: нужен объект со строковыми ключами")
+    else:
+        errors += [f"{where}.data.{key}: имя занято параметром события"
+                   for key in _EMIT_PARAMETERS if key in fields]
+    return errors
+
+
+def _effect_errors(where, effects):
+    if not isinstance(effects, (list, tuple)):
+        return [f"{where}: нужен список действий"]
+    errors = []
+    for number, data in enumerate(effects):
+        at = f"{where}[{number}]"
+        names = [name for name in EFFECTS if hasattr(data, 'get') and name in data]
+        if len(names) != 1:
+            errors.append(f"{at}: нужно ровно одно действие из {', '.join(EFFECTS)}")
+            continue
+        name = names[0]
+        kind = _EFFECT_VALUES.get(name)
+        if kind is not None and not isinstance(data[name], kind):
+            errors.append(f"{at}.{name}: нужно значение типа {kind.__name__}")
+        if name == 'say':
+            errors.extend(_say_errors(at, data))
+        if name == 'if':
+            errors.extend(_condition_errors(f"{at}.if", data['if']))
+            errors.extend(_effect_errors(f"{at}.then", data.get('then', ())))
+            errors.extend(_effect_errors(f"{at}.else", data.get('else', ())))
+    return errors
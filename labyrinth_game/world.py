@@ -0,0 +1,330 @@
+"""Модуль для состояния мира отдельной игровой сессии."""
+
+import itertools
+from array import array
+from collections import OrderedDict, deque
+
+from labyrinth_game.constants import ROOMS, TRIGGERS
+from labyrinth_game.inventory import Inventory
+from labyrinth_game.items import intern
+from labyrinth_game.rng import new_seed
+
+
+# Источник версий комнат: номер уникален в пределах процесса
+_stamps = itertools.count(1)
+
+# Сколько комнат может обойти поиск пути на карте без индекса (LRUTemplate)
+PATH_SEARCH_LIMIT = 100_000
+
+
+class PathSearchLimit(LookupError):
+    """Поиск пути обошёл PATH_SEARCH_LIMIT комнат, так и не дойдя до цели."""
+
+
+class Room:
+    """Компактная запись комнаты: предметы хранятся массивом id из каталога.
+
+    stamp — версия видимого состояния комнаты. Копия с тем же содержимым
+    сохраняет версию, а World.edit_room выдаёт новую, поэтому кэш по stamp
+    (например, готовый текст описания) сам перестаёт совпадать после изменений.
+    """
+
+    __slots__ = ('key', 'name', 'description', 'exits', 'items', 'puzzle', 'stamp')
+
+    def __init__(self, key, name, description, exits, items, puzzle, stamp=None):
+        self.key = key
+        self.name = name
+        self.description = description
+        self.exits = exits
+        self.items = items
+        self.puzzle = puzzle
+        self.stamp = next(_stamps) if stamp is None else stamp
+
+    @classmethod
+    def from_dict(cls, key, data):
+        """Собирает запись из описания комнаты в формате ROOMS."""
+        return cls(
+            key,
+            data.get('name', key),
+            data.get('description', 'Здесь ничего особенного.'),
+            data.get('exits', {}),
+            array('i', map(intern, data.get('items', ()))),
+            data.get('puzzle'),
+        )
+
+    def copy(self):
+        # Копируем только то, что сессия меняет на месте (массив предметов).
+        # Загадку и выходы не меняют, а заменяют целиком, поэтому их можно делить.
+        return Room(self.key, self.name, self.description, self.exits,
+                    array('i', self.items), self.puzzle, self.stamp)
+
+
+class Template:
+    """Общий неизменяемый шаблон комнат.
+
+    Описания комнат в формате ROOMS превращаются в записи Room лениво, при
+    первом обращении, и затем разделяются всеми мирами этого шаблона.
+    Возвращаемые записи нельзя менять на месте — для этого есть World.edit_room.
+    trigger_rules — правила триггеров карты (по умолчанию constants.TRIGGERS).
+    """
+
+    __slots__ = ('rooms', 'trigger_rules', '_compiled', '_graph', '_triggers')
+
+    indexed = True   # путь ищется по общему графу всей карты (graph)
+
+    def __init__(self, rooms=ROOMS, triggers=None):
+        self.rooms = rooms
+        self.trigger_rules = TRIGGERS if triggers is None else triggers
+        self._compiled = {}
+        self._graph = None
+        self._triggers = None
+
+    def __contains__(self, room_key):
+        return room_key in self.rooms
+
+    def __getitem__(self, room_key):
+        room = self.get(room_key)
+        if room is None:
+            raise KeyError(room_key)
+        return room
+
+    def get(self, room_key):
+        room = self._compiled.get(room_key)
+        if room is None:
+            data = self.rooms.get(room_key)
+            if data is None:
+                return None
+            room = self._compiled[room_key] = Room.from_dict(room_key, data)
+        return room
+
+    def keys(self):
+        return self.rooms.keys()
+
+    def exits(self, room_key):
+        """Выходы комнаты шаблона или None, если комнаты нет."""
+        room = self.get(room_key)
+        return None if room is None else room.exits
+
+    def graph(self):
+        """Граф переходов шаблона; строится один раз и делится всеми мирами.
+
+        Строится прямо по описаниям комнат, не компилируя их в Room.
+        """
+        if self._graph is None:
+            # Граф нужен только команде path и анализу карты — не грузим его при запуске
+            from labyrinth_game.graph import RoomGraph
+            self._graph = RoomGraph(self.rooms)
+        return self._graph
+
+    def triggers(self):
+        """Индекс триггеров шаблона (triggers.TriggerIndex); компилируется один раз."""
+        if self._triggers is None:
+            # triggers.py сам обращается к миру сессии, поэтому импорт — при первом вызове
+            from labyrinth_game.triggers import TriggerIndex
+            self._triggers = TriggerIndex(self.trigger_rules)
+        return self._triggers
+
+
+class LRUTemplate(Template):
+    """Шаблон для карт, которые не помещаются в память (worldfile.CompiledRooms).
+
+    Готовые записи Room хранятся только для cache_size последних комнат;
+    остальные снова декодируются из карты при обращении. Повторно собранная
+    комната получает новую версию (stamp) — кэши по stamp просто промахнутся.
+    Граф всей карты в памяти не строится: World.path обходит выходы по требованию.
+    """
+
+    __slots__ = ('cache_size',)
+
+    indexed = False
+
+    def __init__(self, rooms, cache_size=4096, triggers=None):
+        super().__init__(rooms, triggers)
+        self._compiled = OrderedDict()
+        self.cache_size = cache_size
+
+    def get(self, room_key):
+        compiled = self._compiled
+        room = compiled.get(room_key)
+        if room is not None:
+            compiled.move_to_end(room_key)
+            return room
+        data = self.rooms.get(room_key)
+        if data is None:
+            return None
+        room = compiled[room_key] = Room.from_dict(room_key, data)
+        if len(compiled) > self.cache_size:
+            compiled.popitem(last=False)
+        return room
+
+    def exits(self, room_key):
+        # Обход ради пути не должен вытеснять из LRU комнаты, где играют сессии
+        room = self._compiled.get(room_key)
+        if room is not None:
+            return room.exits
+        read_exits = getattr(self.rooms, 'exits', None)
+        if read_exits is not None:
+            return read_exits(room_key)
+        data = self.rooms.get(room_key)
+        return None if data is None else data.get('exits', {})
+
+
+DEFAULT_TEMPLATE = Template(ROOMS)
+
+
+def as_template(rooms=None):
+    """Шаблон для карты rooms; стандартная карта всегда даёт общий DEFAULT_TEMPLATE."""
+    if rooms is None or rooms is ROOMS:
+        return DEFAULT_TEMPLATE
+    if isinstance(rooms, Template):
+        return rooms
+    return Template(rooms)
+
+
+class World:
+    """Мир одной игровой сессии.
+
+    Шаблон комнат (по умолчанию ROOMS) общий для всех сессий и никогда
+    не изменяется. Комната копируется в оверлей сессии только при первом
+    изменении (copy-on-write), поэтому сессия хранит лишь те комнаты,
+    которые игрок действительно изменил.
+    """
+
+    __slots__ = ('template', 'overlay', '_graph')
+
+    def __init__(self, template=None, overlay=None):
+        self.template = as_template(template)
+        self.overlay = {} if overlay is None else overlay
+        self._graph = None  # собственный граф, только если сессия меняла выходы
+
+    def __contains__(self, room_key):
+        return room_key in self.overlay or room_key in self.template
+
+    def room(self, room_key):
+        """Возвращает комнату только для чтения (или None, если её нет)."""
+        room = self.overlay.get(room_key)
+        if room is None:
+            room = self.template.get(room_key)
+        return room
+
+    def edit_room(self, room_key):
+        """Возвращает изменяемую копию комнаты, принадлежащую этой сессии.
+
+        Комната сразу получает новую версию (stamp): вызывающий код меняет её.
+        """
+        room = self.overlay.get(room_key)
+        if room is None:
+            room = self.template[room_key].copy()
+            self.overlay[room_key] = room
+        room.stamp = next(_stamps)
+        return room
+
+    def set_exits(self, room_key, exits):
+        """Заменяет выходы комнаты и обновляет граф сессии."""
+        self.edit_room(room_key).exits = exits
+        if self._graph is not None:
+            self._graph.set_exits(room_key, exits)
+
+    def revert_room(self, room_key):
+        """Возвращает комнату к виду из шаблона."""
+        room = self.overlay.pop(room_key, None)
+        if room is not None and self._graph is not None:
+            self._graph.set_exits(room_key, self.template[room_key].exits)
+
+    def exits(self, room_key):
+        """Выходы комнаты с учётом изменений сессии или None, если комнаты нет."""
+        room = self.overlay.get(room_key)
+        return room.exits if room is not None else self.template.exits(room_key)
+
+    def path(self, start, goal):
+        """Кратчайший путь [(направление, комната), ...] или None, если пути нет.
+
+        На картах в памяти путь берётся из графа (graph). У карт из файла
+        (LRUTemplate) индекса всей карты нет: обход в ширину идёт по выходам
+        комнат и помнит не больше PATH_SEARCH_LIMIT комнат, а если цель дальше —
+        PathSearchLimit. Так память не растёт вместе с размером карты.
+        """
+        if self.template.indexed:
+            return self.graph().path(start, goal)
+        if start == goal:
+            return []
+        # Только "комната -> откуда пришли": направления находятся заново для
+        # комнат самого пути, чтобы обход хранил поменьше объектов
+        parents = {start: None}
+        queue = deque((start,))
+        while queue:
+            room_key = queue.popleft()
+            for target in (self.exits(room_key) or {}).values():
+                if target in parents:
+                    continue
+                parents[target] = room_key
+                if target == goal:
+                    return self._unwind(parents, goal)
+                if len(parents) > PATH_SEARCH_LIMIT:
+                    raise PathSearchLimit(goal)
+                queue.append(target)
+        return None
+
+    def _unwind(self, parents, goal):
+        steps = []
+        while parents[goal] is not None:
+            previous = parents[goal]
+            direction = next(d for d, target in self.exits(previous).items() if target == goal)
+            steps.append((direction, goal))
+            goal = previous
+        steps.reverse()
+        return steps
+
+    def graph(self):
+        """Граф переходов с учётом изменённых сессией выходов.
+
+        Пока выходы не менялись, возвращается общий граф шаблона; свою копию
+        сессия получает при первом изменении и дальше обновляет её по месту.
+        """
+        if self._graph is not None:
+            return self._graph
+        graph = self.template.graph()
+        # Сравнение по значению: шаблон с LRU может заново собрать ту же комнату
+        changed = [room for key, room in self.overlay.items()
+                   if room.exits != self.template[key].exits]
+        if changed:
+            graph = self._graph = graph.copy()
+            for room in changed:
+                graph.set_exits(room.key, room.exits)
+        return graph
+
+    def copy(self):
+        """Независимая копия мира; шаблон при этом остаётся общим."""
+        overlay = {key: room.copy() for key, room in self.overlay.items()}
+        return World(self.template, overlay)
+
+    def reset(self):
+        """Возвращает мир к исходному состоянию шаблона."""
+        self.overlay.clear()
+        self._graph = None
+
+
+def get_world(game_state):
+    """Возвращает мир сессии, создавая его для старых game_state без мира."""
+    world = game_state.get('world')
+    if world is None:
+        world = game_state['world'] = World()
+    return world
+
+
+def new_game_state(template=None, seed=None):
+    """Создаёт состояние новой игровой сессии поверх общего шаблона комнат.
+
+    seed — зерно случайных событий сессии; по умолчанию выбирается случайно.
+    """
+    return {
+        'player_inventory': Inventory(),  # Инвентарь игрока
+        'current_room': 'entrance',  # Текущая комната
+        'game_over': False,          # Флаг окончания игры
+        'steps_taken': 0,            # Количество шагов
+        'score': 0,                  # Счет игрока
+        'solved_puzzles': 0,         # Количество решенных загадок
+        'victory': False,            # Флаг победы
+        'world': World(template),    # Изменения мира этой сессии
+        'seed': new_seed() if seed is None else seed,  # Зерно ловушек и случайных событий
+    }
@@ -0,0 +1,558 @@
+"""Модуль для загрузки карты из файла мира (JSON или TOML) через скомпилированный кэш.
+
+Файл мира описывает комнаты в формате constants.ROOMS и, по желанию,
+дополнительные псевдонимы команд в формате constants.COMMANDS и триггеры
+(triggers.py; без раздела triggers — стандартные constants.TRIGGERS):
+
+    {"rooms": {"entrance": {"description": "...", "exits": {"north": "hall"}, ...}, ...},
+     "commands": {"look / смотреть": "осмотреть текущую комнату"},
+     "triggers": [{"on": "take", "item": "sword", "effects": [{"score": 5}]}]}
+
+При первом запуске файл проверяется целиком (битые выходы, загадки без
+ответа, неверные типы — все ошибки сразу, WorldError) и компилируется в
+бинарный файл, имя которого — хэш содержимого. Следующие запуски с тем же
+файлом мира сразу отображают готовый файл в память (mmap) и читают комнаты
+по требованию, ничего не разбирая заново.
+
+Формат скомпилированного файла (числа little-endian):
+
+    заголовок   b'LBWD', версия u16, 0 u16, u64 комнат, u64 ячеек индекса,
+                u64 смещение таблицы комнат, u64 смещение индекса,
+                u64 смещение метаданных, u64 длина метаданных
+    данные      записи комнат и общие строки (описания, загадки в JSON)
+    комнаты     u64 x комнат — смещения записей комнат
+    индекс      u32 x ячеек — открытая адресация по crc32 ключа, номер комнаты + 1
+    метаданные  JSON: псевдонимы команд, триггеры, исходный файл
+
+    запись      u16 длина ключа, u16 длина имени, u64+u32 описание, u64+u32 загадка,
+                u16 выходов, u16 предметов, ключ, имя, выходы (u16 длина, направление,
+                u16 длина, комната), предметы (u8 вид, u16 длина, данные: название
+                или, для предмета-объекта {"name", "description"}, его JSON)
+
+Поля записи ограничены по размеру (MAX_FIELD байт или штук), validate()
+сообщает о превышении как об обычной ошибке файла мира. Файлы версии 1
+(счётчики и длины названий в u8, предметы только строками) читаются как прежде.
+
+В памяти процесса остаются только таблицы, отображённые из файла, и LRU
+из нескольких тысяч декодированных комнат, поэтому карта может быть больше
+оперативной памяти — например, выгруженный генератором лабиринт:
+
+    python -m labyrinth_game.worldfile worlds/classic.json   # проверить и скомпилировать
+    python -m labyrinth_game.worldfile --generate 10000000 --seed 42 -o big.lbw
+    project --world worlds/classic.json
+    project --world big.lbw
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from hashlib import blake2b
+from pathlib import Path
+from zlib import crc32
+
+from labyrinth_game import triggers
+from labyrinth_game.commands import HANDLERS, add_specs, parse_aliases
+from labyrinth_game.generator import generate_rooms
+from labyrinth_game.world import LRUTemplate
+
+MAGIC = b'LBWD'
+VERSION = 2
+VERSIONS = (1, 2)   # какие версии CompiledRooms умеет читать
+MAX_FIELD = 0xFFFF   # предел полей u16 записи комнаты: длины строк, число выходов и предметов
+SUFFIX = '.lbw'
+SOURCE_SUFFIXES = ('.json', '.toml')
+POOL_DEDUPE = 65536   # сколько разных общих строк запоминать для повторного использования
+ROOM_CACHE_SIZE = 4096   # декодированных комнат в памяти (load_world)
+
+_HEADER = struct.Struct('<4sHHQQQQQQ')
+_ROOM = struct.Struct('<HHQIQIHH')
+_ROOM_V1 = struct.Struct('<HHQIQIBB')
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_MAX_TEXT = 0xFFFFFFFF   # описание и загадка: смещение u64 и длина u32
+_ITEM_NAME, _ITEM_OBJECT = 0, 1   # вид предмета в записи
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+class WorldError(ValueError):
+    """Ошибки в файле мира; errors — список всех найденных проблем."""
+
+    def __init__(self, path, errors):
+        self.path = path
+        self.errors = errors
+        super().__init__(f"{path}: ошибок в файле мира: {len(errors)}\n  " + "\n  ".join(errors))
+
+
+# --- Исходный файл мира ---
+
+def parse_source(data, suffix):
+    """Разбирает содержимое файла мира (bytes) по расширению .json или .toml."""
+    text = data.decode('utf-8')
+    if suffix == '.toml':
+        import tomllib
+        return tomllib.loads(text)
+    if suffix == '.json':
+        return json.loads(text)
+    raise ValueError(f"Неизвестный формат файла мира: {suffix!r} (нужен .json или .toml)")
+
+
+def validate(source):
+    """Список ошибок в разобранном файле мира (пустой, если всё в порядке)."""
+    if not isinstance(source, dict):
+        return ["файл мира должен быть объектом с разделом 'rooms'"]
+    rooms = source.get('rooms')
+    if not isinstance(rooms, dict) or not rooms:
+        return ["раздел 'rooms' должен быть непустым объектом"]
+
+    errors = []
+    if 'entrance' not in rooms:
+        errors.append("нет стартовой комнаты 'entrance'")
+    for key, room in rooms.items():
+        where = f"rooms.{key}"
+        if not isinstance(room, dict):
+            errors.append(f"{where}: комната должна быть объектом")
+            continue
+        errors.extend(_length_errors(where, key, MAX_FIELD, "ключ"))
+        for field, limit in (('name', MAX_FIELD), ('description', _MAX_TEXT)):
+            if field in room:
+                if not isinstance(room[field], str):
+                    errors.append(f"{where}.{field}: нужна строка")
+                else:
+                    errors.extend(_length_errors(f"{where}.{field}", room[field], limit))
+        exits = room.get('exits', {})
+        if not isinstance(exits, dict):
+            errors.append(f"{where}.exits: нужен объект 'направление: комната'")
+        else:
+            if len(exits) > MAX_FIELD:
+                errors.append(f"{where}.exits: больше {MAX_FIELD} выходов")
+            for direction, target in exits.items():
+                errors.extend(_length_errors(f"{where}.exits", direction, MAX_FIELD, "направление"))
+                if not isinstance(target, str):
+                    errors.append(f"{where}.exits.{direction}: нужна строка с ключом комнаты")
+                elif target not in rooms:
+                    errors.append(f"{where}.exits.{direction}: нет комнаты '{target}'")
+        errors.extend(_items_errors(f"{where}.items", room.get('items', [])))
+        errors.extend(_puzzle_errors(f"{where}.puzzle", room.get('puzzle')))
+
+    commands = source.get('commands', {})
+    if not isinstance(commands, dict) or not all(
+            isinstance(spec, str) and isinstance(text, str) for spec, text in commands.items()):
+        errors.append("commands: нужен объект 'псевдонимы: описание'")
+    else:
+        for spec in commands:
+            # Первый псевдоним должен быть командой игры (commands.add_specs)
+            aliases = parse_aliases(spec)
+            if not aliases:
+                errors.append(f"commands: пустое описание псевдонимов {spec!r}")
+            elif aliases[0] not in HANDLERS:
+                errors.append(f"commands.{spec}: неизвестная команда '{aliases[0]}'")
+    if 'triggers' in source:
+        errors.extend(triggers.validate(source['triggers']))
+        for number, rule in enumerate(source['triggers']):
+            if isinstance(rule, dict) and isinstance(rule.get('room'), str) and rule['room'] not in rooms:
+                errors.append(f"triggers[{number}].room: нет комнаты '{rule['room']}'")
+    return errors
+
+
+def _length_errors(where, text, limit, what="строка"):
+    if len(text.encode('utf-8')) > limit:
+        return [f"{where}: {what} длиннее {limit} байт в UTF-8"]
+    return []
+
+
+def _items_errors(where, items):
+    """Предметы — названия или объекты {"name", "description"}, как в constants.ROOMS."""
+    if not isinstance(items, list):
+        return [f"{where}: нужен список предметов"]
+    errors = []
+    if len(items) > MAX_FIELD:
+        errors.append(f"{where}: больше {MAX_FIELD} предметов")
+    for number, item in enumerate(items):
+        at = f"{where}[{number}]"
+        if isinstance(item, str):
+            errors.extend(_length_errors(at, item, MAX_FIELD, "название"))
+        elif isinstance(item, dict):
+            if (not isinstance(item.get('name'), str) or not isinstance(item.get('description', ''), str)
+                    or set(item) - {'name', 'description'}):
+                errors.append(f"{at}: у предмета-объекта нужны строки name и (по желанию) description")
+            else:
+                errors.extend(_length_errors(at, _item_json(item), MAX_FIELD, "предмет"))
+        else:
+            errors.append(f"{at}: нужно название предмета или объект с полями name и description")
+    return errors
+
+
+def _item_json(item):
+    return json.dumps(item, ensure_ascii=False)
+
+
+def _puzzle_errors(where, puzzle):
+    if puzzle is None:
+        return []
+    if not isinstance(puzzle, dict):
+        return [f"{where}: загадка должна быть объектом"]
+    errors = []
+    if not isinstance(puzzle.get('question'), str):
+        errors.append(f"{where}: нет вопроса 'question'")
+    answer = puzzle.get('answer')
+    if answer is None:
+        errors.append(f"{where}: нет ответа 'answer'")
+    elif not (isinstance(answer, (str, int)) or
+              isinstance(answer, list) and answer and all(isinstance(a, (str, int)) for a in answer)):
+        errors.append(f"{where}.answer: нужна строка, число или список вариантов")
+    if not isinstance(puzzle.get('points', 0), int):
+        errors.append(f"{where}.points: нужно целое число")
+    return errors
+
+
+# --- Компиляция ---
+
+def write_world(path, rooms, count, meta=None):
+    """Пишет скомпилированный мир: rooms — поток пар (ключ, комната), count — их число.
+
+    Комнаты пишутся по одной, поэтому память не зависит от размера карты
+    (кроме таблиц смещений и индекса: 8 и до 8 байт на комнату).
+    Файл появляется под именем path только целиком (через временный файл).
+    """
+    path = Path(path)
+    slots = 1 << max(3, (2 * count - 1).bit_length())   # заполнение не больше половины
+    offsets = array('Q')
+    index = array('I', bytes(4 * slots))
+    mask = slots - 1
+    pool = {}
+    tmp = path.with_name(path.name + f'.{os.getpid()}.tmp')
+
+    with open(tmp, 'wb') as file:
+        file.write(bytes(_HEADER.size))
+        position = _HEADER.size
+
+        def pooled(text):
+            # Общие строки (описания, загадки) пишутся в данные один раз
+            nonlocal position
+            ref = pool.get(text)
+            if ref is None:
+                data = text.encode('utf-8')
+                ref = (position, len(data))
+                file.write(data)
+                position += len(data)
+                if len(pool) < POOL_DEDUPE:
+                    pool[text] = ref
+            return ref
+
+        for key, room in rooms:
+            description = pooled(room.get('description', 'Здесь ничего особенного.'))
+            puzzle = room.get('puzzle')
+            puzzle = pooled(json.dumps(puzzle, ensure_ascii=False, default=dict)) if puzzle else (0, 0)
+            key_data = key.encode('utf-8')
+            name = room.get('name')
+            name_data = name.encode('utf-8') if name is not None and name != key else b''
+            exits = room.get('exits', {})
+            items = room.get('items', ())
+
+            parts = [_ROOM.pack(len(key_data), len(name_data), *description, *puzzle,
+                                len(exits), len(items)), key_data, name_data]
+            for direction, target in exits.items():
+                direction, target = direction.encode('utf-8'), target.encode('utf-8')
+                parts += [_U16.pack(len(direction)), direction, _U16.pack(len(target)), target]
+            for item in items:
+                kind = _ITEM_NAME if isinstance(item, str) else _ITEM_OBJECT
+                item = (item if kind == _ITEM_NAME else _item_json(item)).encode('utf-8')
+                parts += [_U8.pack(kind), _U16.pack(len(item)), item]
+            record = b''.join(parts)
+
+            slot = crc32(key_data) & mask
+            while index[slot]:
+                slot = (slot + 1) & mask
+            index[slot] = len(offsets) + 1
+            offsets.append(position)
+            file.write(record)
+            position += len(record)
+
+        if len(offsets) != count:
+            raise ValueError(f"Ожидалось комнат: {count}, получено: {len(offsets)}")
+        if _BIG_ENDIAN:
+            offsets.byteswap()
+            index.byteswap()
+        rooms_offset = position
+        file.write(offsets.tobytes())
+        index_offset = rooms_offset + 8 * count
+        file.write(index.tobytes())
+        meta_offset = index_offset + 4 * slots
+        meta_data = json.dumps(meta or {}, ensure_ascii=False).encode('utf-8')
+        file.write(meta_data)
+        file.seek(0)
+        file.write(_HEADER.pack(MAGIC, VERSION, 0, count, slots, rooms_offset, index_offset,
+                                meta_offset, len(meta_data)))
+    os.replace(tmp, path)
+    return path
+
+
+def cache_dir():
+    """Каталог скомпилированных миров: $XDG_CACHE_HOME/labyrinth или ~/.cache/labyrinth."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'labyrinth'
+
+
+def compile_world(path, directory=None):
+    """Проверяет и компилирует файл мира; возвращает путь к скомпилированному файлу.
+
+    Имя результата — хэш содержимого файла мира и версии формата, так что
+    неизменённый файл компилируется один раз, а любая правка даёт новый кэш.
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    digest = blake2b(data, digest_size=16, person=MAGIC + VERSION.to_bytes(2, 'little'))
+    target = Path(directory or cache_dir()) / (digest.hexdigest() + SUFFIX)
+    if target.exists():
+        return target
+
+    source = parse_source(data, path.suffix.lower())
+    errors = validate(source)
+    if errors:
+        raise WorldError(path, errors)
+    rooms = source['rooms']
+    target.parent.mkdir(parents=True, exist_ok=True)
+    meta = {'source': str(path), 'commands': source.get('commands', {})}
+    if 'triggers' in source:
+        meta['triggers'] = source['triggers']
+    return write_world(target, rooms.items(), len(rooms), meta)
+
+
+# --- Чтение скомпилированного мира ---
+
+class CompiledRooms(Mapping):
+    """Скомпилированный мир, отображённый в память: ключ комнаты -> описание в формате ROOMS.
+
+    Комната декодируется из файла при каждом обращении и нигде не хранится,
+    как в generator.GeneratedRooms; несколько горячих записей Room держит
+    world.LRUTemplate (см. load_world).
+    """
+
+    __slots__ = ('path', 'meta', 'version', '_file', '_map', '_offsets', '_index', '_mask', '_count', '_room')
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, count, slots, rooms_offset, index_offset, meta_offset,
+         meta_length) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version not in VERSIONS:
+            self.close()
+            raise ValueError(f"{path}: это не скомпилированный мир лабиринта "
+                             f"(поддерживаются версии {', '.join(map(str, VERSIONS))})")
+        self.version = version
+        self._room = _ROOM if version >= 2 else _ROOM_V1
+        with memoryview(self._map) as view:
+            self._offsets = view[rooms_offset:index_offset].cast('Q')
+            self._index = view[index_offset:index_offset + 4 * slots].cast('I')
+        if _BIG_ENDIAN:
+            # Таблицы записаны little-endian: на такой машине их приходится копировать
+            self._offsets, self._index = array('Q', self._offsets), array('I', self._index)
+            self._offsets.byteswap()
+            self._index.byteswap()
+        self._mask = slots - 1
+        self._count = count
+        self.meta = json.loads(self._map[meta_offset:meta_offset + meta_length].decode('utf-8'))
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return map(self.key, range(self._count))
+
+    def __contains__(self, room_key):
+        return self.index(room_key) is not None
+
+    def __getitem__(self, room_key):
+        index = self.index(room_key)
+        if index is None:
+            raise KeyError(room_key)
+        return self.room(index)
+
+    def get(self, room_key, default=None):
+        index = self.index(room_key)
+        return default if index is None else self.room(index)
+
+    def index(self, room_key):
+        """Номер комнаты по ключу или None."""
+        if not isinstance(room_key, str):
+            return None
+        data = room_key.encode('utf-8')
+        slot = crc32(data) & self._mask
+        while True:
+            entry = self._index[slot]
+            if not entry:
+                return None
+            if self._key_bytes(entry - 1) == data:
+                return entry - 1
+            slot = (slot + 1) & self._mask
+
+    def _key_bytes(self, index):
+        offset = self._offsets[index]
+        length = _U16.unpack_from(self._map, offset)[0]
+        start = offset + self._room.size
+        return self._map[start:start + length]
+
+    def key(self, index):
+        return self._key_bytes(index).decode('utf-8')
+
+    def room(self, index):
+        """Описание комнаты номер index в формате ROOMS."""
+        data = self._map
+        offset = self._offsets[index]
+        record = self._room
+        (key_length, name_length, description, description_length, puzzle, puzzle_length,
+         exit_count, item_count) = record.unpack_from(data, offset)
+        position = offset + record.size + key_length
+        if record is _ROOM_V1:
+            return self._room_v1(data, position, name_length, description, description_length,
+                                 puzzle, puzzle_length, exit_count, item_count)
+        room = {}
+        if name_length:
+            room['name'] = data[position:position + name_length].decode('utf-8')
+            position += name_length
+        room['description'] = data[description:description + description_length].decode('utf-8')
+
+        exits = {}
+        for _ in range(exit_count):
+            length = _U16.unpack_from(data, position)[0]
+            direction = data[position + 2:position + 2 + length].decode('utf-8')
+            position += 2 + length
+            length = _U16.unpack_from(data, position)[0]
+            exits[direction] = data[position + 2:position + 2 + length].decode('utf-8')
+            position += 2 + length
+        room['exits'] = exits
+
+        items = []
+        for _ in range(item_count):
+            kind = data[position]
+            length = _U16.unpack_from(data, position + 1)[0]
+            item = data[position + 3:position + 3 + length].decode('utf-8')
+            items.append(item if kind == _ITEM_NAME else json.loads(item))
+            position += 3 + length
+        room['items'] = items
+        room['puzzle'] = (json.loads(data[puzzle:puzzle + puzzle_length].decode('utf-8'))
+                          if puzzle_length else None)
+        return room
+
+    def exits(self, room_key):
+        """Только выходы комнаты (без описания и предметов) или None, если её нет."""
+        index = self.index(room_key)
+        if index is None:
+            return None
+        data = self._map
+        offset = self._offsets[index]
+        record = self._room
+        key_length, name_length, *_, exit_count, _ = record.unpack_from(data, offset)
+        position = offset + record.size + key_length + name_length
+        # В версии 1 длина направления — u8
+        width = 2 if record is _ROOM else 1
+        exits = {}
+        for _ in range(exit_count):
+            length = (_U16.unpack_from(data, position)[0] if width == 2 else data[position])
+            direction = data[position + width:position + width + length].decode('utf-8')
+            position += width + length
+            length = _U16.unpack_from(data, position)[0]
+            exits[direction] = data[position + 2:position + 2 + length].decode('utf-8')
+            position += 2 + length
+        return exits
+
+    def _room_v1(self, data, position, name_length, description, description_length,
+                 puzzle, puzzle_length, exit_count, item_count):
+        # Версия 1: длины направлений и названий — u8, предметы только строками
+        room = {}
+        if name_length:
+            room['name'] = data[position:position + name_length].decode('utf-8')
+            position += name_length
+        room['description'] = data[description:description + description_length].decode('utf-8')
+        exits = {}
+        for _ in range(exit_count):
+            length = data[position]
+            direction = data[position + 1:position + 1 + length].decode('utf-8')
+            position += 1 + length
+            length = _U16.unpack_from(data, position)[0]
+            exits[direction] = data[position + 2:position + 2 + length].decode('utf-8')
+            position += 2 + length
+        room['exits'] = exits
+        items = []
+        for _ in range(item_count):
+            length = data[position]
+            items.append(data[position + 1:position + 1 + length].decode('utf-8'))
+            position += 1 + length
+        room['items'] = items
+        room['puzzle'] = (json.loads(data[puzzle:puzzle + puzzle_length].decode('utf-8'))
+                          if puzzle_length else None)
+        return room
+
+    def close(self):
+        for table in (self._offsets, self._index):
+            if isinstance(table, memoryview):
+                table.release()   # пока memoryview жив, mmap не закрыть
+        self._map.close()
+        self._file.close()
+
+
+def open_world(path, directory=None):
+    """CompiledRooms для файла мира (.json/.toml — через кэш) или готового .lbw."""
+    path = Path(path)
+    if path.suffix.lower() != SUFFIX:
+        path = compile_world(path, directory)
+    return CompiledRooms(path)
+
+
+def compile_generated(size, seed, path):
+    """Выгружает сгенерированный лабиринт (generator.py) в скомпилированный файл мира.
+
+    Комнаты идут потоком, так что можно собрать карту больше оперативной памяти.
+    """
+    return write_world(path, generate_rooms(size, seed), size, {'generated': [size, seed]})
+
+
+def load_world(path, directory=None, cache_size=ROOM_CACHE_SIZE):
+    """Шаблон комнат для файла мира; псевдонимы команд из файла регистрируются в реестре.
+
+    В памяти держатся только cache_size последних декодированных комнат
+    (world.LRUTemplate), изменения сессий — как обычно, в оверлее World.
+    """
+    rooms = open_world(path, directory)
+    add_specs(rooms.meta.get('commands', {}))
+    # Без раздела triggers у карты стандартные триггеры (constants.TRIGGERS)
+    return LRUTemplate(rooms, cache_size, rooms.meta.get('triggers'))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Проверка и компиляция файлов мира")
+    parser.add_argument('worlds', nargs='*', help="файлы мира .json или .toml")
+    parser.add_argument('--generate', type=int, metavar='ROOMS',
+                        help="скомпилировать сгенерированный лабиринт из ROOMS комнат")
+    parser.add_argument('--seed', type=int, default=0, help="зерно генератора лабиринта")
+    parser.add_argument('-o', '--output', metavar='PATH', help="куда записать лабиринт (.lbw)")
+    args = parser.parse_args(argv)
+    if args.generate:
+        if not args.output:
+            parser.error("для --generate нужен --output")
+        target = compile_generated(args.generate, args.seed, args.output)
+        print(f"{args.generate} комнат -> {target}")
+    elif not args.worlds:
+        parser.error("укажите файлы мира или --generate")
+
+    failed = False
+    for name in args.worlds:
+        try:
+            target = compile_world(name)
+        except (WorldError, ValueError, OSError) as error:
+            print(error)
+            failed = True
+        else:
+            print(f"{name}: {len(CompiledRooms(target))} комнат -> {target}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()